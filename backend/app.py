@@ -1,16 +1,57 @@
 # backend/app.py
+import os
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
-from config.db import engine, Base
+from config.db import engine, async_engine, Base
 from fastapi.middleware.cors import CORSMiddleware
-from routes import authRoute, indexRoute, userRoute, predictRoute, recommendRoute, summaryRoute, dashboardRoute
-# from routes import historyRoute
+from fastapi.middleware.gzip import GZipMiddleware
+from routes import authRoute, indexRoute, userRoute, predictRoute, recommendRoute, summaryRoute, dashboardRoute, adminRoute
+from routes import historyRoute, importRoute, metricsRoute
 import models.user as user_model
 import models.prediction as pred_model
+import models.email_outbox as outbox_model
+import models.user_stats as user_stats_model
+import models.import_job as import_job_model
+import models.daily_rollup as daily_rollup_model
+from ml.predict_service import registry
+from services.mail_outbox import outbox_dispatcher
+from services.importer import import_runner
+from services.daily_rollup import rollup_worker
+from services.metrics import metrics, MetricsMiddleware
+from services.serializers import OrjsonResponse
 
 # Create tables if not exist (be careful in production)
 Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="Diabetes Auth API")
+# hitung query dan waktu DB per request untuk /metrics
+metrics.instrument_engine(engine, "sync")
+metrics.instrument_engine(async_engine, "async")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # reload model otomatis saat ml/registry/ACTIVE diubah (0 = nonaktif)
+    registry.start_watcher(float(os.getenv("MODEL_WATCH_INTERVAL", "5")))
+    # pengirim email outbox; matikan dengan MAIL_OUTBOX_DISPATCHER=0 jika
+    # dijalankan sebagai proses terpisah
+    if os.getenv("MAIL_OUTBOX_DISPATCHER", "1").lower() not in ("0", "false", "no", "off"):
+        outbox_dispatcher.start()
+    # rollup harian untuk /admin/analytics, di luar transaksi request;
+    # DAILY_ROLLUP_WORKER=0 jika dijalankan sebagai proses terpisah
+    if os.getenv("DAILY_ROLLUP_WORKER", "1").lower() not in ("0", "false", "no", "off"):
+        rollup_worker.start()
+    # lanjutkan import CSV yang terputus saat proses sebelumnya berhenti
+    await import_runner.resume_pending()
+    yield
+    await import_runner.stop()
+    await rollup_worker.stop()
+    await outbox_dispatcher.stop()
+    registry.stop_watcher()
+    authRoute.password_service.shutdown()
+
+
+# response JSON di-render dengan orjson (lihat services/serializers.py)
+app = FastAPI(title="Diabetes Auth API", lifespan=lifespan, default_response_class=OrjsonResponse)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000",
@@ -19,11 +60,19 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# kompres body JSON yang cukup besar (list riwayat, dashboard); body kecil
+# tidak sebanding dengan overhead gzip
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_SIZE", "1024")))
+# paling luar: latency per route template, in-flight, query DB per request
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 app.include_router(indexRoute.router)
 app.include_router(authRoute.router)
 app.include_router(userRoute.router)
 app.include_router(predictRoute.router)
+app.include_router(importRoute.router)
 app.include_router(recommendRoute.router)
 app.include_router(summaryRoute.router)
-# app.include_router(historyRoute.router)
-app.include_router(dashboardRoute.router)
\ No newline at end of file
+app.include_router(historyRoute.router)
+app.include_router(dashboardRoute.router)
+app.include_router(adminRoute.router)
+app.include_router(metricsRoute.router)
\ No newline at end of file
@@ -0,0 +1,130 @@
+"""
+Benchmark analytics populasi: agregat live GROUP BY hari atas seluruh tabel
+predictions dibandingkan membaca prediction_daily_rollups
+(services/daily_rollup.py), untuk bucket hari/minggu/bulan. Memakai database
+SQLite sementara, bukan DATABASE_URL; rollup dibangun dengan `rebuild` lalu
+divalidasi dengan `check`.
+
+Jalankan dari folder backend/:
+    python -m bench.bench_analytics [--rows 1000000] [--years 5] [--repeat 20]
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from config.db import Base
+import models.user  # noqa: F401  (tabel users untuk foreign key)
+import models.daily_rollup  # noqa: F401
+from models.prediction import Prediction as PredictionModel
+from services import daily_rollup
+
+SEED_CHUNK = 50_000
+
+
+def seed(engine, rows, years, users=100):
+    rng = np.random.default_rng(0)
+    start = datetime(2020, 1, 1)
+    span = int(years * 365 * 86400)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, name, email, password, tokenVersion, createdAt) VALUES "
+            + ", ".join(f"({u}, 'u{u}', 'u{u}@x', 'x', 0, '2020-01-01')" for u in range(1, users + 1))
+        )
+        for offset in range(0, rows, SEED_CHUNK):
+            size = min(SEED_CHUNK, rows - offset)
+            glucose = rng.normal(125, 30, size)
+            # sebagian blood_pressure kosong, seperti input lama
+            bp = np.where(rng.random(size) < 0.05, np.nan, rng.normal(72, 12, size))
+            conn.execute(insert(PredictionModel), [
+                {
+                    "user_id": int(u),
+                    "glucose": float(g),
+                    "blood_pressure": None if np.isnan(b) else float(b),
+                    "bmi": float(m),
+                    "prediction": int(g > 140),
+                    "probability": float(p),
+                    "createdAt": start + timedelta(seconds=int(s)),
+                }
+                for u, g, b, m, p, s in zip(
+                    rng.integers(1, users + 1, size), glucose, bp, rng.normal(31, 7, size),
+                    rng.uniform(0, 100, size), rng.integers(0, span, size),
+                )
+            ])
+
+
+async def timed(fn, repeat):
+    await fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - t0)
+    arr = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+    }
+
+
+async def run(path, repeat):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    results = {}
+    async with AsyncSession(engine) as db:
+        t0 = time.perf_counter()
+        days = await daily_rollup.rebuild(db)
+        rebuild_s = time.perf_counter() - t0
+        mismatches = await daily_rollup.check(db)
+
+        for bucket in daily_rollup.ROLLUP_BUCKETS:
+            live_stmt = daily_rollup._live_statement("sqlite", bucket=bucket).order_by("day")
+
+            async def live():
+                return daily_rollup.analytics((await db.execute(live_stmt)).all())
+
+            async def rollup():
+                return daily_rollup.analytics(await daily_rollup.fetch_rollups(db, bucket))
+
+            results[bucket] = {
+                "live_group_by": await timed(live, max(1, repeat // 10)),
+                "rollup": await timed(rollup, repeat),
+            }
+    await engine.dispose()
+    return days, rebuild_s, mismatches, results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--years", type=float, default=5)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-analytics-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    t0 = time.perf_counter()
+    seed(engine, args.rows, args.years)
+    seed_s = time.perf_counter() - t0
+    engine.dispose()
+
+    days, rebuild_s, mismatches, results = asyncio.run(run(path, args.repeat))
+    print(json.dumps({
+        "rows": args.rows,
+        "days": days,
+        "seed_seconds": round(seed_s, 2),
+        "rebuild_seconds": round(rebuild_s, 2),
+        "check_mismatches": len(mismatches),
+        "buckets": results,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark halaman riwayat untuk satu user dengan banyak prediksi: OFFSET/LIMIT
+lama dibandingkan keyset pagination (services/history.py) di berbagai
+kedalaman halaman. Memakai database SQLite sementara, bukan DATABASE_URL.
+
+Jalankan dari folder backend/:
+    python -m bench.bench_history [--rows 100000] [--limit 20] [--depths 0 100 1000 4000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from config.db import Base
+import models.user  # noqa: F401  (tabel users untuk foreign key)
+from models.prediction import Prediction as PredictionModel
+from services.history import build_page, decode_cursor, page_statement
+
+
+def seed(engine, rows, users=3):
+    """Satu user target (id=1) dengan `rows` prediksi + beberapa user lain."""
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO users (id, name, email, password, tokenVersion, createdAt) VALUES "
+            + ", ".join(f"({u}, 'u{u}', 'u{u}@x', 'x', 0, '2024-01-01')" for u in range(1, users + 1))
+        )
+        chunk = 20_000
+        for user_id in range(1, users + 1):
+            n = rows if user_id == 1 else rows // 10
+            for offset in range(0, n, chunk):
+                size = min(chunk, n - offset)
+                # beberapa baris sengaja berbagi createdAt (seperti batch insert)
+                seconds = (offset + np.arange(size)) // 3 * 60
+                conn.execute(insert(PredictionModel), [
+                    {
+                        "user_id": user_id,
+                        "glucose": float(g),
+                        "blood_pressure": 70.0,
+                        "prediction": int(g > 140),
+                        "probability": 50.0,
+                        "createdAt": start + timedelta(seconds=int(s)),
+                    }
+                    for g, s in zip(rng.normal(130, 30, size), seconds)
+                ])
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    arr = np.asarray(samples) * 1000.0
+    return {
+        "p50_ms": round(float(np.percentile(arr, 50)), 3),
+        "p99_ms": round(float(np.percentile(arr, 99)), 3),
+    }
+
+
+def offset_page(session, limit, page):
+    return session.scalars(
+        select(PredictionModel)
+        .where(PredictionModel.user_id == 1)
+        .order_by(PredictionModel.createdAt.desc())
+        .offset(page * limit)
+        .limit(limit)
+    ).all()
+
+
+def keyset_page(session, limit, cursor):
+    position = decode_cursor(cursor) if cursor else None
+    rows = list(session.scalars(page_statement(1, limit, position)).all())
+    return build_page(rows, limit, position)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 100, 1000, 4000])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix="bench-history-"), "bench.db")
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    t0 = time.perf_counter()
+    seed(engine, args.rows)
+    seed_s = time.perf_counter() - t0
+
+    results = []
+    with Session(engine) as session:
+        # jalan ke kedalaman terdalam sekali, catat cursor di tiap kedalaman
+        cursors, cursor = {0: None}, None
+        for page in range(1, max(args.depths) + 1):
+            _, cursor, _ = keyset_page(session, args.limit, cursor)
+            if cursor is None:
+                break
+            cursors[page] = cursor
+
+        for depth in args.depths:
+            if depth not in cursors:
+                continue
+            results.append({
+                "page": depth,
+                "row_offset": depth * args.limit,
+                "offset_limit": timed(lambda: offset_page(session, args.limit, depth), args.repeat),
+                "keyset": timed(lambda: keyset_page(session, args.limit, cursors[depth]), args.repeat),
+            })
+
+    print(json.dumps({
+        "rows": args.rows,
+        "limit": args.limit,
+        "seed_seconds": round(seed_s, 2),
+        "pages": results,
+    }, indent=2))
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
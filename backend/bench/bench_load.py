@@ -0,0 +1,429 @@
+"""
+Load benchmark end-to-end: isi database dengan user dan prediksi sintetis,
+jalankan app dengan uvicorn, lalu kirim request bersamaan ke /auth/login,
+/predict, /dashboard/, /summary/ dan /recommend/food. Hasilnya latency
+p50/p95/p99 dan throughput per endpoint, disimpan sebagai JSON supaya bisa
+dibandingkan antar rilis (--compare).
+
+Database dipilih lewat DATABASE_URL seperti di config/db.py (default: file
+SQLite sementara). Untuk MySQL lokal pakai database kosong khusus benchmark:
+    --database-url mysql+pymysql://root:@127.0.0.1:3306/diabetes_bench
+
+Butuh httpx dan uvicorn. Jalankan dari folder backend/:
+    python -m bench.bench_load [--users 100] [--rows 1000000] [--concurrency 32]
+                               [--duration 30] [--warmup 5] [--workers 1]
+                               [--mix login=1,predict=3,dashboard=3,summary=2,recommend=2]
+                               [--database-url URL] [--skip-seed] [--url http://host:port]
+                               [--output load.json] [--compare previous.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+BENCH_PASSWORD = "Passw0rd!"
+DEFAULT_MIX = "login=1,predict=3,dashboard=3,summary=2,recommend=2"
+SEED_CHUNK = 50_000
+
+PREDICT_FIELDS = ("pregnancies", "glucose", "bloodPressure", "bmi", "dpf")
+
+
+def bench_email(i):
+    return f"bench{i}@example.com"
+
+
+# ==============================
+# DATA SINTETIS
+# ==============================
+def feature_matrix(rng, n):
+    """Fitur dengan sebaran kira-kira seperti dataset Pima (pregnancies, glucose, bp, bmi, dpf)."""
+    return np.column_stack([
+        rng.poisson(3.8, n).clip(0, 17),
+        rng.normal(121, 32, n).clip(44, 199).round(),
+        rng.normal(72, 12, n).clip(24, 122).round(),
+        rng.normal(32, 7, n).clip(18, 67).round(1),
+        rng.gamma(2.0, 0.24, n).clip(0.08, 2.42).round(3),
+    ])
+
+
+def seed_database(users, rows, seed):
+    """
+    Isi users + predictions langsung lewat engine sync (config/db.py) dengan
+    insert bulk per chunk, lalu hitung ulang user_prediction_stats dan rollup harian.
+    Skoring memakai model aktif secara vektor (predict_matrix), bukan per baris.
+    """
+    from sqlalchemy import func, insert, select
+
+    from config.db import engine, Base, AsyncSessionLocal
+    import models.user  # noqa: F401
+    import models.user_stats  # noqa: F401
+    import models.daily_rollup  # noqa: F401
+    from models.user import User
+    from models.prediction import Prediction as PredictionModel
+    from ml.predict_service import predict_matrix
+    from services.password_service import PasswordService
+    from services import daily_rollup, user_stats
+
+    Base.metadata.create_all(bind=engine)
+    with engine.connect() as conn:
+        if conn.scalar(select(func.count()).select_from(User).where(User.email == bench_email(0))):
+            raise SystemExit("Database sudah berisi user benchmark; pakai --skip-seed atau database kosong")
+
+    # satu hash Argon2 (parameter dari env seperti /auth/register) untuk semua user
+    service = PasswordService.from_env()
+    hashed = asyncio.run(service.hash(BENCH_PASSWORD))
+    service.shutdown()
+
+    rng = np.random.default_rng(seed)
+    now = datetime.utcnow().replace(microsecond=0)
+    started = time.perf_counter()
+    with engine.begin() as conn:
+        conn.execute(insert(User), [
+            {"name": f"Bench {i}", "email": bench_email(i), "password": hashed, "createdAt": now}
+            for i in range(users)
+        ])
+        first_id = conn.scalar(select(func.min(User.id)).where(User.email == bench_email(0)))
+
+    with engine.connect() as conn:
+        for offset in range(0, rows, SEED_CHUNK):
+            size = min(SEED_CHUNK, rows - offset)
+            X = feature_matrix(rng, size)
+            preds, probs, version = predict_matrix(X)
+            user_ids = first_id + rng.integers(0, users, size)
+            # setahun terakhir, resolusi detik
+            created = [now - timedelta(seconds=int(s)) for s in rng.integers(0, 365 * 86400, size)]
+            conn.execute(insert(PredictionModel), [
+                {
+                    "user_id": uid,
+                    "pregnancies": p, "glucose": g, "blood_pressure": bp, "bmi": bmi, "dpf": dpf,
+                    "prediction": pred, "probability": prob, "model_version": version,
+                    "createdAt": c,
+                }
+                for uid, (p, g, bp, bmi, dpf), pred, prob, c in zip(
+                    user_ids.tolist(), X.tolist(), preds.tolist(), probs.tolist(), created
+                )
+            ])
+            conn.commit()
+    insert_s = time.perf_counter() - started
+
+    async def rebuild_stats():
+        async with AsyncSessionLocal() as db:
+            await user_stats.rebuild(db)
+            await daily_rollup.rebuild(db)
+
+    asyncio.run(rebuild_stats())
+    engine.dispose()
+    return {
+        "users": users,
+        "rows": rows,
+        "insert_seconds": round(insert_s, 2),
+        "rows_per_second": round(rows / insert_s) if insert_s else None,
+        "total_seconds": round(time.perf_counter() - started, 2),
+    }
+
+
+# ==============================
+# SERVER
+# ==============================
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(port, workers, env):
+    cmd = [
+        sys.executable, "-m", "uvicorn", "app:app",
+        "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+    ]
+    return subprocess.Popen(cmd, env=env, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+async def wait_ready(client, proc, timeout=60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise SystemExit(f"Server berhenti saat start (exit code {proc.returncode})")
+        try:
+            if (await client.get("/")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise SystemExit("Server tidak siap dalam waktu yang ditentukan")
+
+
+# ==============================
+# LOAD
+# ==============================
+def parse_mix(spec):
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        mix[name.strip()] = float(weight or 1)
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Skenario tidak dikenal: {sorted(unknown)}; pilih dari {sorted(SCENARIOS)}")
+    return mix
+
+
+async def do_login(client, user, rng):
+    return await client.post("/auth/login", json={"email": user["email"], "password": BENCH_PASSWORD})
+
+
+async def do_predict(client, user, rng):
+    values = feature_matrix(rng, 1)[0].tolist()
+    return await client.post("/predict", json=dict(zip(PREDICT_FIELDS, values)), headers=user["headers"])
+
+
+async def do_dashboard(client, user, rng):
+    return await client.get("/dashboard/", headers=user["headers"])
+
+
+async def do_summary(client, user, rng):
+    return await client.get("/summary/", headers=user["headers"])
+
+
+async def do_recommend(client, user, rng):
+    return await client.get("/recommend/food", headers=user["headers"])
+
+
+SCENARIOS = {
+    "login": ("POST /auth/login", do_login),
+    "predict": ("POST /predict", do_predict),
+    "dashboard": ("GET /dashboard/", do_dashboard),
+    "summary": ("GET /summary/", do_summary),
+    "recommend": ("GET /recommend/food", do_recommend),
+}
+
+
+async def login_users(client, count, concurrency):
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one(i):
+        async with sem:
+            r = await client.post("/auth/login", json={"email": bench_email(i), "password": BENCH_PASSWORD})
+            r.raise_for_status()
+            token = r.json()["access_token"]
+            return {"email": bench_email(i), "headers": {"Authorization": f"Bearer {token}"}}
+
+    return await asyncio.gather(*(one(i) for i in range(count)))
+
+
+async def run_load(client, users, mix, concurrency, duration, warmup, seed):
+    """
+    `concurrency` worker loop tertutup: tiap worker memilih skenario sesuai
+    bobot dan user acak, menunggu response, lalu mengulang. Sampel selama
+    warm-up dibuang.
+    """
+    names = list(mix)
+    weights = np.array([mix[n] for n in names], dtype=float)
+    weights /= weights.sum()
+    samples = {name: [] for name in names}
+    errors = {name: {} for name in names}
+
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def worker(wid):
+        rng = np.random.default_rng(seed + wid)
+        while True:
+            now = time.perf_counter()
+            if now >= stop_at:
+                return
+            name = names[rng.choice(len(names), p=weights)]
+            user = users[rng.integers(len(users))]
+            t0 = time.perf_counter()
+            try:
+                r = await SCENARIOS[name][1](client, user, rng)
+                status = r.status_code
+            except Exception as e:
+                status = type(e).__name__
+            elapsed = time.perf_counter() - t0
+            if t0 < measure_from:
+                continue
+            if status == 200 or status == 201:
+                samples[name].append(elapsed)
+            else:
+                errors[name][str(status)] = errors[name].get(str(status), 0) + 1
+
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return samples, errors, duration
+
+
+def summarize(samples, errors, duration):
+    def stats(values, error_count):
+        arr = np.asarray(values) * 1000.0
+        out = {"requests": len(values), "errors": error_count, "rps": round(len(values) / duration, 2)}
+        if len(arr):
+            out.update({
+                "p50_ms": round(float(np.percentile(arr, 50)), 2),
+                "p95_ms": round(float(np.percentile(arr, 95)), 2),
+                "p99_ms": round(float(np.percentile(arr, 99)), 2),
+                "mean_ms": round(float(arr.mean()), 2),
+                "max_ms": round(float(arr.max()), 2),
+            })
+        return out
+
+    endpoints = {
+        SCENARIOS[name][0]: {**stats(values, sum(errors[name].values())), "error_status": errors[name]}
+        for name, values in samples.items()
+    }
+    all_values = [v for values in samples.values() for v in values]
+    total_errors = sum(sum(e.values()) for e in errors.values())
+    return endpoints, stats(all_values, total_errors)
+
+
+def parse_db_queries(text):
+    """Rata-rata query DB per request per route dari /metrics (jika aktif)."""
+    sums, counts = {}, {}
+    for line in text.splitlines():
+        for prefix, target in (("http_request_db_queries_sum{", sums), ("http_request_db_queries_count{", counts)):
+            if line.startswith(prefix):
+                labels, _, value = line[len(prefix):].rpartition("} ")
+                target[labels] = float(value)
+    result = {}
+    for labels, count in counts.items():
+        parts = dict(p.split("=", 1) for p in labels.split(","))
+        key = f"{parts['method'].strip(chr(34))} {parts['route'].strip(chr(34))}"
+        if count:
+            result[key] = round(sums.get(labels, 0.0) / count, 2)
+    return result
+
+
+def compare(current, previous):
+    """Cetak perubahan p50/p95/p99 dan rps terhadap hasil sebelumnya."""
+    print(f"\nvs {previous.get('meta', {}).get('git_commit')} ({previous.get('meta', {}).get('timestamp')})")
+    for endpoint, cur in current["endpoints"].items():
+        old = previous.get("endpoints", {}).get(endpoint)
+        if not old:
+            continue
+        cells = []
+        for key in ("p50_ms", "p95_ms", "p99_ms", "rps"):
+            if cur.get(key) is None or not old.get(key):
+                continue
+            delta = (cur[key] - old[key]) / old[key] * 100.0
+            cells.append(f"{key} {old[key]} -> {cur[key]} ({delta:+.1f}%)")
+        print(f"  {endpoint:22s} " + ", ".join(cells))
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def drive(args, base_url, proc):
+    import httpx
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60.0) as client:
+        await wait_ready(client, proc)
+        users = await login_users(client, min(args.users, args.login_users), args.concurrency)
+        samples, errors, duration = await run_load(
+            client, users, parse_mix(args.mix), args.concurrency, args.duration, args.warmup, args.seed
+        )
+        r = await client.get("/metrics")
+        db_queries = parse_db_queries(r.text) if r.status_code == 200 else {}
+    return samples, errors, duration, db_queries
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--login-users", type=int, default=50, help="user yang login dan dipakai selama load")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=float, default=5.0)
+    parser.add_argument("--workers", type=int, default=1, help="jumlah worker uvicorn")
+    parser.add_argument("--mix", default=DEFAULT_MIX)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--database-url", default=None)
+    parser.add_argument("--skip-seed", action="store_true", help="pakai data benchmark yang sudah ada")
+    parser.add_argument("--url", default=None, help="target server yang sudah berjalan (tanpa start uvicorn)")
+    parser.add_argument("--output", default=None)
+    parser.add_argument("--compare", default=None, help="file JSON hasil sebelumnya")
+    args = parser.parse_args()
+    parse_mix(args.mix)
+
+    database_url = args.database_url or os.getenv("DATABASE_URL")
+    if not database_url:
+        database_url = "sqlite:///" + os.path.join(tempfile.mkdtemp(prefix="bench-load-"), "bench.db")
+    # config/db.py membaca DATABASE_URL saat import; server uvicorn mewarisi env ini
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("MAIL_OUTBOX_DISPATCHER", "0")
+
+    from sqlalchemy.engine import make_url
+
+    seed_info = None
+    if not args.skip_seed:
+        seed_info = seed_database(args.users, args.rows, args.seed)
+        print(f"seeded {args.rows} predictions for {args.users} users in {seed_info['total_seconds']}s", file=sys.stderr)
+
+    proc = None
+    base_url = args.url
+    if base_url is None:
+        port = free_port()
+        proc = start_server(port, args.workers, dict(os.environ))
+        base_url = f"http://127.0.0.1:{port}"
+    try:
+        samples, errors, duration, db_queries = asyncio.run(drive(args, base_url, proc))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait(timeout=30)
+
+    endpoints, total = summarize(samples, errors, duration)
+    result = {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "database": make_url(database_url).get_backend_name(),
+        },
+        "config": {
+            "users": args.users,
+            "rows": args.rows,
+            "login_users": args.login_users,
+            "concurrency": args.concurrency,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "uvicorn_workers": args.workers if proc is not None else None,
+            "mix": parse_mix(args.mix),
+            "seed": args.seed,
+        },
+        "seed": seed_info,
+        "total": total,
+        "endpoints": endpoints,
+        "db_queries_per_request": db_queries,
+    }
+
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare) as f:
+            compare(result, json.load(f))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark hot reload model registry: beberapa thread terus melakukan inference
+sementara thread lain bergantian mengaktifkan dua versi model. Latency panggilan
+yang tumpang tindih dengan swap dibandingkan dengan yang tidak.
+
+Jalankan dari folder backend/:
+    python -m bench.bench_model_reload [--seconds 5] [--threads 8] [--swap-every 0.05]
+"""
+import argparse
+import json
+import os
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from ml.inference_engine import LinearModelEngine
+from ml.model_registry import ModelRegistry
+from ml.predict_service import ARTIFACT_PATH
+
+
+def percentiles(values):
+    if not values:
+        return {}
+    arr = np.asarray(values) * 1e6
+    return {
+        "count": int(arr.size),
+        "p50_us": round(float(np.percentile(arr, 50)), 2),
+        "p99_us": round(float(np.percentile(arr, 99)), 2),
+        "max_us": round(float(arr.max()), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--swap-every", type=float, default=0.05)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as root:
+        registry = ModelRegistry(root, bootstrap_paths=[ARTIFACT_PATH])
+        v1 = registry.active.version
+
+        # versi kedua: koefisien sedikit berbeda supaya swap benar-benar terjadi
+        base = LinearModelEngine.load(ARTIFACT_PATH)
+        alt = LinearModelEngine(base.coef * 1.01, base.intercept, base.features, base.classes)
+        alt_path = os.path.join(root, "alt.npz")
+        alt.save(alt_path)
+        v2 = registry.publish(alt_path)
+        os.remove(alt_path)
+
+        stop = threading.Event()
+        swaps = []
+        samples = [[] for _ in range(args.threads)]
+        row = np.array([[2.0, 150.0, 90.0, 35.0, 0.3]])
+
+        def client(out):
+            while not stop.is_set():
+                t0 = time.perf_counter()
+                registry.active.predict(row)
+                t1 = time.perf_counter()
+                out.append((t0, t1 - t0))
+
+        def swapper():
+            versions = [v2, v1]
+            i = 0
+            while not stop.wait(args.swap_every):
+                t0 = time.perf_counter()
+                registry.activate(versions[i % 2])
+                swaps.append((t0, time.perf_counter()))
+                i += 1
+
+        workers = [threading.Thread(target=client, args=(out,)) for out in samples]
+        workers.append(threading.Thread(target=swapper))
+        for w in workers:
+            w.start()
+        time.sleep(args.seconds)
+        stop.set()
+        for w in workers:
+            w.join()
+
+    during, outside = [], []
+    for t0, dt in (s for out in samples for s in out):
+        overlaps = any(a <= t0 + dt and t0 <= b for a, b in swaps)
+        (during if overlaps else outside).append(dt)
+
+    result = {
+        "swaps": len(swaps),
+        "swap_duration": percentiles([b - a for a, b in swaps]),
+        "latency_outside_swap": percentiles(outside),
+        "latency_during_swap": percentiles(during),
+    }
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
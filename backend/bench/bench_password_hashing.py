@@ -0,0 +1,87 @@
+"""
+Throughput login (Argon2 verify) per set parameter, lewat PasswordService yang
+sama dengan yang dipakai /auth/login.
+
+Jalankan dari folder backend/:
+    python -m bench.bench_password_hashing [--logins 64] [--concurrency 16] [--workers N]
+                                           [--params 3:65536:4 2:19456:1 ...]
+                                           [--output hashing.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+
+import numpy as np
+
+from services.password_service import PasswordService
+
+# time_cost:memory_cost(KiB):parallelism
+DEFAULT_PARAMS = ["3:65536:4", "2:19456:1", "1:47104:1", "4:131072:4"]
+
+
+async def run_case(spec, logins, concurrency, workers):
+    time_cost, memory_cost, parallelism = (int(x) for x in spec.split(":"))
+    service = PasswordService(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        workers=workers,
+        queue_limit=logins + concurrency,
+    )
+    hashed = await service.hash("Passw0rd!")
+    latencies = []
+    sem = asyncio.Semaphore(concurrency)
+
+    async def one_login():
+        async with sem:
+            t0 = time.perf_counter()
+            ok = await service.verify(hashed, "Passw0rd!")
+            latencies.append(time.perf_counter() - t0)
+            assert ok
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    service.shutdown()
+
+    arr = np.asarray(latencies) * 1000.0
+    return {
+        "params": service.params,
+        "workers": service.workers,
+        "logins": logins,
+        "concurrency": concurrency,
+        "logins_per_sec": round(logins / elapsed, 2),
+        "p50_ms": round(float(np.percentile(arr, 50)), 2),
+        "p95_ms": round(float(np.percentile(arr, 95)), 2),
+        "p99_ms": round(float(np.percentile(arr, 99)), 2),
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--params", nargs="+", default=DEFAULT_PARAMS)
+    parser.add_argument("--output")
+    args = parser.parse_args()
+
+    results = []
+    for spec in args.params:
+        result = await run_case(spec, args.logins, args.concurrency, args.workers)
+        results.append(result)
+        p = result["params"]
+        print(
+            f"t={p['time_cost']} m={p['memory_cost']}KiB p={p['parallelism']}: "
+            f"{result['logins_per_sec']} login/s, p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
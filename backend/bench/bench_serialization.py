@@ -0,0 +1,175 @@
+"""
+Micro-benchmark serialisasi response: CPU per response untuk dashboard,
+summary, dan halaman riwayat, jalur lama (model pydantic per baris +
+jsonable_encoder / validasi response_model + json.dumps) dibandingkan jalur
+cepat services/serializers.py (dict langsung dari baris ORM + orjson).
+Tanpa database: baris Prediction dibuat di memori. Output kedua jalur
+dicek identik sebelum diukur.
+
+Jalankan dari folder backend/:
+    python -m bench.bench_serialization [--limits 10 100 500] [--seconds 1.0]
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+import models.user  # noqa: F401  (relationship Prediction.user)
+from models.prediction import Prediction as PredictionModel
+from schemas.dashboardSchema import DashboardOut, DashboardUserStats, DashboardRecentPrediction, ChartDataPoint
+from schemas.historySchema import HistoryItem, HistoryPage
+from schemas.summarySchema import SummaryOut, SummaryLatest
+from services.serializers import dumps, dashboard_recent, history_item, summary_latest
+
+CURSOR = "eyJjIjoiMjAyNC0wMS0wMVQwMDowMDowMCIsImkiOjEsImQiOiJuZXh0In0"
+
+
+def make_rows(n):
+    rng = np.random.default_rng(0)
+    start = datetime(2024, 1, 1, 8, 0, 0, 123456)
+    return [
+        PredictionModel(
+            id=i + 1, user_id=1,
+            pregnancies=float(rng.integers(0, 10)), glucose=float(rng.normal(130, 30)),
+            blood_pressure=None if i % 7 == 0 else float(rng.normal(72, 10)),
+            bmi=round(float(rng.normal(31, 6)), 1), dpf=round(float(rng.uniform(0, 2)), 3),
+            prediction=int(i % 3 == 0), probability=round(float(rng.uniform(0, 100)), 2),
+            createdAt=start + timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+# ==============================
+# JALUR LAMA
+# ==============================
+def dashboard_before(rows):
+    recent = [
+        DashboardRecentPrediction(
+            id=p.id, user_id=p.user_id, pregnancies=p.pregnancies, glucose=p.glucose,
+            blood_pressure=p.blood_pressure, bmi=p.bmi, dpf=p.dpf, prediction=p.prediction,
+            probability=p.probability, createdAt=p.createdAt,
+        )
+        for p in rows
+    ]
+    out = DashboardOut(
+        user=DashboardUserStats(
+            total_predictions=1000, diabetes_count=300, non_diabetes_count=700,
+            avg_probability=41.5, last_prediction=recent[0] if recent else None,
+        ),
+        recent_user_predictions=recent,
+        chart_data=[ChartDataPoint(date=p.createdAt.strftime("%d/%m"), value=p.glucose) for p in reversed(rows)],
+    )
+    return JSONResponse(jsonable_encoder(out)).body
+
+
+def summary_before(rows):
+    latest = rows[0]
+    out = SummaryOut(
+        total_predictions=1000, diabetes_count=300, non_diabetes_count=700,
+        avg_probability=41.5, avg_glucose=128.2, avg_blood_pressure=71.9,
+        latest=SummaryLatest(id=latest.id, prediction=latest.prediction,
+                             probability=latest.probability, createdAt=latest.createdAt),
+    )
+    return JSONResponse(jsonable_encoder(out)).body
+
+
+HISTORY_FIELD = TypeAdapter(HistoryPage)
+
+
+def _history_page(rows):
+    return HistoryPage(
+        items=[HistoryItem.model_validate(p) for p in rows],
+        limit=len(rows), next_cursor=CURSOR, prev_cursor=None,
+    )
+
+
+def history_before(rows):
+    # response_model: validasi ulang + serialize ke dict, lalu json.dumps (FastAPI lama, mis. 0.121)
+    page = HISTORY_FIELD.validate_python(_history_page(rows))
+    return JSONResponse(HISTORY_FIELD.dump_python(page, mode="json")).body
+
+
+def history_before_dump_json(rows):
+    # FastAPI baru: response_model diserialisasi langsung ke bytes oleh pydantic
+    return HISTORY_FIELD.dump_json(HISTORY_FIELD.validate_python(_history_page(rows)))
+
+
+# ==============================
+# JALUR CEPAT
+# ==============================
+def dashboard_after(rows):
+    recent = dashboard_recent.many(rows)
+    return dumps({
+        "user": {
+            "total_predictions": 1000, "diabetes_count": 300, "non_diabetes_count": 700,
+            "avg_probability": 41.5, "last_prediction": recent[0] if recent else None,
+        },
+        "recent_user_predictions": recent,
+        "chart_data": [{"date": p.createdAt.strftime("%d/%m"), "value": p.glucose} for p in reversed(rows)],
+    })
+
+
+def summary_after(rows):
+    return dumps({
+        "total_predictions": 1000, "diabetes_count": 300, "non_diabetes_count": 700,
+        "avg_probability": 41.5, "avg_glucose": 128.2, "avg_blood_pressure": 71.9,
+        "latest": summary_latest(rows[0]),
+    })
+
+
+def history_after(rows):
+    return dumps({"items": history_item.many(rows), "limit": len(rows), "next_cursor": CURSOR, "prev_cursor": None})
+
+
+def cpu_per_call(fn, rows, seconds):
+    """Rata-rata CPU (process_time) per pemanggilan, dalam mikrodetik."""
+    fn(rows)  # warm-up
+    calls, started = 0, time.process_time()
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(10):
+            fn(rows)
+        calls += 10
+    return (time.process_time() - started) / calls * 1e6
+
+
+def compare(name, rows, before, after, seconds):
+    if json.loads(before(rows)) != json.loads(after(rows)):
+        raise SystemExit(f"{name}: output jalur lama dan cepat berbeda")
+    result = {
+        "rows": len(rows),
+        "before_us": round(cpu_per_call(before, rows, seconds), 1),
+        "after_us": round(cpu_per_call(after, rows, seconds), 1),
+    }
+    result["speedup"] = round(result["before_us"] / result["after_us"], 2)
+    return name, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--limits", type=int, nargs="+", default=[10, 100, 500],
+                        help="Ukuran halaman riwayat yang diukur")
+    parser.add_argument("--recent", type=int, default=5, help="Jumlah prediksi terbaru di dashboard")
+    parser.add_argument("--seconds", type=float, default=1.0, help="Durasi pengukuran per kasus")
+    args = parser.parse_args()
+
+    rows = make_rows(max(args.limits + [args.recent]))
+    results = dict([
+        compare("dashboard", rows[:args.recent], dashboard_before, dashboard_after, args.seconds),
+        compare("summary", rows[:1], summary_before, summary_after, args.seconds),
+    ])
+    for limit in args.limits:
+        name, result = compare(f"history_{limit}", rows[:limit], history_before, history_after, args.seconds)
+        result["before_dump_json_us"] = round(cpu_per_call(history_before_dump_json, rows[:limit], args.seconds), 1)
+        results[name] = result
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
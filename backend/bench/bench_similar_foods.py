@@ -0,0 +1,73 @@
+"""
+Benchmark FoodSimilarityIndex untuk katalog sintetis berbagai ukuran
+(di-resample dari data/nutrition.csv dengan noise), single query dan batch.
+
+Jalankan dari folder backend/:
+    python -m bench.bench_similar_foods [--sizes 1126 10000 100000] [--k 10] [--batch 256]
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from ml.similar_food_service import FoodSimilarityIndex, NUTRIENTS, nutrition_df
+
+
+def synthetic_catalog(n, rng):
+    base = nutrition_df[NUTRIENTS].to_numpy(dtype=np.float32)
+    rows = base[rng.integers(0, len(base), size=n)]
+    noise = rng.normal(1.0, 0.1, size=rows.shape).astype(np.float32)
+    return np.maximum(rows * noise, 0.0)
+
+
+def timed(fn, repeat):
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    arr = np.asarray(samples) * 1e6
+    return {
+        "p50_us": round(float(np.percentile(arr, 50)), 2),
+        "p99_us": round(float(np.percentile(arr, 99)), 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[len(nutrition_df), 10_000, 100_000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    results = []
+    for n in args.sizes:
+        matrix = synthetic_catalog(n, rng)
+        t0 = time.perf_counter()
+        index = FoodSimilarityIndex([f"food-{i}" for i in range(n)], matrix)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+
+        target = matrix[rng.integers(0, n)]
+        targets = matrix[rng.integers(0, n, size=args.batch)]
+
+        single = timed(lambda: index.query(target, args.k), args.repeat)
+        batch = timed(lambda: index.query_many(targets, args.k), max(10, args.repeat // 10))
+        batch["per_query_us"] = round(batch["p50_us"] / args.batch, 2)
+
+        results.append({
+            "catalog_size": n,
+            "k": args.k,
+            "build_ms": round(build_ms, 2),
+            "single_query": single,
+            f"batch_{args.batch}": batch,
+        })
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,13 @@
 # backend/config/db.py
 import os
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 
+from config.pool import pool_settings, engine_pool_kwargs, instrument_engine
+
 load_dotenv()
 
 DB_USER = os.getenv("DB_USER", "root")
@@ -12,10 +16,45 @@ DB_HOST = os.getenv("DB_HOST", "127.0.0.1")
 DB_PORT = os.getenv("DB_PORT", "3306")
 DB_NAME = os.getenv("DB_NAME", "diabetes")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+# DATABASE_URL bisa dioverride dari env, mis. "sqlite:///./test.db" untuk testing
+DATABASE_URL = os.getenv("DATABASE_URL") or f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+
+# driver async pasangan driver sync
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url):
+    url = make_url(url)
+    return url.set(drivername=ASYNC_DRIVERS.get(url.drivername, url.drivername))
 
-# Engine and session (synchronous)
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL") or to_async_url(DATABASE_URL)
+
+# Ukuran pool, overflow, timeout, recycle dan strategi pre-ping diatur lewat
+# env DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT, DB_POOL_RECYCLE,
+# DB_PRE_PING (always|idle|never) dan DB_PRE_PING_IDLE (lihat config/pool.py)
+POOL_SETTINGS = pool_settings()
+
+# Engine and session (synchronous) - dipakai untuk create_all dan script CLI
+engine = create_engine(
+    DATABASE_URL, **engine_pool_kwargs(make_url(DATABASE_URL), settings=POOL_SETTINGS)
+)
+instrument_engine(engine, "sync", settings=POOL_SETTINGS)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Engine and session (async) - dipakai oleh semua route
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **engine_pool_kwargs(make_url(ASYNC_DATABASE_URL), is_async=True, settings=POOL_SETTINGS),
+)
+instrument_engine(async_engine, "async", settings=POOL_SETTINGS)
+AsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 Base = declarative_base()
@@ -1,4 +1,4 @@
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
+from fastapi_mail import ConnectionConfig
 from dotenv import load_dotenv
 import os
 
@@ -7,15 +7,20 @@ basedir = os.path.dirname(os.path.abspath(__file__))
 env_path = os.path.join(basedir, "..", ".env")  # backend/.env
 load_dotenv(env_path)
 
+
+def _env_flag(name, default):
+    return (os.getenv(name) or default).lower() in ("1", "true", "yes", "on")
+
+
+# STARTTLS/SSL/credentials bisa dimatikan untuk SMTP lokal (mis. aiosmtpd saat testing).
+# Email dikirim oleh services/mail_outbox.py dengan aiosmtplib memakai setting ini.
 conf = ConnectionConfig(
     MAIL_USERNAME=os.getenv("SMTP_USERNAME") or "",
     MAIL_PASSWORD=os.getenv("SMTP_PASSWORD") or "",
-    MAIL_FROM=os.getenv("SMTP_USERNAME") or "",
+    MAIL_FROM=os.getenv("SMTP_FROM") or os.getenv("SMTP_USERNAME") or "",
     MAIL_PORT=int(os.getenv("SMTP_PORT") or 587),
     MAIL_SERVER=os.getenv("SMTP_SERVER") or "smtp.gmail.com",
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True,
+    MAIL_STARTTLS=_env_flag("SMTP_STARTTLS", "1"),
+    MAIL_SSL_TLS=_env_flag("SMTP_SSL_TLS", "0"),
+    USE_CREDENTIALS=_env_flag("SMTP_USE_CREDENTIALS", "1"),
 )
-
-fm = FastMail(conf)
@@ -0,0 +1,205 @@
+# backend/config/pool.py
+import os
+import threading
+import time
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# batas bucket histogram waktu tunggu checkout (detik)
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+
+class PoolMetrics:
+    """Counter dan histogram per pool: checkout, churn koneksi, waktu tunggu."""
+
+    def __init__(self, name):
+        self.name = name
+        self.since = time.time()
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.closes = 0
+        self.invalidations = 0
+        self.pings = 0
+        self.ping_failures = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def incr(self, field, n=1):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + n)
+
+    def observe_wait(self, seconds, timed_out=False):
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+            for i, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[i] += 1
+                    break
+            else:
+                self.wait_buckets[-1] += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self):
+        with self._lock:
+            labels = [f"<={b * 1000:g}ms" for b in WAIT_BUCKETS] + [f">{WAIT_BUCKETS[-1] * 1000:g}ms"]
+            return {
+                "since": self.since,
+                "checkouts": self.checkouts,
+                "checkins": self.checkins,
+                "connects": self.connects,
+                "closes": self.closes,
+                "invalidations": self.invalidations,
+                "pings": self.pings,
+                "ping_failures": self.ping_failures,
+                "timeouts": self.timeouts,
+                "wait": {
+                    "count": self.wait_count,
+                    "avg_ms": (self.wait_total / self.wait_count * 1000.0) if self.wait_count else None,
+                    "max_ms": self.wait_max * 1000.0,
+                    "histogram": dict(zip(labels, self.wait_buckets)),
+                },
+            }
+
+
+class _InstrumentedMixin:
+    """Mengukur waktu tunggu checkout (termasuk saat pool penuh)."""
+
+    metrics = None
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except exc.TimeoutError:
+            if self.metrics is not None:
+                self.metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        if self.metrics is not None:
+            self.metrics.observe_wait(time.perf_counter() - started)
+        return conn
+
+    def recreate(self):
+        # engine.dispose() membuat pool baru; metrics tetap dibawa
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+class InstrumentedQueuePool(_InstrumentedMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_InstrumentedMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_settings():
+    """Baca konfigurasi pool dari env."""
+    return {
+        "pool_size": int(os.getenv("DB_POOL_SIZE", "5")),
+        "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "10")),
+        "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        # -1 = tidak pernah recycle; MySQL default wait_timeout = 8 jam
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        # always = ping setiap checkout, idle = ping hanya jika koneksi
+        # menganggur > DB_PRE_PING_IDLE detik, never = tanpa ping
+        "pre_ping": os.getenv("DB_PRE_PING", "idle").lower(),
+        "pre_ping_idle": float(os.getenv("DB_PRE_PING_IDLE", "30")),
+    }
+
+
+def engine_pool_kwargs(url, is_async=False, settings=None):
+    """kwargs create_engine/create_async_engine sesuai konfigurasi pool."""
+    settings = settings or pool_settings()
+
+    # SQLite in-memory memakai pool khusus milik SQLAlchemy, jangan diganti
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": InstrumentedAsyncAdaptedQueuePool if is_async else InstrumentedQueuePool,
+        "pool_size": settings["pool_size"],
+        "max_overflow": settings["max_overflow"],
+        "pool_timeout": settings["pool_timeout"],
+        "pool_recycle": settings["pool_recycle"],
+        "pool_pre_ping": settings["pre_ping"] == "always",
+    }
+
+
+def instrument_engine(engine, name, settings=None):
+    """Pasang PoolMetrics dan (jika DB_PRE_PING=idle) ping koneksi yang lama menganggur."""
+    settings = settings or pool_settings()
+    sync_engine = getattr(engine, "sync_engine", engine)
+    metrics = PoolMetrics(name)
+    sync_engine.pool.metrics = metrics
+    idle_limit = settings["pre_ping_idle"] if settings["pre_ping"] == "idle" else None
+
+    @event.listens_for(sync_engine, "connect")
+    def _on_connect(dbapi_conn, record):
+        metrics.incr("connects")
+
+    @event.listens_for(sync_engine, "checkout")
+    def _on_checkout(dbapi_conn, record, proxy):
+        metrics.incr("checkouts")
+        if idle_limit is None:
+            return
+        last_used = record.info.get("last_checkin")
+        if last_used is None or time.monotonic() - last_used < idle_limit:
+            return
+        metrics.incr("pings")
+        try:
+            cursor = dbapi_conn.cursor()
+            cursor.execute("SELECT 1")
+            cursor.close()
+        except Exception:
+            metrics.incr("ping_failures")
+            # pool akan membuang koneksi ini dan mencoba koneksi baru
+            raise exc.DisconnectionError()
+
+    @event.listens_for(sync_engine, "checkin")
+    def _on_checkin(dbapi_conn, record):
+        metrics.incr("checkins")
+        if record is not None:
+            record.info["last_checkin"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "close")
+    def _on_close(dbapi_conn, record):
+        metrics.incr("closes")
+
+    @event.listens_for(sync_engine, "invalidate")
+    def _on_invalidate(dbapi_conn, record, exception):
+        metrics.incr("invalidations")
+
+    return metrics
+
+
+def pool_status(engine):
+    """Keadaan pool saat ini + metrics kumulatif."""
+    pool = getattr(engine, "sync_engine", engine).pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        overflow = pool.overflow()
+        status.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "checked_out": pool.checkedout(),
+            # overflow() negatif selama pool belum terisi penuh
+            "overflow_in_use": max(overflow, 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+            "recycle": pool._recycle,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status["metrics"] = metrics.snapshot()
+    return status
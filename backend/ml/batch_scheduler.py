@@ -0,0 +1,142 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+import numpy as np
+
+
+class MicroBatchScheduler:
+    """
+    Mengumpulkan request prediksi yang datang bersamaan lalu menskornya
+    sebagai satu matrix. Request pertama dalam batch menunggu paling lama
+    `max_wait_ms`, atau kurang jika `max_batch` baris sudah terkumpul.
+
+    `score_fn` menerima matrix (n x fitur) dan mengembalikan list hasil
+    dengan panjang n, urutannya sama dengan baris input.
+    """
+
+    def __init__(self, score_fn, max_batch=64, max_wait_ms=2.0, enabled=True):
+        self.score_fn = score_fn
+        self.max_batch = max(1, int(max_batch))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+        self.enabled = enabled
+
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.reset_stats()
+
+    # ==============================
+    # PUBLIC API
+    # ==============================
+    def submit(self, row):
+        """Masukkan satu baris fitur ke antrian, kembalikan Future hasilnya."""
+        self._ensure_worker()
+        fut = Future()
+        self._queue.put((row, fut, time.perf_counter()))
+        return fut
+
+    def predict(self, row):
+        if not self.enabled:
+            return self.score_fn(np.asarray([row], dtype=float))[0]
+        return self.submit(row).result()
+
+    def stats(self):
+        with self._stats_lock:
+            batches = self._batches
+            rows = self._rows
+            return {
+                "enabled": self.enabled,
+                "max_batch": self.max_batch,
+                "max_wait_ms": self.max_wait * 1000.0,
+                "queue_depth": self._queue.qsize(),
+                "batches": batches,
+                "rows": rows,
+                "avg_batch_size": (rows / batches) if batches else None,
+                "max_batch_size": self._max_batch_size,
+                "batch_size_histogram": dict(self._size_hist),
+                "avg_queue_wait_ms": (self._wait_total / rows * 1000.0) if rows else None,
+                "max_queue_wait_ms": self._wait_max * 1000.0,
+                "errors": self._errors,
+            }
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self._batches = 0
+            self._rows = 0
+            self._max_batch_size = 0
+            # bucket pangkat dua: "1", "2", "4", ... "<=max_batch"
+            self._size_hist = {}
+            self._wait_total = 0.0
+            self._wait_max = 0.0
+            self._errors = 0
+
+    # ==============================
+    # WORKER
+    # ==============================
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="predict-micro-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _collect(self):
+        # blok sampai ada request pertama, lalu tunggu sisa window
+        first = self._queue.get()
+        batch = [first]
+        deadline = first[2] + self.max_wait
+
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                if remaining <= 0:
+                    batch.append(self._queue.get_nowait())
+                else:
+                    batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            try:
+                X = np.asarray([item[0] for item in batch], dtype=float)
+                results = self.score_fn(X)
+            except Exception as e:
+                with self._stats_lock:
+                    self._errors += 1
+                for _, fut, _ in batch:
+                    fut.set_exception(e)
+                continue
+
+            for (_, fut, _), result in zip(batch, results):
+                fut.set_result(result)
+
+            self._record(batch, started)
+
+    def _record(self, batch, started):
+        size = len(batch)
+        bucket = 1
+        while bucket < size:
+            bucket *= 2
+        bucket = str(min(bucket, self.max_batch))
+
+        with self._stats_lock:
+            self._batches += 1
+            self._rows += size
+            self._max_batch_size = max(self._max_batch_size, size)
+            self._size_hist[bucket] = self._size_hist.get(bucket, 0) + 1
+            for _, _, enqueued in batch:
+                wait = started - enqueued
+                self._wait_total += wait
+                if wait > self._wait_max:
+                    self._wait_max = wait
@@ -0,0 +1,141 @@
+import hashlib
+import pickle
+
+import numpy as np
+
+# versi format file artifact (.npz); naikkan jika isi/arti field berubah
+ARTIFACT_FORMAT = 1
+
+
+class LinearModelEngine:
+    """
+    Inference regresi logistik biner tanpa sklearn: satu perkalian matrix
+    menghasilkan probabilitas dan kelas sekaligus.
+    """
+
+    kind = "linear"
+
+    def __init__(self, coef, intercept, features, classes=(0, 1), version=None):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float64).reshape(-1)
+        self.intercept = float(np.asarray(intercept, dtype=np.float64).reshape(-1)[0])
+        self.features = [str(f) for f in features]
+        self.classes = np.asarray(classes).astype(int)
+        self.version = version or fingerprint(self.coef, self.intercept)
+
+        if self.coef.shape[0] != len(self.features):
+            raise ValueError("Jumlah koefisien tidak sama dengan jumlah fitur")
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as npz:
+            fmt = int(npz["format"])
+            if fmt > ARTIFACT_FORMAT:
+                raise ValueError(f"Format artifact {fmt} tidak didukung (maks {ARTIFACT_FORMAT})")
+            return cls(
+                coef=npz["coef"],
+                intercept=npz["intercept"],
+                features=npz["features"].tolist(),
+                classes=npz["classes"],
+                version=str(npz["version"]),
+            )
+
+    def save(self, path):
+        # tulis lewat file object supaya np.savez tidak menambah ekstensi .npz
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                format=np.int64(ARTIFACT_FORMAT),
+                coef=self.coef,
+                intercept=np.float64(self.intercept),
+                features=np.array(self.features),
+                classes=self.classes,
+                version=np.array(self.version),
+            )
+
+    def predict(self, X):
+        """Kembalikan (kelas, probabilitas kelas 1) untuk matrix X (n x fitur)."""
+        z = np.asarray(X, dtype=np.float64) @ self.coef + self.intercept
+        # sigmoid yang stabil untuk z negatif besar
+        probs = np.exp(-np.logaddexp(0.0, -z))
+        # z > 0 <=> prob > 0.5, sama persis dengan LogisticRegression.predict
+        preds = self.classes[(z > 0).astype(int)]
+        return preds, probs
+
+
+class SklearnModelEngine:
+    """Adapter untuk model sklearn (.pkl) dengan interface yang sama."""
+
+    kind = "sklearn"
+
+    def __init__(self, model, version=None):
+        self.model = model
+        names = getattr(model, "feature_names_in_", None)
+        self.features = [str(f) for f in names] if names is not None else None
+        self.version = version or f"pkl-{id(model):x}"
+
+    @classmethod
+    def load(cls, path, version=None):
+        with open(path, "rb") as f:
+            model = pickle.load(f)
+        if version is None:
+            with open(path, "rb") as f:
+                version = "pkl-" + hashlib.sha1(f.read()).hexdigest()[:10]
+        return cls(model, version=version)
+
+    def predict(self, X):
+        probs = self.model.predict_proba(np.asarray(X, dtype=np.float64))[:, 1]
+        preds = (probs > 0.5).astype(int)
+        return preds, probs
+
+
+def fingerprint(coef, intercept):
+    h = hashlib.sha1(np.ascontiguousarray(coef, dtype=np.float64).tobytes())
+    h.update(np.float64(intercept).tobytes())
+    return "lr-" + h.hexdigest()[:10]
+
+
+def engine_from_sklearn(model, features=None, version=None):
+    """Konversi LogisticRegression biner hasil training ke LinearModelEngine."""
+    if len(getattr(model, "classes_", [])) != 2:
+        raise ValueError("Hanya model klasifikasi biner yang bisa diekspor")
+    if features is None:
+        features = getattr(model, "feature_names_in_", None)
+    if features is None:
+        raise ValueError("Urutan fitur tidak diketahui, berikan argumen features")
+    return LinearModelEngine(
+        coef=model.coef_[0],
+        intercept=model.intercept_[0],
+        features=features,
+        classes=model.classes_,
+        version=version,
+    )
+
+
+def engine_from_scaled(scaler, model, features, version=None):
+    """
+    LinearModelEngine setara StandardScaler + model linear biner; scaler
+    dilipat ke koefisien: w·((x - mean) / scale) + b = (w / scale)·x + (b - Σ w·mean / scale).
+    """
+    if len(getattr(model, "classes_", [])) != 2:
+        raise ValueError("Hanya model klasifikasi biner yang bisa diekspor")
+    w = model.coef_[0] / scaler.scale_
+    b = float(model.intercept_[0] - np.dot(w, scaler.mean_))
+    return LinearModelEngine(coef=w, intercept=b, features=features, classes=model.classes_, version=version)
+
+
+def check_parity(model, engine, X, atol=1e-9):
+    """
+    Bandingkan output engine dengan model sklearn pada matrix X.
+    Raise ValueError jika probabilitas atau kelas berbeda.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    sk_probs = model.predict_proba(X)[:, 1]
+    sk_preds = model.predict(X)
+    preds, probs = engine.predict(X)
+
+    max_diff = float(np.max(np.abs(sk_probs - probs))) if len(X) else 0.0
+    if max_diff > atol:
+        raise ValueError(f"Probabilitas engine berbeda dari sklearn (max diff {max_diff:.3g})")
+    if not np.array_equal(sk_preds, preds):
+        raise ValueError("Kelas prediksi engine berbeda dari sklearn")
+    return max_diff
@@ -0,0 +1,240 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+from ml.inference_engine import LinearModelEngine, SklearnModelEngine
+
+ARTIFACT_EXTENSIONS = (".npz", ".pkl")
+
+
+def load_engine(path, version=None):
+    """Muat artifact berdasarkan ekstensi file (.npz linear atau .pkl sklearn)."""
+    if path.endswith(".npz"):
+        return LinearModelEngine.load(path)
+    if path.endswith(".pkl"):
+        return SklearnModelEngine.load(path, version=version)
+    raise ValueError(f"Jenis artifact tidak dikenal: {path}")
+
+
+def _atomic_write_text(path, text):
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class ModelRegistry:
+    """
+    Registry artifact model berversi di satu folder:
+
+        <root>/<version>.npz | <version>.pkl   artifact per versi
+        <root>/ACTIVE                          nama versi yang sedang dipakai
+
+    Model aktif diganti dengan meload + warm-up versi baru lebih dulu, lalu
+    menukar satu referensi. Request yang sedang jalan tetap memakai engine
+    lama sampai selesai, jadi tidak ada jeda saat reload.
+    """
+
+    def __init__(self, root, bootstrap_paths=(), validate=None, warmup_rows=64):
+        self.root = root
+        self.bootstrap_paths = list(bootstrap_paths)
+        self.validate = validate
+        self.warmup_rows = warmup_rows
+
+        self._active = None
+        self._active_mtime = None
+        self._lock = threading.Lock()
+        # satu reload/activate (baca ACTIVE -> prepare -> swap) pada satu waktu,
+        # supaya watcher dan endpoint admin tidak menukar versi lama paling akhir
+        self._reload_lock = threading.RLock()
+        self._listeners = []
+        self._watcher = None
+        self._watch_stop = threading.Event()
+        self.swaps = 0
+        self.last_swap_at = None
+        self.last_error = None
+
+    # ==============================
+    # ARTIFACTS
+    # ==============================
+    @property
+    def active_path(self):
+        return os.path.join(self.root, "ACTIVE")
+
+    def artifact_path(self, version):
+        for ext in ARTIFACT_EXTENSIONS:
+            path = os.path.join(self.root, version + ext)
+            if os.path.exists(path):
+                return path
+        raise FileNotFoundError(f"Versi model '{version}' tidak ada di registry")
+
+    def list_versions(self):
+        if not os.path.isdir(self.root):
+            return []
+        versions = []
+        for name in sorted(os.listdir(self.root)):
+            stem, ext = os.path.splitext(name)
+            if ext in ARTIFACT_EXTENSIONS and not name.startswith("."):
+                path = os.path.join(self.root, name)
+                versions.append({
+                    "version": stem,
+                    "kind": "linear" if ext == ".npz" else "sklearn",
+                    "size_bytes": os.path.getsize(path),
+                    "created": os.path.getmtime(path),
+                })
+        return versions
+
+    def publish(self, source_path, activate=False):
+        """
+        Salin artifact ke registry dengan nama versinya. Untuk .npz versi diambil
+        dari isi file; untuk .pkl dari hash isi file.
+        """
+        engine = load_engine(source_path)
+        ext = os.path.splitext(source_path)[1]
+        os.makedirs(self.root, exist_ok=True)
+
+        dest = os.path.join(self.root, engine.version + ext)
+        if not os.path.exists(dest):
+            fd, tmp = tempfile.mkstemp(dir=self.root, prefix=".tmp-")
+            os.close(fd)
+            shutil.copyfile(source_path, tmp)
+            os.replace(tmp, dest)
+
+        if activate:
+            self.activate(engine.version)
+        return engine.version
+
+    def read_active_version(self):
+        try:
+            with open(self.active_path) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    # ==============================
+    # ACTIVE MODEL
+    # ==============================
+    @property
+    def active(self):
+        engine = self._active
+        if engine is None:
+            engine = self.reload()
+        return engine
+
+    @property
+    def active_version(self):
+        return self.active.version
+
+    def on_swap(self, callback):
+        """Daftarkan callback(old_engine, new_engine) yang dipanggil setelah swap."""
+        self._listeners.append(callback)
+
+    def activate(self, version):
+        with self._reload_lock:
+            # load + warm-up dulu supaya ACTIVE tidak pernah menunjuk versi yang rusak
+            engine = self._prepare(version)
+            _atomic_write_text(self.active_path, version + "\n")
+            return self._swap(engine)
+
+    def reload(self):
+        """
+        Baca ACTIVE dan ganti model aktif jika versinya berubah. Jika registry
+        masih kosong, artifact bootstrap (ml/model.npz atau model.pkl) didaftarkan.
+        """
+        with self._reload_lock:
+            version = self.read_active_version()
+            if version is None:
+                version = self._bootstrap()
+
+            current = self._active
+            if current is not None and current.version == version:
+                with self._lock:
+                    self._active_mtime = self._mtime()
+                return current
+
+            return self._swap(self._prepare(version))
+
+    def _prepare(self, version):
+        engine = load_engine(self.artifact_path(version), version=version)
+        if self.validate is not None:
+            self.validate(engine)
+        self._warm(engine)
+        return engine
+
+    def _swap(self, engine):
+        with self._lock:
+            current = self._active
+            # satu assignment referensi = swap atomik untuk pembaca
+            self._active = engine
+            self._active_mtime = self._mtime()
+            self.swaps += 1
+            self.last_swap_at = time.time()
+
+        for callback in self._listeners:
+            callback(current, engine)
+        return engine
+
+    def _bootstrap(self):
+        for path in self.bootstrap_paths:
+            if os.path.exists(path):
+                version = self.publish(path)
+                _atomic_write_text(self.active_path, version + "\n")
+                return version
+        raise FileNotFoundError("Registry kosong dan tidak ada artifact bootstrap")
+
+    def _warm(self, engine):
+        # jalankan inference sekali (1 baris dan satu batch penuh) supaya
+        # import/alokasi lazy terjadi sebelum engine menerima traffic
+        n_features = len(engine.features) if engine.features else 5
+        engine.predict(np.zeros((1, n_features)))
+        engine.predict(np.ones((self.warmup_rows, n_features)))
+
+    # ==============================
+    # FILE WATCH
+    # ==============================
+    def _mtime(self):
+        try:
+            return os.stat(self.active_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def start_watcher(self, interval=5.0):
+        """Poll file ACTIVE; reload otomatis saat diubah (mis. oleh worker lain)."""
+        if interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="model-registry-watch", daemon=True
+        )
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._watch_stop.set()
+
+    def _watch(self, interval):
+        while not self._watch_stop.wait(interval):
+            if self._mtime() == self._active_mtime:
+                continue
+            try:
+                self.reload()
+                self.last_error = None
+            except Exception as e:
+                # model lama tetap aktif jika versi baru gagal diload
+                self.last_error = str(e)
+                self._active_mtime = self._mtime()
+
+    def status(self):
+        engine = self._active
+        return {
+            "active_version": engine.version if engine else None,
+            "active_kind": engine.kind if engine else None,
+            "swaps": self.swaps,
+            "last_swap_at": self.last_swap_at,
+            "watching": self._watcher is not None and self._watcher.is_alive(),
+            "last_error": self.last_error,
+            "versions": self.list_versions(),
+        }
@@ -0,0 +1,348 @@
+import itertools
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+
+from ml.inference_engine import LinearModelEngine, SklearnModelEngine, engine_from_scaled
+
+# bin reliability diagram untuk expected calibration error
+CALIBRATION_BINS = 10
+# kandidat dengan latency <= faktor ini x yang tercepat dianggap sama cepat
+LATENCY_SLACK = 1.5
+
+
+def _logreg(**params):
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(max_iter=2000, **params)
+
+
+def _sgd(**params):
+    from sklearn.linear_model import SGDClassifier
+    return SGDClassifier(loss="log_loss", average=True, random_state=0, **params)
+
+
+def _random_forest(**params):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(random_state=0, n_jobs=1, **params)
+
+
+def _hist_gb(**params):
+    from sklearn.ensemble import HistGradientBoostingClassifier
+    return HistGradientBoostingClassifier(random_state=0, **params)
+
+
+def _knn(**params):
+    from sklearn.neighbors import KNeighborsClassifier
+    return KNeighborsClassifier(**params)
+
+
+# nama -> (factory, preprocessing, linear?, grid). Kandidat linear diekspor
+# sebagai .npz (LinearModelEngine), sisanya sebagai .pkl (SklearnModelEngine).
+CANDIDATES = {
+    "logreg": (_logreg, "raw", True, {"C": [1.0]}),
+    "logreg_scaled": (_logreg, "standard", True, {"C": [0.01, 0.1, 1.0, 10.0]}),
+    "sgd_log": (_sgd, "standard", True, {"alpha": [1e-4, 1e-3, 1e-2]}),
+    "random_forest": (_random_forest, "raw", False, {"n_estimators": [100, 300], "max_depth": [4, 8, None]}),
+    "hist_gb": (_hist_gb, "raw", False, {"learning_rate": [0.05, 0.1], "max_depth": [3, None]}),
+    "knn": (_knn, "standard", False, {"n_neighbors": [15, 31]}),
+}
+
+
+def expand_grid(names=None):
+    """List (nama, params) untuk semua kombinasi grid kandidat yang dipilih."""
+    configs = []
+    for name in names or CANDIDATES:
+        grid = CANDIDATES[name][3]
+        keys = sorted(grid)
+        for values in itertools.product(*(grid[k] for k in keys)):
+            configs.append((name, dict(zip(keys, values))))
+    return configs
+
+
+def config_label(name, params):
+    return name + "(" + ", ".join(f"{k}={v}" for k, v in sorted(params.items())) + ")"
+
+
+# ==============================
+# FOLD CACHE
+# ==============================
+class FoldCache:
+    """
+    Matrix train/test tiap fold untuk tiap preprocessing ("raw" dan
+    "standard"), ditulis sekali ke .npy di direktori sementara lalu dipakai
+    ulang oleh semua kandidat dan parameter. Worker joblib membukanya dengan mmap
+    sehingga tidak ada scaling ulang maupun salinan data per task.
+    """
+
+    def __init__(self, X, y, folds=5, seed=0, root=None):
+        from sklearn.model_selection import StratifiedKFold
+        from sklearn.preprocessing import StandardScaler
+
+        self.root = root or tempfile.mkdtemp(prefix="model-selection-")
+        self.folds = folds
+        splitter = StratifiedKFold(n_splits=folds, shuffle=True, random_state=seed)
+        for fold, (train_idx, test_idx) in enumerate(splitter.split(X, y)):
+            self._save(fold, "y_train", y[train_idx])
+            self._save(fold, "y_test", y[test_idx])
+            self._save(fold, "raw_train", X[train_idx])
+            self._save(fold, "raw_test", X[test_idx])
+            # scaler di-fit hanya pada data train fold itu (tanpa bocor ke test)
+            scaler = StandardScaler().fit(X[train_idx])
+            self._save(fold, "standard_train", scaler.transform(X[train_idx]))
+            self._save(fold, "standard_test", scaler.transform(X[test_idx]))
+
+    def _path(self, fold, name):
+        return os.path.join(self.root, f"fold{fold}-{name}.npy")
+
+    def _save(self, fold, name, array):
+        np.save(self._path(fold, name), np.ascontiguousarray(array))
+
+    def load(self, fold, prep):
+        """(X_train, y_train, X_test, y_test) sebagai memmap read-only."""
+        return tuple(
+            np.load(self._path(fold, name), mmap_mode="r")
+            for name in (f"{prep}_train", "y_train", f"{prep}_test", "y_test")
+        )
+
+    def cleanup(self):
+        shutil.rmtree(self.root, ignore_errors=True)
+
+
+# ==============================
+# METRIK
+# ==============================
+def calibration_error(y, probs, bins=CALIBRATION_BINS):
+    """Expected calibration error: rata-rata |frekuensi positif - probabilitas| per bin, berbobot jumlah."""
+    edges = np.linspace(0.0, 1.0, bins + 1)
+    which = np.clip(np.digitize(probs, edges[1:-1]), 0, bins - 1)
+    ece = 0.0
+    for b in range(bins):
+        mask = which == b
+        if mask.any():
+            ece += mask.mean() * abs(y[mask].mean() - probs[mask].mean())
+    return float(ece)
+
+
+def score_probs(y, probs):
+    from sklearn.metrics import brier_score_loss, log_loss, roc_auc_score
+
+    probs = np.clip(probs, 1e-15, 1 - 1e-15)
+    return {
+        "auc": float(roc_auc_score(y, probs)),
+        "log_loss": float(log_loss(y, probs, labels=[0, 1])),
+        "brier": float(brier_score_loss(y, probs)),
+        "ece": calibration_error(y, probs),
+        "accuracy": float(np.mean((probs > 0.5) == y)),
+    }
+
+
+def evaluate_fold(cache, name, params, fold):
+    """Task joblib: fit satu konfigurasi pada satu fold, skor di fold test."""
+    factory, prep = CANDIDATES[name][:2]
+    X_train, y_train, X_test, y_test = cache.load(fold, prep)
+    model = factory(**params)
+    t0 = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_s = time.perf_counter() - t0
+    probs = model.predict_proba(X_test)[:, 1]
+    return {"name": name, "params": params, "fold": fold, "fit_seconds": fit_s, **score_probs(np.asarray(y_test), probs)}
+
+
+# ==============================
+# MODEL FINAL + LATENCY
+# ==============================
+def fit_final(name, params, X, y, features):
+    """
+    Fit konfigurasi pada seluruh data dan bungkus sebagai engine yang akan
+    dipakai di produksi: LinearModelEngine untuk kandidat linear (scaler
+    dilipat ke koefisien), SklearnModelEngine untuk lainnya.
+    """
+    import pandas as pd
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    factory, prep, linear = CANDIDATES[name][:3]
+    if linear:
+        model = factory(**params)
+        if prep == "standard":
+            scaler = StandardScaler().fit(X)
+            model.fit(scaler.transform(X), y)
+            engine = engine_from_scaled(scaler, model, features)
+            X_check = scaler.transform(X)
+        else:
+            model.fit(X, y)
+            engine = LinearModelEngine(model.coef_[0], model.intercept_[0], features, classes=model.classes_)
+            X_check = X
+        # engine harus memberi probabilitas yang sama dengan model sklearn-nya
+        max_diff = float(np.max(np.abs(model.predict_proba(X_check)[:, 1] - engine.predict(X)[1])))
+        if max_diff > 1e-9:
+            raise ValueError(f"Probabilitas engine {name} berbeda dari sklearn (max diff {max_diff:.3g})")
+        return engine
+
+    # fit dengan DataFrame supaya feature_names_in_ ikut tersimpan di .pkl
+    model = factory(**params)
+    if prep == "standard":
+        model = make_pipeline(StandardScaler(), model)
+    model.fit(pd.DataFrame(X, columns=features), y)
+    return SklearnModelEngine(model, version=f"pkl-{name}")
+
+
+def measure_latency(engine, X, single_repeat=300, batch_rows=1024, batch_repeat=5, budget_s=1.0):
+    """
+    Latency inference engine produksi: satu baris (seperti /predict tanpa
+    batching, median dan p99) dan per baris untuk batch (micro-batch/import).
+    """
+    import warnings
+
+    rng = np.random.default_rng(0)
+    rows = X[rng.integers(0, len(X), single_repeat)]
+    batch = X[rng.integers(0, len(X), batch_rows)]
+    with warnings.catch_warnings():
+        # model .pkl di-fit dengan nama fitur; engine memberi ndarray
+        warnings.simplefilter("ignore", UserWarning)
+        engine.predict(rows[:1])  # warm-up
+        single = []
+        deadline = time.perf_counter() + budget_s
+        for i in range(single_repeat):
+            t0 = time.perf_counter()
+            engine.predict(rows[i:i + 1])
+            single.append(time.perf_counter() - t0)
+            # model lambat (hutan besar) cukup diukur sampai budget habis
+            if i >= 20 and t0 > deadline:
+                break
+        batch_times = []
+        for _ in range(batch_repeat):
+            t0 = time.perf_counter()
+            engine.predict(batch)
+            batch_times.append(time.perf_counter() - t0)
+    single = np.asarray(single) * 1e6
+    return {
+        "single_p50_us": round(float(np.percentile(single, 50)), 2),
+        "single_p99_us": round(float(np.percentile(single, 99)), 2),
+        "batch_per_row_us": round(min(batch_times) / batch_rows * 1e6, 3),
+    }
+
+
+# ==============================
+# SELEKSI
+# ==============================
+def aggregate(fold_results):
+    """Rata-rata (dan std AUC) per konfigurasi dari hasil semua fold."""
+    grouped = {}
+    for r in fold_results:
+        grouped.setdefault(config_label(r["name"], r["params"]), []).append(r)
+    rows = []
+    for label, results in grouped.items():
+        auc = np.array([r["auc"] for r in results])
+        row = {"label": label, "name": results[0]["name"], "params": results[0]["params"], "folds": len(results)}
+        row["auc"] = round(float(auc.mean()), 4)
+        row["auc_std"] = round(float(auc.std()), 4)
+        for key in ("log_loss", "brier", "ece", "accuracy"):
+            row[key] = round(float(np.mean([r[key] for r in results])), 4)
+        row["fit_seconds"] = round(float(np.mean([r["fit_seconds"] for r in results])), 4)
+        rows.append(row)
+    return rows
+
+
+def choose(rows, max_latency_us, auc_tolerance, max_ece):
+    """
+    Aturan pemilihan:
+      1. buang kandidat dengan latency satu baris (p50) di atas max_latency_us
+         atau ECE di atas max_ece,
+      2. dari sisanya ambil semua yang AUC-nya dalam auc_tolerance dari AUC
+         terbaik,
+      3. dari situ ambil yang latency-nya <= LATENCY_SLACK x yang tercepat
+         (selisih di bawah itu hanya noise pengukuran),
+      4. pilih AUC tertinggi (lalu log loss terkecil).
+    Mengembalikan (pemenang atau None, alasan per kandidat yang gugur).
+    """
+    rejected = {}
+    eligible = []
+    for row in rows:
+        reasons = []
+        if row["latency"]["single_p50_us"] > max_latency_us:
+            reasons.append(f"latency {row['latency']['single_p50_us']}us > {max_latency_us}us")
+        if row["ece"] > max_ece:
+            reasons.append(f"ece {row['ece']} > {max_ece}")
+        if reasons:
+            rejected[row["label"]] = reasons
+        else:
+            eligible.append(row)
+    if not eligible:
+        return None, rejected
+
+    best_auc = max(row["auc"] for row in eligible)
+    shortlist = [row for row in eligible if row["auc"] >= best_auc - auc_tolerance]
+    for row in eligible:
+        if row not in shortlist:
+            rejected[row["label"]] = [f"auc {row['auc']} < {best_auc} - {auc_tolerance}"]
+    fastest = min(row["latency"]["single_p50_us"] for row in shortlist)
+    for row in shortlist:
+        if row["latency"]["single_p50_us"] > fastest * LATENCY_SLACK:
+            rejected[row["label"]] = [f"latency {row['latency']['single_p50_us']}us > {LATENCY_SLACK} x {fastest}us"]
+    shortlist = [row for row in shortlist if row["label"] not in rejected]
+    winner = min(shortlist, key=lambda r: (-r["auc"], r["log_loss"]))
+    return winner, rejected
+
+
+def run_selection(X, y, features, names=None, folds=5, n_jobs=-1, seed=0,
+                  max_latency_us=500.0, auc_tolerance=0.005, max_ece=0.1):
+    """
+    Cross-validation paralel (joblib, satu task per konfigurasi x fold),
+    latency tiap konfigurasi diukur berurutan di proses utama agar tidak
+    terganggu task lain. Mengembalikan (report, engine pemenang atau None).
+    """
+    from joblib import Parallel, delayed
+
+    X = np.asarray(X, dtype=np.float64)
+    y = np.asarray(y).astype(int)
+    configs = expand_grid(names)
+    cache = FoldCache(X, y, folds=folds, seed=seed)
+    try:
+        started = time.perf_counter()
+        fold_results = Parallel(n_jobs=n_jobs)(
+            delayed(evaluate_fold)(cache, name, params, fold)
+            for name, params in configs
+            for fold in range(folds)
+        )
+        cv_s = time.perf_counter() - started
+    finally:
+        cache.cleanup()
+
+    rows = aggregate(fold_results)
+    engines = {}
+    for row in rows:
+        engine = fit_final(row["name"], row["params"], X, y, features)
+        row["artifact"] = "npz" if isinstance(engine, LinearModelEngine) else "pkl"
+        row["latency"] = measure_latency(engine, X)
+        engines[row["label"]] = engine
+    rows.sort(key=lambda r: -r["auc"])
+
+    winner, rejected = choose(rows, max_latency_us, auc_tolerance, max_ece)
+    report = {
+        "rows": int(len(y)),
+        "folds": folds,
+        "configs": len(configs),
+        "cv_seconds": round(cv_s, 2),
+        "criteria": {"max_latency_us": max_latency_us, "auc_tolerance": auc_tolerance, "max_ece": max_ece},
+        "candidates": rows,
+        "rejected": rejected,
+        "winner": winner["label"] if winner else None,
+    }
+    return report, (engines[winner["label"]] if winner else None)
+
+
+def format_table(report):
+    header = f"{'kandidat':48s} {'auc':>7s} {'±':>6s} {'logloss':>8s} {'ece':>6s} {'fit ms':>8s} {'1row us':>8s} {'batch us':>9s}"
+    lines = [header, "-" * len(header)]
+    for row in report["candidates"]:
+        mark = "*" if row["label"] == report["winner"] else " "
+        lines.append(
+            f"{mark}{row['label'][:47]:47s} {row['auc']:7.4f} {row['auc_std']:6.4f} {row['log_loss']:8.4f} "
+            f"{row['ece']:6.3f} {row['fit_seconds'] * 1000:8.1f} {row['latency']['single_p50_us']:8.1f} "
+            f"{row['latency']['batch_per_row_us']:9.3f}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,17 @@
+import os
+from functools import lru_cache
+
+import pandas as pd
+
+
+NUTRITION_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "nutrition.csv")
+
+
+@lru_cache(maxsize=None)
+def load_nutrition(path=NUTRITION_PATH):
+    """
+    Katalog nutrisi, dibaca dan di-parse sekali per proses lalu dipakai
+    bersama oleh ml/recomendation_service.py dan ml/similar_food_service.py.
+    Frame ini dibagi: jangan diubah in-place.
+    """
+    return pd.read_csv(path)
@@ -1,29 +1,147 @@
+import asyncio
 import os
-import pickle
+import time
 import numpy as np
+from dotenv import load_dotenv
 
-# Path model dinamis, selalu benar meskipun dijalankan dari folder manapun
+from ml.batch_scheduler import MicroBatchScheduler
+from ml.model_registry import ModelRegistry
+from ml.prediction_cache import PredictionCache
+from services.metrics import metrics
+
+load_dotenv()
+
+# Path model dinamis, selalu benar meskipun dijalankan dari folder manapun.
+# Model aktif diambil dari registry (ml/registry/ACTIVE). Saat registry masih
+# kosong, model.npz (hasil `python -m ml.train_model --export-only`) didaftarkan
+# sebagai versi pertama; model.pkl hanya fallback dan butuh sklearn.
+ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), "model.npz")
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "model.pkl")
-with open(MODEL_PATH, "rb") as file:
-    model = pickle.load(file)
+REGISTRY_DIR = os.getenv("MODEL_REGISTRY_DIR") or os.path.join(os.path.dirname(__file__), "registry")
+
+# urutan fitur harus sama dengan saat training (ml/train_model.py)
+FEATURES = ["Pregnancies", "Glucose", "BloodPressure", "BMI", "DiabetesPedigreeFunction"]
+
+
+def _check_features(engine):
+    if engine.features is not None and engine.features != FEATURES:
+        raise ValueError(f"Urutan fitur model {engine.features} tidak sesuai {FEATURES}")
+
+
+registry = ModelRegistry(
+    REGISTRY_DIR,
+    bootstrap_paths=[ARTIFACT_PATH, MODEL_PATH],
+    validate=_check_features,
+)
+registry.reload()
+
+
+def _to_row(data):
+    return [float(getattr(data, name)) for name in FEATURES]
+
+
+def _timed_predict(engine, X_new, path):
+    started = time.perf_counter()
+    preds, probs = engine.predict(X_new)
+    metrics.observe_inference(path, time.perf_counter() - started, len(X_new))
+    return preds, probs
+
+
+def _score_matrix(X_new, path="predict"):
+    # ambil referensi engine sekali supaya satu batch selalu diskor oleh satu
+    # versi model, meskipun registry sedang swap
+    engine = registry.active
+
+    # satu pass untuk seluruh matrix: probabilitas dan kelas sekaligus
+    preds, probs = _timed_predict(engine, X_new, path)
+
+    return [
+        {
+            "prediction": int(pred),
+            "probability": round(float(prob) * 100, 2),
+            "model_version": engine.version,
+        }
+        for pred, prob in zip(preds, probs)
+    ]
+
+
+# Micro-batching: request /predict yang datang bersamaan digabung jadi satu
+# matrix. Matikan dengan PREDICT_BATCHING=0.
+scheduler = MicroBatchScheduler(
+    _score_matrix,
+    max_batch=int(os.getenv("PREDICT_BATCH_MAX_ROWS", "64")),
+    max_wait_ms=float(os.getenv("PREDICT_BATCH_WINDOW_MS", "2")),
+    enabled=os.getenv("PREDICT_BATCHING", "1").lower() not in ("0", "false", "no", "off"),
+)
+
+
+# Cache hasil untuk input yang sama/hampir sama. Key memuat versi model dan
+# seluruh isi cache dibuang saat registry berganti model.
+# PREDICT_CACHE_SIZE=0 mematikan cache.
+prediction_cache = PredictionCache(
+    maxsize=int(os.getenv("PREDICT_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("PREDICT_CACHE_TTL", "3600")),
+)
+registry.on_swap(lambda old, new: prediction_cache.clear())
+
+
+def _cached(row):
+    cached = prediction_cache.get(prediction_cache.key(registry.active.version, row))
+    return dict(cached) if cached is not None else None
+
+
+def _remember(row, result):
+    # simpan dengan versi yang benar-benar menskor (bisa beda jika terjadi swap)
+    prediction_cache.put(prediction_cache.key(result["model_version"], row), dict(result))
+    return result
+
 
 def predict_diabetes(data):
-    # ubah data ke format array
-    X_new = np.array([[ 
-        data.Pregnancies,
-        data.Glucose,
-        data.BloodPressure,
-        data.BMI,
-        data.DiabetesPedigreeFunction
-    ]])
-
-    # probabilitas kelas 1 (diabetes)
-    prob = model.predict_proba(X_new)[0][1]
-
-    # prediksi binary 0/1
-    pred = int(model.predict(X_new)[0])
-
-    return {
-        "prediction": pred,
-        "probability": round(prob * 100, 2)
-    }
\ No newline at end of file
+    # ubah data ke satu baris fitur; scheduler yang menyusun matrix-nya.
+    # Baris mentah yang diskor, sama seperti /predict/batch dan import.
+    row = _to_row(data)
+
+    cached = _cached(row)
+    if cached is not None:
+        return cached
+
+    return _remember(row, scheduler.predict(row))
+
+
+async def predict_diabetes_async(data):
+    """Versi async predict_diabetes: menunggu hasil scheduler tanpa memblok event loop."""
+    row = _to_row(data)
+
+    cached = _cached(row)
+    if cached is not None:
+        return cached
+
+    if scheduler.enabled:
+        result = await asyncio.wrap_future(scheduler.submit(row))
+    else:
+        result = scheduler.predict(row)
+    return _remember(row, result)
+
+
+def predict_diabetes_batch(rows):
+    """
+    Skoring banyak baris sekaligus dengan satu pass inference.
+    `rows` adalah list objek dengan atribut yang sama seperti PredictInput.
+    Mengembalikan list dict {"prediction", "probability"} dengan urutan yang sama.
+    """
+    if not rows:
+        return []
+
+    X_new = np.array([_to_row(r) for r in rows], dtype=float)
+    return _score_matrix(X_new, path="batch")
+
+
+def predict_matrix(X_new):
+    """
+    Skoring matrix fitur (n, len(FEATURES)) tanpa membuat dict per baris,
+    untuk jumlah baris besar (import). Mengembalikan (prediction int array,
+    probability persen 2 desimal, versi model).
+    """
+    engine = registry.active
+    preds, probs = _timed_predict(engine, np.asarray(X_new, dtype=float), "import")
+    return np.asarray(preds, dtype=int), np.round(np.asarray(probs, dtype=float) * 100, 2), engine.version
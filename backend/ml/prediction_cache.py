@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import OrderedDict
+
+# presisi normalisasi per fitur (urutan sama dengan FEATURES di predict_service);
+# input yang berbeda di bawah presisi ini dianggap identik
+NORMALIZE_DECIMALS = (0, 1, 1, 2, 3)
+
+
+def normalize(row):
+    """Baris fitur dibulatkan per NORMALIZE_DECIMALS, dipakai hanya untuk key."""
+    # + 0.0 menyamakan -0.0 dan 0.0
+    return [round(float(v), d) + 0.0 for v, d in zip(row, NORMALIZE_DECIMALS)]
+
+
+class PredictionCache:
+    """
+    Cache LRU + TTL untuk hasil prediksi, key = (versi model, vektor fitur
+    ternormalisasi). maxsize=0 mematikan cache.
+
+    Inference selalu memakai baris mentah. Hanya baris yang sudah berada di
+    grid NORMALIZE_DECIMALS (presisi input aplikasi) yang di-cache, sehingga
+    hasil cache sama persis dengan skoring ulang; baris lain dilewatkan
+    (key None) dan dihitung sebagai `bypassed`.
+    """
+
+    def __init__(self, maxsize=10000, ttl=3600.0):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypassed = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    @staticmethod
+    def key(version, row):
+        normalized = normalize(row)
+        if normalized != [float(v) for v in row]:
+            return None
+        return (version,) + tuple(normalized)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        if key is None:
+            with self._lock:
+                self.bypassed += 1
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, value):
+        if not self.enabled or key is None:
+            return
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else None,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "bypassed": self.bypassed,
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = self.misses = self.evictions = self.expirations = self.bypassed = 0
@@ -1,31 +1,117 @@
-import os
-import pandas as pd
+import numpy as np
 
+from ml.nutrition_data import load_nutrition
 
-NUTRITION_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "nutrition.csv")
-nutrition_df = pd.read_csv(NUTRITION_PATH)
 
+nutrition_df = load_nutrition()
 
-def generate_food_recommendation(data):
-    df = nutrition_df.copy()
+# Filtering rules: (atribut input, ambang input, kolom nutrisi, batas maksimal).
+# Bit ke-i pada kombinasi = rule ke-i aktif.
+RULES = [
+    ("Glucose", 140, "Carbohydrates (g)", 20),
+    ("BloodPressure", 90, "Sodium (mg)", 200),
+    ("BMI", 30, "Fat (g)", 10),
+    ("DiabetesPedigreeFunction", 0.7, "Cholesterol (mg)", 50),
+]
+
+# Skor ranking yang bisa dipilih: nama -> (kolom, descending)
+SCORES = {
+    "health": ("HealthScore", True),
+    "protein": ("Protein (g)", True),
+    "low_carb": ("Carbohydrates (g)", False),
+    "low_sodium": ("Sodium (mg)", False),
+    "low_fat": ("Fat (g)", False),
+    "low_cholesterol": ("Cholesterol (mg)", False),
+    "low_energy": ("Energy (kJ)", False),
+}
+DEFAULT_SCORE = "health"
+
+# Kolom bertipe float32 dan nama menu, dibaca sekali saat startup
+MENUS = nutrition_df["Menu"].tolist()
+SCORE_VALUES = {
+    name: nutrition_df[column].to_numpy(dtype=np.float32) for name, (column, _) in SCORES.items()
+}
+
+
+def _rank(ids, score):
+    # urut berdasarkan skor; urutan CSV jadi tie-breaker supaya hasil stabil
+    _, descending = SCORES[score]
+    values = SCORE_VALUES[score][ids]
+    order = np.lexsort((ids, -values if descending else values))
+    return ids[order]
+
+
+def _build_index(df):
+    """
+    Precompute 16 kombinasi rule: untuk setiap kombinasi simpan row id yang
+    lolos semua rule aktif, sudah diurutkan dengan skor default, beserta
+    list nama menunya.
+    """
+    masks = [
+        df[column].to_numpy(dtype=np.float32) <= limit
+        for _, _, column, limit in RULES
+    ]
+    all_ids = np.arange(len(df), dtype=np.int32)
 
-    # Filtering rules
-    filters = []
+    index, menus = [], []
+    for bits in range(1 << len(RULES)):
+        keep = np.ones(len(df), dtype=bool)
+        for i, mask in enumerate(masks):
+            if bits & (1 << i):
+                keep &= mask
+        ids = _rank(all_ids[keep], DEFAULT_SCORE)
+        index.append(ids)
+        menus.append([MENUS[i] for i in ids])
+    return index, menus
 
-    if data.Glucose > 140:
-        df = df[df["Carbohydrates (g)"] <= 20]
 
-    if data.BloodPressure > 90:
-        df = df[df["Sodium (mg)"] <= 200]
+COMBINATION_INDEX, COMBINATION_MENUS = _build_index(nutrition_df)
 
-    if data.BMI > 30:
-        df = df[df["Fat (g)"] <= 10]
 
-    if data.DiabetesPedigreeFunction > 0.7:
-        df = df[df["Cholesterol (mg)"] <= 50]
+def rule_bits(data):
+    bits = 0
+    for i, (attr, threshold, _, _) in enumerate(RULES):
+        value = getattr(data, attr)
+        if value is not None and value > threshold:
+            bits |= 1 << i
+    return bits
 
-    # Limit 10 foods
-    df = df.head(10)
 
-    # Return list of food names
-    return df["Menu"].tolist()
\ No newline at end of file
+def recommend_foods(data, limit=10, offset=0, score=DEFAULT_SCORE):
+    """
+    Kembalikan (list nama menu, total kandidat) untuk satu halaman.
+    Skor default memakai urutan yang sudah diprecompute (cukup slice);
+    skor lain memakai partial sort sebanyak offset + limit.
+    """
+    if score not in SCORES:
+        raise ValueError(f"Unknown score '{score}', choose one of {sorted(SCORES)}")
+
+    bits = rule_bits(data)
+    ids = COMBINATION_INDEX[bits]
+    total = len(ids)
+
+    if score == DEFAULT_SCORE:
+        return COMBINATION_MENUS[bits][offset:offset + limit], total
+
+    k = min(offset + limit, total)
+    if k <= 0:
+        return [], total
+
+    _, descending = SCORES[score]
+    values = SCORE_VALUES[score][ids]
+    if k < total:
+        # partial sort: cari nilai ke-k (O(n)), lalu urutkan kandidat saja;
+        # nilai yang sama dengan batas ikut supaya tie-breaker tetap konsisten
+        keys = -values if descending else values
+        kth = np.partition(keys, k - 1)[k - 1]
+        top = ids[keys <= kth]
+    else:
+        top = ids
+    ranked = _rank(top, score)
+    return [MENUS[i] for i in ranked[offset:k]], total
+
+
+def generate_food_recommendation(data):
+    # Limit 10 foods, ranked by HealthScore
+    foods, _ = recommend_foods(data, limit=10)
+    return foods
@@ -0,0 +1,385 @@
+"""
+Retraining inkremental dari data berlabel (kolom predictions.outcome atau
+file CSV dengan kolom Outcome) memakai SGDClassifier(loss="log_loss") dan
+partial_fit. Data dibaca per chunk sehingga memori tidak bergantung pada
+jumlah baris:
+
+  1. pass pertama mengisi StandardScaler (partial_fit) dari data training,
+  2. tiap epoch membaca ulang sumber dan memanggil partial_fit per chunk,
+  3. sebagian baris (dipilih deterministik dari id/nomor baris) tidak pernah
+     dipakai training; sampel terbatas (reservoir) dari baris itu menjadi
+     holdout untuk model baru maupun model aktif di registry.
+
+State (scaler, model, epoch, posisi chunk) di-checkpoint berkala sehingga
+proses yang terputus bisa dilanjutkan dengan --resume. Artifact baru hanya
+dipublikasikan ke registry jika AUC dan log loss holdout tidak lebih buruk
+dari model aktif (dengan toleransi). Scaler dilipat ke koefisien sehingga
+hasilnya tetap artifact .npz linear biasa untuk ml/predict_service.
+
+Jalankan dari folder backend/:
+    python -m ml.retrain [--source db | --csv data/diabetes.csv ...]
+                         [--epochs 5] [--chunk-rows 20000] [--holdout 0.1]
+                         [--resume] [--dry-run] [--no-activate] [--force]
+"""
+import argparse
+import itertools
+import json
+import os
+import pickle
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from ml.inference_engine import engine_from_scaled
+
+# urutan fitur sama dengan ml/train_model.py dan ml/predict_service.py
+FEATURES = ["Pregnancies", "Glucose", "BloodPressure", "BMI", "DiabetesPedigreeFunction"]
+LABEL = "Outcome"
+# kolom tabel predictions untuk FEATURES
+DB_COLUMNS = ["pregnancies", "glucose", "blood_pressure", "bmi", "dpf"]
+
+CHECKPOINT_PATH = os.getenv("RETRAIN_CHECKPOINT") or os.path.join(
+    os.path.dirname(__file__), "checkpoints", "retrain.pkl"
+)
+CHUNK_ROWS = int(os.getenv("RETRAIN_CHUNK_ROWS", "20000"))
+HOLDOUT_FRACTION = float(os.getenv("RETRAIN_HOLDOUT", "0.1"))
+HOLDOUT_MAX_ROWS = int(os.getenv("RETRAIN_HOLDOUT_MAX_ROWS", "100000"))
+# checkpoint setiap N chunk training
+CHECKPOINT_EVERY = int(os.getenv("RETRAIN_CHECKPOINT_EVERY", "10"))
+
+
+# ==============================
+# SUMBER DATA
+# ==============================
+class DatabaseSource:
+    """Baris predictions dengan outcome, dibaca urut id lewat server-side cursor."""
+
+    def __init__(self, chunk_rows=CHUNK_ROWS):
+        self.chunk_rows = chunk_rows
+
+    def describe(self):
+        from config.db import DATABASE_URL
+        from sqlalchemy.engine import make_url
+        return {"source": "db", "database": make_url(DATABASE_URL).get_backend_name()}
+
+    def chunks(self, after=None):
+        """
+        Yield (keys, X, y) per chunk; keys = id baris (naik) untuk split
+        holdout dan posisi resume. `after` = lewati id <= after.
+        """
+        from sqlalchemy import select
+
+        from config.db import engine
+        import models.user  # noqa: F401  (mapper relationship Prediction.user)
+        from models.prediction import Prediction as P
+
+        stmt = (
+            select(P.id, *(getattr(P, c) for c in DB_COLUMNS), P.outcome)
+            .where(P.outcome.isnot(None), *(getattr(P, c).isnot(None) for c in DB_COLUMNS))
+            .order_by(P.id)
+            .execution_options(yield_per=self.chunk_rows)
+        )
+        if after is not None:
+            stmt = stmt.where(P.id > after)
+        with engine.connect() as conn:
+            width = len(DB_COLUMNS) + 2
+            for rows in conn.execute(stmt).partitions():
+                # np.asarray(list of Row) ~100x lebih lambat daripada fromiter datar
+                data = np.fromiter(
+                    itertools.chain.from_iterable(rows), dtype=np.float64, count=len(rows) * width
+                ).reshape(-1, width)
+                yield data[:, 0].astype(np.int64), data[:, 1:-1], data[:, -1].astype(int)
+
+
+class CsvSource:
+    """File CSV berheader FEATURES + Outcome (format data/diabetes.csv), dibaca per chunk."""
+
+    def __init__(self, paths, chunk_rows=CHUNK_ROWS):
+        self.paths = list(paths)
+        self.chunk_rows = chunk_rows
+
+    def describe(self):
+        return {"source": "csv", "files": [os.path.abspath(p) for p in self.paths]}
+
+    def chunks(self, after=None):
+        import pandas as pd
+
+        for file_index, path in enumerate(self.paths):
+            base = np.int64(file_index) << 40
+            if after is not None and after >= base + (np.int64(1) << 40):
+                continue  # seluruh file sudah diproses
+            for frame in pd.read_csv(path, usecols=FEATURES + [LABEL], chunksize=self.chunk_rows):
+                # key stabil per (file, nomor baris); index pandas berlanjut antar chunk
+                keys = base + frame.index.to_numpy(dtype=np.int64)
+                if after is not None:
+                    if keys[-1] <= after:
+                        continue
+                    frame, keys = frame[keys > after], keys[keys > after]
+                valid = frame.notna().all(axis=1).to_numpy()
+                frame = frame[valid]
+                yield (
+                    keys[valid],
+                    frame[FEATURES].to_numpy(dtype=np.float64),
+                    frame[LABEL].to_numpy().astype(int),
+                )
+
+
+def holdout_mask(keys, fraction):
+    """Baris holdout dipilih dari hash key (stabil antar epoch dan antar run)."""
+    if fraction <= 0:
+        return np.zeros(len(keys), dtype=bool)
+    # hash multiplikatif 64-bit -> [0, 1)
+    h = (keys.astype(np.uint64) * np.uint64(0x9E3779B97F4A7C15)) >> np.uint64(11)
+    return (h.astype(np.float64) / float(1 << 53)) < fraction
+
+
+class Reservoir:
+    """Sampel acak berukuran tetap dari aliran baris holdout (algorithm R)."""
+
+    def __init__(self, size, seed=0):
+        self.size = size
+        self.seen = 0
+        self.X = np.empty((size, len(FEATURES)))
+        self.y = np.empty(size, dtype=int)
+        self.rng = np.random.default_rng(seed)
+
+    def add(self, X, y):
+        # isi slot kosong dulu, sisanya menggantikan slot acak dengan peluang size/seen
+        free = max(min(self.size - self.seen, len(X)), 0)
+        self.X[self.seen:self.seen + free] = X[:free]
+        self.y[self.seen:self.seen + free] = y[:free]
+        rest = len(X) - free
+        if rest:
+            seen = self.seen + free + np.arange(rest)
+            j = self.rng.integers(0, seen + 1)
+            keep = j < self.size
+            # index duplikat: assignment numpy memakai yang terakhir, sama seperti urutan sekuensial
+            self.X[j[keep]] = X[free:][keep]
+            self.y[j[keep]] = y[free:][keep]
+        self.seen += len(X)
+
+    def data(self):
+        n = min(self.seen, self.size)
+        return self.X[:n], self.y[:n]
+
+
+# ==============================
+# TRAINING
+# ==============================
+def new_state(args):
+    from sklearn.linear_model import SGDClassifier
+    from sklearn.preprocessing import StandardScaler
+
+    return {
+        "scaler": StandardScaler(),
+        "model": SGDClassifier(
+            loss="log_loss", penalty="l2", alpha=args.alpha,
+            learning_rate="optimal", average=True, random_state=args.seed,
+        ),
+        # epoch 0 = pass scaler; 1..epochs = pass SGD
+        "epoch": 0,
+        "last_key": None,  # key terakhir yang sudah diproses pada epoch ini
+        "rows_trained": 0,
+        "holdout": None,
+        "config": {"epochs": args.epochs, "chunk_rows": args.chunk_rows, "holdout": args.holdout, "alpha": args.alpha},
+    }
+
+
+def save_checkpoint(state, path):
+    # tulis ke file sementara lalu rename supaya checkpoint tidak pernah setengah jadi
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+    with os.fdopen(fd, "wb") as f:
+        pickle.dump(state, f)
+    os.replace(tmp, path)
+
+
+def load_checkpoint(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def train(source, state, args, checkpoint_path):
+    """
+    Jalankan pass yang tersisa mulai dari state['epoch'] / state['last_key'].
+    Reservoir holdout diisi pada pass scaler (epoch 0) dan disimpan di state.
+    """
+    rng = np.random.default_rng(args.seed)
+    reservoir = None
+    if state["holdout"] is None:
+        reservoir = Reservoir(args.holdout_max, seed=args.seed)
+
+    while state["epoch"] <= args.epochs:
+        epoch = state["epoch"]
+        started = time.perf_counter()
+        chunks = 0
+        for keys, X, y in source.chunks(after=state["last_key"]):
+            if not len(keys):
+                continue
+            held = holdout_mask(keys, args.holdout)
+            if epoch == 0:
+                if reservoir is not None and held.any():
+                    reservoir.add(X[held], y[held])
+                if (~held).any():
+                    state["scaler"].partial_fit(X[~held])
+            elif (~held).any():
+                X_train, y_train = X[~held], y[~held]
+                order = rng.permutation(len(y_train))
+                state["model"].partial_fit(
+                    state["scaler"].transform(X_train[order]), y_train[order], classes=np.array([0, 1])
+                )
+                state["rows_trained"] += len(y_train)
+
+            state["last_key"] = int(keys[-1])
+            chunks += 1
+            # reservoir belum lengkap sebelum pass scaler selesai, jadi epoch 0
+            # tidak di-checkpoint di tengah jalan (resume mengulang pass itu)
+            if epoch > 0 and chunks % CHECKPOINT_EVERY == 0:
+                save_checkpoint(state, checkpoint_path)
+
+        if epoch == 0:
+            if reservoir is not None:
+                state["holdout"] = reservoir.data()
+            if not hasattr(state["scaler"], "mean_"):
+                raise SystemExit("Tidak ada data berlabel untuk training")
+        print(f"epoch {epoch} selesai dalam {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        state["epoch"] += 1
+        state["last_key"] = None
+        save_checkpoint(state, checkpoint_path)
+    return state
+
+
+# ==============================
+# EVALUASI
+# ==============================
+def evaluate(engine, X, y):
+    from sklearn.metrics import log_loss, roc_auc_score, brier_score_loss
+
+    preds, probs = engine.predict(X)
+    probs = np.clip(probs, 1e-15, 1 - 1e-15)
+    return {
+        "rows": int(len(y)),
+        "auc": float(roc_auc_score(y, probs)) if len(np.unique(y)) == 2 else None,
+        "log_loss": float(log_loss(y, probs, labels=[0, 1])),
+        "brier": float(brier_score_loss(y, probs)),
+        "accuracy": float(np.mean(preds == y)),
+    }
+
+
+def regression_reasons(candidate, baseline, max_auc_drop, max_log_loss_increase):
+    """Alasan model baru ditolak; list kosong = boleh dipublikasikan."""
+    reasons = []
+    if baseline is None:
+        return reasons
+    if candidate["auc"] is not None and baseline["auc"] is not None:
+        if candidate["auc"] < baseline["auc"] - max_auc_drop:
+            reasons.append(f"auc {candidate['auc']:.4f} < aktif {baseline['auc']:.4f} - {max_auc_drop}")
+    if candidate["log_loss"] > baseline["log_loss"] + max_log_loss_increase:
+        reasons.append(
+            f"log_loss {candidate['log_loss']:.4f} > aktif {baseline['log_loss']:.4f} + {max_log_loss_increase}"
+        )
+    return reasons
+
+
+def source_fingerprint(source, args):
+    raw = json.dumps([source.describe(), args.epochs, args.chunk_rows, args.holdout, args.alpha], sort_keys=True)
+    return f"{zlib.crc32(raw.encode()):08x}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m ml.retrain")
+    parser.add_argument("--source", choices=["db", "csv"], default=None)
+    parser.add_argument("--csv", nargs="+", default=None, help="file CSV berlabel (implikasi --source csv)")
+    parser.add_argument("--epochs", type=int, default=5)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--holdout", type=float, default=HOLDOUT_FRACTION, help="fraksi baris holdout")
+    parser.add_argument("--holdout-max", type=int, default=HOLDOUT_MAX_ROWS, help="maks baris holdout di memori")
+    parser.add_argument("--alpha", type=float, default=float(os.getenv("RETRAIN_ALPHA", "1e-3")), help="regularisasi L2 SGDClassifier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--checkpoint", default=CHECKPOINT_PATH)
+    parser.add_argument("--resume", action="store_true", help="lanjutkan dari checkpoint")
+    parser.add_argument("--max-auc-drop", type=float, default=0.005)
+    parser.add_argument("--max-log-loss-increase", type=float, default=0.01)
+    parser.add_argument("--dry-run", action="store_true", help="evaluasi saja, tanpa publish")
+    parser.add_argument("--no-activate", action="store_true", help="publish ke registry tanpa mengaktifkan")
+    parser.add_argument("--force", action="store_true", help="publish walaupun metrik turun")
+    args = parser.parse_args(argv)
+
+    if args.csv:
+        source = CsvSource(args.csv, args.chunk_rows)
+    elif args.source == "csv":
+        parser.error("--source csv butuh --csv FILE")
+    else:
+        source = DatabaseSource(args.chunk_rows)
+    fingerprint = source_fingerprint(source, args)
+
+    state = None
+    if args.resume and os.path.exists(args.checkpoint):
+        state = load_checkpoint(args.checkpoint)
+        if state.get("fingerprint") != fingerprint:
+            raise SystemExit("Checkpoint berasal dari sumber/konfigurasi lain; jalankan tanpa --resume")
+        print(f"lanjut dari epoch {state['epoch']} setelah key {state['last_key']}", file=sys.stderr)
+    if state is None:
+        state = new_state(args)
+        state["fingerprint"] = fingerprint
+
+    started = time.perf_counter()
+    state = train(source, state, args, args.checkpoint)
+    train_s = time.perf_counter() - started
+
+    X_hold, y_hold = state["holdout"]
+    if len(y_hold) == 0:
+        raise SystemExit("Holdout kosong; naikkan --holdout atau tambah data")
+    candidate = engine_from_scaled(state["scaler"], state["model"], FEATURES)
+
+    # lipatan scaler harus memberi probabilitas yang sama dengan pipeline aslinya
+    expected = state["model"].predict_proba(state["scaler"].transform(X_hold))[:, 1]
+    max_diff = float(np.max(np.abs(expected - candidate.predict(X_hold)[1])))
+    if max_diff > 1e-9:
+        raise SystemExit(f"Koefisien hasil lipatan scaler berbeda dari pipeline (max diff {max_diff:.3g})")
+
+    from ml.predict_service import registry
+
+    active = registry.active
+    report = {
+        "source": source.describe(),
+        "rows_trained": state["rows_trained"],
+        "epochs": args.epochs,
+        "train_seconds": round(train_s, 2),
+        "candidate": {"version": candidate.version, **evaluate(candidate, X_hold, y_hold)},
+        "active": {"version": active.version, **evaluate(active, X_hold, y_hold)},
+    }
+    reasons = regression_reasons(
+        report["candidate"], report["active"], args.max_auc_drop, args.max_log_loss_increase
+    )
+    report["regression"] = reasons
+    report["published"] = False
+
+    if args.dry_run:
+        pass
+    elif reasons and not args.force:
+        print("Model baru tidak dipublikasikan: " + "; ".join(reasons), file=sys.stderr)
+    else:
+        fd, tmp = tempfile.mkstemp(suffix=".npz")
+        os.close(fd)
+        try:
+            candidate.save(tmp)
+            version = registry.publish(tmp, activate=not args.no_activate)
+        finally:
+            os.remove(tmp)
+        report["published"] = True
+        report["activated"] = not args.no_activate
+        print(f"Versi {version} dipublikasikan ke registry {registry.root}", file=sys.stderr)
+
+    print(json.dumps(report, indent=2))
+    # checkpoint selesai tidak dipakai lagi; run berikutnya mulai dari awal
+    if os.path.exists(args.checkpoint):
+        os.remove(args.checkpoint)
+    return 0 if report["published"] or args.dry_run else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
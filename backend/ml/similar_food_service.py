@@ -0,0 +1,141 @@
+import numpy as np
+
+from ml.nutrition_data import load_nutrition
+
+
+NUTRIENTS = [
+    "Energy (kJ)",
+    "Carbohydrates (g)",
+    "Fat (g)",
+    "Sodium (mg)",
+    "Cholesterol (mg)",
+    "Protein (g)",
+]
+
+# Penyesuaian target per kondisi user:
+# (atribut prediksi, nilai mulai, nilai penuh, kolom nutrisi yang diturunkan)
+# Semakin tinggi nilai user di antara "mulai" dan "penuh", semakin dekat target
+# nutrisi itu ke persentil rendah katalog.
+ADJUSTMENTS = [
+    ("glucose", 100.0, 200.0, "Carbohydrates (g)"),
+    ("blood_pressure", 80.0, 110.0, "Sodium (mg)"),
+    ("bmi", 25.0, 40.0, "Fat (g)"),
+    ("bmi", 25.0, 40.0, "Energy (kJ)"),
+    ("dpf", 0.4, 1.2, "Cholesterol (mg)"),
+]
+LOW_PERCENTILE = 10
+
+
+class FoodSimilarityIndex:
+    """
+    Nearest-neighbour di atas profil nutrisi katalog. Matrix disimpan sudah
+    distandarisasi (float32) beserta squared norm tiap baris, sehingga jarak
+    euclid ke banyak target dihitung dengan satu perkalian matrix:
+        |x - t|^2 = |x|^2 - 2 x.t + |t|^2
+    """
+
+    def __init__(self, names, matrix):
+        matrix = np.asarray(matrix, dtype=np.float32)
+        self.names = list(names)
+        self.raw = matrix
+        self.mean = matrix.mean(axis=0)
+        std = matrix.std(axis=0)
+        self.std = np.where(std > 0, std, 1.0).astype(np.float32)
+        self.Z = np.ascontiguousarray((matrix - self.mean) / self.std, dtype=np.float32)
+        self.sq_norms = np.einsum("ij,ij->i", self.Z, self.Z)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        return cls(df["Menu"].tolist(), df[NUTRIENTS].to_numpy(dtype=np.float32))
+
+    def __len__(self):
+        return len(self.names)
+
+    def standardize(self, targets):
+        return (np.asarray(targets, dtype=np.float32) - self.mean) / self.std
+
+    def query_many(self, targets, k=10, chunk=32):
+        """
+        Untuk setiap baris target (dalam satuan asli), kembalikan (ids, jarak)
+        berbentuk (n_target, k), terurut dari yang terdekat. Target diproses
+        per `chunk` supaya matrix jarak sementara tetap kecil.
+        """
+        T = np.atleast_2d(self.standardize(targets))
+        k = max(1, min(int(k), len(self)))
+        ids = np.empty((len(T), k), dtype=np.int64)
+        dist = np.empty((len(T), k), dtype=np.float32)
+
+        for start in range(0, len(T), chunk):
+            block = T[start:start + chunk]
+            # |x|^2 - 2 x.t; |t|^2 konstan per target, cukup ditambahkan ke
+            # k kandidat terpilih
+            d2 = block @ self.Z.T
+            d2 *= -2.0
+            d2 += self.sq_norms
+
+            if k < len(self):
+                part = np.argpartition(d2, k - 1, axis=1)[:, :k]
+            else:
+                part = np.broadcast_to(np.arange(len(self)), d2.shape)
+            part_d2 = np.take_along_axis(d2, part, axis=1)
+            order = np.argsort(part_d2, axis=1, kind="stable")
+
+            best = np.take_along_axis(part_d2, order, axis=1)
+            best += np.einsum("ij,ij->i", block, block)[:, None]
+            np.maximum(best, 0.0, out=best)  # buang negatif kecil akibat pembulatan
+
+            ids[start:start + chunk] = np.take_along_axis(part, order, axis=1)
+            dist[start:start + chunk] = np.sqrt(best)
+        return ids, dist
+
+    def query(self, target, k=10):
+        ids, dist = self.query_many([target], k)
+        return ids[0], dist[0]
+
+
+def _severity(value, start, full):
+    if value is None:
+        return 0.0
+    return float(np.clip((float(value) - start) / (full - start), 0.0, 1.0))
+
+
+def build_target_profile(prediction, reference, low):
+    """
+    Target nutrisi dari prediksi terakhir user: mulai dari median makanan sehat
+    (reference), lalu nutrisi yang relevan dengan kondisi user digeser menuju
+    persentil rendah katalog (low) sesuai tingkat keparahannya.
+    """
+    target = dict(reference)
+    for attr, start, full, column in ADJUSTMENTS:
+        s = _severity(getattr(prediction, attr, None), start, full)
+        if s > 0:
+            target[column] = target[column] - s * (target[column] - low[column])
+    return target
+
+
+nutrition_df = load_nutrition()
+food_index = FoodSimilarityIndex.from_dataframe(nutrition_df)
+
+_healthy = nutrition_df[nutrition_df["HealthScore"] >= 3]
+REFERENCE_PROFILE = {c: float(_healthy[c].median()) for c in NUTRIENTS}
+LOW_PROFILE = {c: float(np.percentile(nutrition_df[c], LOW_PERCENTILE)) for c in NUTRIENTS}
+
+
+def recommend_similar_foods(prediction, k=10):
+    """
+    Kembalikan (target, list food) untuk k makanan yang profil nutrisinya
+    paling dekat dengan target dari `prediction` (objek Prediction).
+    """
+    target = build_target_profile(prediction, REFERENCE_PROFILE, LOW_PROFILE)
+    target = {c: round(v, 4) for c, v in target.items()}
+    ids, dist = food_index.query([target[c] for c in NUTRIENTS], k)
+
+    foods = []
+    for i, d in zip(ids.tolist(), dist.tolist()):
+        row = food_index.raw[i]
+        foods.append({
+            "menu": food_index.names[i],
+            "distance": round(d, 4),
+            "nutrients": {c: round(float(v), 4) for c, v in zip(NUTRIENTS, row)},
+        })
+    return target, foods
@@ -1,19 +1,47 @@
 
+import argparse
+import json
 import os
+import sys
+from datetime import datetime
 import pandas as pd
 import pickle
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 
+from ml.inference_engine import engine_from_sklearn, check_parity
+
+FEATURES = ['Pregnancies', 'Glucose', 'BloodPressure', 'BMI', 'DiabetesPedigreeFunction']
+
+MODEL_PATH = os.path.join(os.path.dirname(__file__), 'model.pkl')
+ARTIFACT_PATH = os.path.join(os.path.dirname(__file__), 'model.npz')
+DATA_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'data', 'diabetes.csv'))
+REPORT_DIR = os.path.join(os.path.dirname(__file__), 'reports')
+# artifact pemenang --select; terpisah dari model.pkl/model.npz (baseline
+# LogisticRegression yang dipakai --export-only dan bootstrap registry)
+SELECTED_DIR = os.path.join(os.path.dirname(__file__), 'selected')
+
+
+def export_model_artifact(model, X_check, artifact_path=ARTIFACT_PATH, version=None):
+    """
+    Tulis koefisien, intercept, urutan fitur dan versi model ke file .npz kecil
+    yang dibaca ml/predict_service tanpa sklearn. Artifact hanya ditulis jika
+    hasilnya identik dengan model sklearn pada X_check.
+    """
+    engine = engine_from_sklearn(model, features=FEATURES, version=version)
+    max_diff = check_parity(model, engine, X_check)
+    engine.save(artifact_path)
+    print(f"Artifact {engine.version} disimpan ke {artifact_path} (parity max diff {max_diff:.2e})")
+    return engine
+
+
 def train_model():
     try:
         # 1. Load dataset
-        data_path = os.path.join(os.path.dirname(__file__), '..', 'data', 'diabetes.csv')
-        data_path = os.path.abspath(data_path)
-        df = pd.read_csv(data_path)
+        df = pd.read_csv(DATA_PATH)
 
         # 2. Pilih fitur yang digunakan
-        X = df[['Pregnancies', 'Glucose', 'BloodPressure', 'BMI', 'DiabetesPedigreeFunction']]
+        X = df[FEATURES]
         y = df['Outcome']
 
         # 3. Split data
@@ -24,13 +52,114 @@ def train_model():
         model.fit(X_train, y_train)
 
         # 5. Simpan model ke folder yang sama dengan script ini
-        model_path = os.path.join(os.path.dirname(__file__), 'model.pkl')
-        with open(model_path, "wb") as file:
+        with open(MODEL_PATH, "wb") as file:
             pickle.dump(model, file)
 
-        print(f"Model berhasil dilatih dan disimpan ke {model_path}")
+        print(f"Model berhasil dilatih dan disimpan ke {MODEL_PATH}")
+
+        # 6. Export artifact ringan untuk inference
+        export_model_artifact(model, X.to_numpy())
     except Exception as e:
         print(f"Terjadi error: {e}")
 
+
+def export_existing_model():
+    # export model.pkl yang sudah ada tanpa training ulang
+    with open(MODEL_PATH, "rb") as file:
+        model = pickle.load(file)
+    df = pd.read_csv(DATA_PATH)
+    export_model_artifact(model, df[FEATURES].to_numpy())
+
+
+def select_model(args):
+    """
+    Bandingkan kandidat (ml/model_selection.py) dengan k-fold CV paralel,
+    tulis laporan, lalu simpan pemenang di ml/selected/ sebagai .npz (linear)
+    atau .pkl (lainnya). Mengembalikan path artifact pemenang atau None.
+    """
+    from ml.model_selection import run_selection, format_table
+
+    df = pd.read_csv(DATA_PATH)
+    report, engine = run_selection(
+        df[FEATURES].to_numpy(),
+        df['Outcome'].to_numpy(),
+        FEATURES,
+        names=args.candidates,
+        folds=args.folds,
+        n_jobs=args.jobs,
+        max_latency_us=args.max_latency_us,
+        auc_tolerance=args.auc_tolerance,
+        max_ece=args.max_ece,
+    )
+    print(format_table(report))
+
+    # laporan ditulis sebelum artifact, termasuk saat tidak ada pemenang
+    os.makedirs(REPORT_DIR, exist_ok=True)
+    stamp = f"{datetime.now():%Y%m%d-%H%M%S}"
+    report_path = args.report or os.path.join(REPORT_DIR, f"selection-{stamp}.json")
+    report['data'] = DATA_PATH
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Laporan disimpan ke {report_path}")
+
+    if engine is None:
+        print("Tidak ada kandidat yang memenuhi kriteria latency/kalibrasi; artifact tidak ditulis")
+        return None
+    os.makedirs(SELECTED_DIR, exist_ok=True)
+    path = os.path.join(SELECTED_DIR, f"{report['winner']}-{stamp}")
+    if engine.kind == "linear":
+        path += ".npz"
+        engine.save(path)
+    else:
+        path += ".pkl"
+        with open(path, "wb") as file:
+            pickle.dump(engine.model, file)
+    print(f"Pemenang {report['winner']} disimpan ke {path}")
+    return path
+
+
+def publish_artifact(path=ARTIFACT_PATH, activate=True):
+    # daftarkan artifact ke ml/registry dan (jika activate) jadikan versi aktif;
+    # worker yang berjalan ikut berganti lewat file watch atau POST /admin/model/reload
+    from ml.predict_service import registry
+    version = registry.publish(path, activate=activate)
+    if activate:
+        print(f"Versi {version} aktif di registry {registry.root}")
+    else:
+        print(f"Versi {version} terdaftar di registry {registry.root}; "
+              f"aktifkan dengan POST /admin/model/activate/{version} atau --publish")
+
+
 if __name__ == "__main__":
-    train_model()
+    # jalankan dari folder backend/:
+    #   python -m ml.train_model [--export-only] [--publish]
+    #   python -m ml.train_model --select [--folds 5] [--jobs -1] [--candidates logreg hist_gb ...]
+    #                            [--max-latency-us 500] [--auc-tolerance 0.005] [--max-ece 0.1]
+    #                            [--report PATH] [--publish]
+    parser = argparse.ArgumentParser(prog="python -m ml.train_model")
+    parser.add_argument("--export-only", action="store_true")
+    parser.add_argument("--publish", action="store_true")
+    parser.add_argument("--select", action="store_true", help="seleksi model dengan cross-validation")
+    parser.add_argument("--folds", type=int, default=5)
+    parser.add_argument("--jobs", type=int, default=-1, help="proses paralel joblib (-1 = semua core)")
+    parser.add_argument("--candidates", nargs="+", default=None)
+    parser.add_argument("--max-latency-us", type=float, default=500.0, help="batas latency p50 satu baris")
+    parser.add_argument("--auc-tolerance", type=float, default=0.005)
+    parser.add_argument("--max-ece", type=float, default=0.1)
+    parser.add_argument("--report", default=None)
+    args = parser.parse_args()
+
+    if args.select:
+        path = select_model(args)
+        # pemenang selalu masuk registry (npz maupun pkl dilayani lewat jalur
+        # yang sama); --publish sekaligus mengaktifkannya
+        if path is not None:
+            publish_artifact(path, activate=args.publish)
+        sys.exit(0 if path is not None else 1)
+
+    if args.export_only:
+        export_existing_model()
+    else:
+        train_model()
+    if args.publish:
+        publish_artifact()
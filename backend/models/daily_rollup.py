@@ -0,0 +1,37 @@
+# backend/models/daily_rollup.py
+from sqlalchemy import Column, Integer, Float, Date, DateTime, String
+from datetime import datetime
+from config.db import Base
+
+class PredictionDailyRollup(Base):
+    """
+    Agregat seluruh prediksi per hari (tanggal createdAt, WIB), dimajukan
+    task latar dari tabel predictions berdasarkan watermark id (lihat
+    services/daily_rollup.py). Sumber endpoint /admin/analytics. DB tanpa
+    watermark dibangun ulang penuh otomatis pada putaran pertama.
+    """
+    __tablename__ = "prediction_daily_rollups"
+
+    day = Column(Date, primary_key=True)
+    total = Column(Integer, nullable=False, default=0)
+    diabetes_count = Column(Integer, nullable=False, default=0)
+    sum_probability = Column(Float, nullable=False, default=0.0)
+
+    # kolom fitur boleh NULL; jumlah nilai non-NULL dicatat agar rata-rata = AVG()
+    glucose_count = Column(Integer, nullable=False, default=0)
+    sum_glucose = Column(Float, nullable=False, default=0.0)
+    bmi_count = Column(Integer, nullable=False, default=0)
+    sum_bmi = Column(Float, nullable=False, default=0.0)
+    blood_pressure_count = Column(Integer, nullable=False, default=0)
+    sum_blood_pressure = Column(Float, nullable=False, default=0.0)
+
+    updatedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class RollupWatermark(Base):
+    """Id prediksi terakhir yang sudah masuk rollup, satu baris per rollup."""
+    __tablename__ = "rollup_watermarks"
+
+    name = Column(String(64), primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    updatedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,24 @@
+# backend/models/email_outbox.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from datetime import datetime
+from config.db import Base
+
+class EmailOutbox(Base):
+    __tablename__ = "email_outbox"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    recipient = Column(String(255), nullable=False)
+    subject = Column(String(255), nullable=False)
+    body = Column(Text, nullable=False)  # dikosongkan setelah sent / failed
+    subtype = Column(String(16), nullable=False, default="plain")
+    status = Column(String(16), nullable=False, default="pending")  # pending | sending | sent | failed
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    last_error = Column(Text, nullable=True)
+    createdAt = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    sentAt = Column(DateTime, nullable=True)  # UTC
+
+    __table_args__ = (
+        # query dispatcher: status + jadwal kirim berikutnya
+        Index("ix_email_outbox_status_next", "status", "next_attempt_at"),
+    )
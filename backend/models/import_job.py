@@ -0,0 +1,25 @@
+# backend/models/import_job.py
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, BigInteger
+from datetime import datetime
+from config.db import Base
+
+class ImportJob(Base):
+    """Import CSV riwayat pengukuran; progress di-commit per chunk sehingga bisa dilanjutkan."""
+    __tablename__ = "import_jobs"
+
+    id = Column(Integer, primary_key=True, index=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    filename = Column(String(255), nullable=True)
+    source_path = Column(String(1024), nullable=False)  # salinan upload di IMPORT_DIR
+    file_size = Column(BigInteger, nullable=False, default=0)
+    status = Column(String(16), nullable=False, default="pending")  # pending | running | completed | failed
+    total_rows = Column(Integer, nullable=True)  # baris data (tanpa header), dihitung saat mulai
+    rows_processed = Column(Integer, nullable=False, default=0)  # posisi resume
+    rows_imported = Column(Integer, nullable=False, default=0)
+    rows_failed = Column(Integer, nullable=False, default=0)
+    errors = Column(Text, nullable=True)  # JSON list {line, error}, dibatasi IMPORT_MAX_ERRORS
+    error_message = Column(Text, nullable=True)  # error fatal yang menghentikan job
+    createdAt = Column(DateTime, nullable=False, default=datetime.utcnow)  # UTC
+    startedAt = Column(DateTime, nullable=True)  # UTC
+    finishedAt = Column(DateTime, nullable=True)  # UTC
+    updatedAt = Column(DateTime, nullable=True)  # UTC
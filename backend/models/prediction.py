@@ -1,5 +1,5 @@
 # backend/models/prediction.py
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from config.db import Base
@@ -16,6 +16,15 @@ class Prediction(Base):
     dpf = Column(Float, nullable=True)  # DiabetesPedigreeFunction
     prediction = Column(Integer, nullable=False)  # 0 or 1
     probability = Column(Float, nullable=False)   # percentage or 0..100
+    model_version = Column(String(64), nullable=True)  # versi model dari ml/registry
+    # hasil diagnosis sebenarnya (0/1) jika diketahui, label untuk retraining
+    # (ml/retrain.py). DB lama: ALTER TABLE predictions ADD COLUMN outcome INT NULL
+    outcome = Column(Integer, nullable=True)
     createdAt = Column(DateTime, nullable=False, default=datetime.utcnow)
 
     user = relationship("User", backref="predictions")
+
+    __table_args__ = (
+        # riwayat/keyset pagination: WHERE user_id = ? ORDER BY createdAt, id
+        Index("ix_predictions_user_created_id", "user_id", "createdAt", "id"),
+    )
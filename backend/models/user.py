@@ -17,6 +17,10 @@ class User(Base):
     resetTokenExpires = Column(DateTime, nullable=True)
     tokenLogin = Column(Text, nullable=True)
     tokenLoginExpires = Column(DateTime, nullable=True)
+    tokenVersion = Column(Integer, nullable=False, default=0, server_default="0")
+    # naik setiap edit profil; dicek cache principal di semua worker.
+    # DB lama: ALTER TABLE users ADD COLUMN profileVersion INT NOT NULL DEFAULT 0
+    profileVersion = Column(Integer, nullable=False, default=0, server_default="0")
     createdAt = Column(DateTime, nullable=False, default=datetime.utcnow)
     updatedAt = Column(DateTime, nullable=True)
     deletedAt = Column(DateTime, nullable=True)
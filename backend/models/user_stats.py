@@ -0,0 +1,35 @@
+# backend/models/user_stats.py
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from datetime import datetime
+from config.db import Base
+
+class UserPredictionStats(Base):
+    """
+    Ringkasan prediksi per user, diperbarui di transaksi yang sama dengan
+    setiap insert ke tabel predictions (lihat services/user_stats.py).
+    """
+    __tablename__ = "user_prediction_stats"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True, autoincrement=False)
+    total = Column(Integer, nullable=False, default=0)
+    diabetes_count = Column(Integer, nullable=False, default=0)
+
+    sum_probability = Column(Float, nullable=False, default=0.0)
+    min_probability = Column(Float, nullable=True)
+    max_probability = Column(Float, nullable=True)
+
+    # glucose/blood_pressure boleh NULL, jadi jumlah nilai non-NULL dicatat
+    # sendiri supaya rata-rata sama dengan AVG() di SQL
+    glucose_count = Column(Integer, nullable=False, default=0)
+    sum_glucose = Column(Float, nullable=False, default=0.0)
+    min_glucose = Column(Float, nullable=True)
+    max_glucose = Column(Float, nullable=True)
+
+    blood_pressure_count = Column(Integer, nullable=False, default=0)
+    sum_blood_pressure = Column(Float, nullable=False, default=0.0)
+    min_blood_pressure = Column(Float, nullable=True)
+    max_blood_pressure = Column(Float, nullable=True)
+
+    latest_prediction_id = Column(Integer, nullable=True)
+    latest_created_at = Column(DateTime, nullable=True)
+    updatedAt = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -0,0 +1,184 @@
+# backend/routes/adminRoute.py
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from fastapi.security import APIKeyHeader
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import date, datetime
+from typing import Optional
+from dotenv import load_dotenv
+import hmac
+import os
+
+from config.db import engine, async_engine, POOL_SETTINGS, AsyncSessionLocal
+from config.pool import pool_status
+from routes.authRoute import principal_cache, password_service
+from services.mail_outbox import outbox_dispatcher
+from services.response_cache import response_cache
+from services.export import export_statement, export_response_meta, stream_export, local_naive
+from services.daily_rollup import fetch_rollups, analytics
+from services.serializers import OrjsonResponse
+from ml.predict_service import scheduler, registry, prediction_cache
+
+load_dotenv()
+
+ADMIN_API_KEY = os.getenv("ADMIN_API_KEY", "")
+
+admin_key_header = APIKeyHeader(name="X-Admin-Key", auto_error=False)
+
+
+def require_admin(key: str = Depends(admin_key_header)):
+    # endpoint admin nonaktif jika ADMIN_API_KEY tidak di-set
+    if not ADMIN_API_KEY or not key or not hmac.compare_digest(key, ADMIN_API_KEY):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+async def get_db():
+    async with AsyncSessionLocal() as session:
+        yield session
+
+
+# ==============================
+# INFERENCE SCHEDULER
+# ==============================
+@router.get("/inference/stats")
+def inference_stats():
+    return scheduler.stats()
+
+
+@router.post("/inference/stats/reset")
+def reset_inference_stats():
+    scheduler.reset_stats()
+    prediction_cache.reset_stats()
+    return {"message": "Inference stats reset"}
+
+
+@router.get("/inference/cache")
+def inference_cache_stats():
+    return prediction_cache.stats()
+
+
+@router.post("/inference/cache/clear")
+def clear_inference_cache():
+    prediction_cache.clear()
+    return {"message": "Prediction cache cleared"}
+
+
+# ==============================
+# MODEL REGISTRY
+# ==============================
+@router.get("/model")
+def model_status():
+    return registry.status()
+
+
+@router.post("/model/reload")
+def reload_model():
+    # baca ulang ml/registry/ACTIVE; worker lain mengikuti lewat file watch
+    try:
+        engine = registry.reload()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+    return {"message": "Model reloaded", "active_version": engine.version}
+
+
+@router.post("/model/activate/{version}")
+def activate_model(version: str):
+    try:
+        engine = registry.activate(version)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Activation failed: {e}")
+    return {"message": "Model activated", "active_version": engine.version}
+
+
+# ==============================
+# DATABASE POOL
+# ==============================
+@router.get("/db/pool")
+def db_pool_status():
+    return {
+        "settings": POOL_SETTINGS,
+        "async": pool_status(async_engine),
+        "sync": pool_status(engine),
+    }
+
+
+# ==============================
+# AUTH PRINCIPAL CACHE
+# ==============================
+@router.get("/auth/cache")
+def auth_cache_stats():
+    return principal_cache.stats()
+
+
+@router.get("/auth/hashing")
+def password_hashing_stats():
+    return password_service.stats()
+
+
+# ==============================
+# RESPONSE CACHE
+# ==============================
+@router.get("/cache/responses")
+def response_cache_stats():
+    return response_cache.stats()
+
+
+@router.post("/cache/responses/clear")
+def clear_response_cache():
+    response_cache.clear()
+    return {"message": "Response cache cleared"}
+
+
+# ==============================
+# MAIL OUTBOX
+# ==============================
+@router.get("/mail/outbox")
+async def mail_outbox_stats():
+    return await outbox_dispatcher.stats()
+
+
+# ==============================
+# EXPORT
+# ==============================
+@router.get("/export/predictions")
+async def export_predictions(
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False),
+    user_id: Optional[int] = Query(None, description="Kosong = semua user"),
+    date_from: Optional[datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime] = Query(None, alias="to"),
+):
+    stmt = export_statement(user_id, local_naive(date_from), local_naive(date_to))
+    media_type, filename = export_response_meta(fmt, gzip, "predictions")
+    return StreamingResponse(
+        stream_export(stmt, fmt, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+# ==============================
+# POPULATION ANALYTICS
+# ==============================
+@router.get("/analytics/daily")
+async def population_analytics(
+    db: AsyncSession = Depends(get_db),
+    bucket: str = Query("day", pattern="^(day|week|month)$"),
+    date_from: Optional[date] = Query(None, alias="from", description="Tanggal awal (inklusif)"),
+    date_to: Optional[date] = Query(None, alias="to", description="Tanggal akhir (inklusif)"),
+):
+    """
+    Volume prediksi, positive rate, dan rata-rata glucose/BMI/blood pressure
+    seluruh user per hari/minggu/bulan. Hanya membaca prediction_daily_rollups
+    (satu baris per hari), tidak pernah tabel predictions. Prediksi baru
+    masuk setelah satu-dua putaran DAILY_ROLLUP_INTERVAL.
+    """
+    if date_from and date_to and date_from > date_to:
+        raise HTTPException(status_code=400, detail="'from' must not be after 'to'")
+    rows = await fetch_rollups(db, bucket, date_from, date_to)
+    return OrjsonResponse({"bucket": bucket, "from": date_from, "to": date_to, **analytics(rows)})
@@ -1,29 +1,32 @@
 # backend/routes/authRoute.py
 
 from fastapi import APIRouter, HTTPException, Depends, status
-from sqlalchemy.orm import Session
-from argon2 import PasswordHasher, exceptions as argon2_exceptions
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.security import APIKeyHeader
 from datetime import datetime, timedelta
 from zoneinfo import ZoneInfo
-from fastapi_mail import MessageSchema
 from dotenv import load_dotenv
 import os
 import jwt
 import random
 
-from config.db import SessionLocal
+from config.db import AsyncSessionLocal
 from models.user import User as UserModel
 from schemas.userSchema import UserCreate, UserLogin, UserOut, Token
 from schemas.authSchema import ForgotPasswordSchema, VerifyOTPSchema, ResetPasswordSchema
 
-from config.mail import fm
+from services.auth_cache import AuthPrincipal, PrincipalCache
+from services.password_service import PasswordService, PasswordServiceBusy
+from services.mail_outbox import enqueue_email, outbox_dispatcher
 
 load_dotenv()
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
-ph = PasswordHasher()
+# Argon2 berjalan di thread pool khusus dengan antrian terbatas; parameter
+# cost dari ARGON2_TIME_COST / ARGON2_MEMORY_COST / ARGON2_PARALLELISM
+password_service = PasswordService.from_env()
 
 JWT_SECRET = os.getenv("JWT_SECRET", "secret")
 JWT_ALGORITHM = os.getenv("JWT_ALGORITHM", "HS256")
@@ -31,28 +34,63 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
 api_key_header = APIKeyHeader(name="Authorization", auto_error=False)
 
+# Cache token terverifikasi -> principal, supaya request terautentikasi tidak
+# perlu cek signature JWT + query user setiap kali. AUTH_CACHE_SIZE=0 mematikan.
+# Setiap AUTH_CACHE_REVALIDATE detik entry dicocokkan ke users.tokenVersion /
+# profileVersion (satu SELECT by primary key): token yang dicabut atau profil
+# yang diubah di worker lain tertunda paling lama selama itu.
+principal_cache = PrincipalCache(
+    maxsize=int(os.getenv("AUTH_CACHE_SIZE", "10000")),
+    ttl=float(os.getenv("AUTH_CACHE_TTL", "300")),
+    revalidate=float(os.getenv("AUTH_CACHE_REVALIDATE", "5")),
+)
 
-def get_db():
-    db = SessionLocal()
-    try:
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def get_user_by_email(db: AsyncSession, email: str):
+    result = await db.execute(select(UserModel).where(UserModel.email == email))
+    return result.scalars().first()
+
+
+def _hashing_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Server busy, please retry",
+        headers={"Retry-After": "1"},
+    )
+
+
+async def hash_password(password: str) -> str:
+    try:
+        return await password_service.hash(password)
+    except PasswordServiceBusy:
+        raise _hashing_busy()
+
+
+async def verify_password(hashed: str, password: str) -> bool:
+    try:
+        return await password_service.verify(hashed, password)
+    except PasswordServiceBusy:
+        raise _hashing_busy()
 
 
 # ==============================
 # REGISTER
 # ==============================
 @router.post("/register", response_model=UserOut)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
     # normalize email to lowercase
     email_norm = user_in.email.lower().strip()
 
-    existing = db.query(UserModel).filter(UserModel.email == email_norm).first()
+    existing = await get_user_by_email(db, email_norm)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    hashed = ph.hash(user_in.password)
+    hashed = await hash_password(user_in.password)
     new_user = UserModel(
         name=user_in.name,
         email=email_norm,
@@ -60,8 +98,8 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
         createdAt=datetime.now(tz=ZoneInfo("Asia/Jakarta")),
     )
     db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    await db.commit()
+    await db.refresh(new_user)
     return new_user
 
 
@@ -69,24 +107,35 @@ def register(user_in: UserCreate, db: Session = Depends(get_db)):
 # LOGIN
 # ==============================
 @router.post("/login", response_model=Token)
-def login(payload: UserLogin, db: Session = Depends(get_db)):
+async def login(payload: UserLogin, db: AsyncSession = Depends(get_db)):
     # normalize email
     email_norm = payload.email.lower().strip()
 
-    user = db.query(UserModel).filter(UserModel.email == email_norm).first()
+    user = await get_user_by_email(db, email_norm)
     if not user:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    try:
-        ph.verify(user.password, payload.password)
-    except argon2_exceptions.VerifyMismatchError:
+    if not await verify_password(user.password, payload.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
+    # parameter Argon2 berubah sejak hash dibuat -> hash ulang selagi
+    # password plaintext tersedia
+    if password_service.needs_rehash(user.password):
+        try:
+            user.password = await password_service.hash(payload.password)
+        except PasswordServiceBusy:
+            pass  # login tetap berhasil, rehash dicoba di login berikutnya
+        else:
+            await db.commit()
+            password_service.record_rehash()
+
     # buat token dengan exp (UTC)
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     token_payload = {
         "sub": str(user.id),
         "email": user.email,
+        # versi token per user; naik saat reset password sehingga token lama ditolak
+        "ver": int(user.tokenVersion or 0),
         "exp": expire
     }
     token = jwt.encode(token_payload, JWT_SECRET, algorithm=JWT_ALGORITHM)
@@ -97,31 +146,60 @@ def login(payload: UserLogin, db: Session = Depends(get_db)):
 # ==============================
 # AUTH MIDDLEWARE
 # ==============================
-def get_current_user(
+async def get_current_user(
     authorization: str = Depends(api_key_header),
-    db: Session = Depends(get_db),
-) -> UserModel:
+) -> AuthPrincipal:
 
     if not authorization:
         raise HTTPException(401, detail="Not authenticated")
 
     token = authorization.replace("Bearer ", "").strip()
 
+    # cache hit: token sudah pernah diverifikasi dan user belum berubah
+    cached = principal_cache.get(token)
+    if cached is not None:
+        principal, due = cached
+        if not due:
+            return principal
+        # cek murah: hanya kolom versi, supaya reset password / edit profil
+        # di worker lain ikut terlihat di sini
+        async with AsyncSessionLocal() as db:
+            versions = (await db.execute(
+                select(UserModel.tokenVersion, UserModel.profileVersion).where(UserModel.id == principal.id)
+            )).first()
+        if versions is not None and tuple(int(v or 0) for v in versions) == principal.versions():
+            principal_cache.touch(token)
+            return principal
+        # versi berubah: verifikasi ulang lewat jalur lengkap di bawah
+
     try:
         payload = jwt.decode(token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
-        user_id = payload.get("sub")
+        user_id = int(payload.get("sub"))
     except Exception:
         raise HTTPException(401, detail="Invalid token")
 
-    user = db.get(UserModel, int(user_id))
+    # ambil generation sebelum baca DB, lihat PrincipalCache.put
+    generation = principal_cache.generation(user_id)
+
+    # session sendiri yang langsung ditutup: koneksi dikembalikan ke pool
+    # sebelum route berjalan. Dengan Depends(get_db) koneksi ini tertahan
+    # sampai request selesai sementara route meminta koneksi kedua, sehingga
+    # saat banyak cache miss bersamaan pool habis dan request saling menunggu.
+    async with AsyncSessionLocal() as db:
+        user = await db.get(UserModel, user_id)
     if not user:
         raise HTTPException(401, detail="User not found")
 
-    return user
+    if int(payload.get("ver", 0)) != int(user.tokenVersion or 0):
+        raise HTTPException(401, detail="Token revoked")
+
+    principal = AuthPrincipal.from_user(user)
+    principal_cache.put(token, principal, payload["exp"], generation)
+    return principal
 
 
 @router.get("/me", response_model=UserOut)
-def read_me(current_user: UserModel = Depends(get_current_user)):
+async def read_me(current_user: AuthPrincipal = Depends(get_current_user)):
     return current_user
 
 
@@ -129,10 +207,10 @@ def read_me(current_user: UserModel = Depends(get_current_user)):
 # SEND OTP RESET PASSWORD
 # ==============================
 @router.post("/forgot-password")
-async def forgot_password(payload: ForgotPasswordSchema, db: Session = Depends(get_db)):
+async def forgot_password(payload: ForgotPasswordSchema, db: AsyncSession = Depends(get_db)):
     email = payload.email.lower().strip()
 
-    user = db.query(UserModel).filter(UserModel.email == email).first()
+    user = await get_user_by_email(db, email)
     if not user:
         raise HTTPException(404, detail="Email not registered")
 
@@ -141,16 +219,17 @@ async def forgot_password(payload: ForgotPasswordSchema, db: Session = Depends(g
     now_jakarta = datetime.now(tz=ZoneInfo("Asia/Jakarta"))
     user.resetPasswordToken = otp
     user.resetTokenExpires = now_jakarta + timedelta(minutes=10)
-    db.commit()
 
-    message = MessageSchema(
+    # email masuk outbox di transaksi yang sama dengan OTP; pengiriman SMTP
+    # dilakukan OutboxDispatcher di background, response tidak menunggu SMTP
+    enqueue_email(
+        db,
+        recipient=email,
         subject="Kode Reset Password",
-        recipients=[email],
         body=f"Kode OTP reset password Anda adalah: {otp}",
-        subtype="plain",
     )
-
-    await fm.send_message(message)
+    await db.commit()
+    outbox_dispatcher.notify()
 
     return {"message": "OTP sent"}
 
@@ -159,11 +238,11 @@ async def forgot_password(payload: ForgotPasswordSchema, db: Session = Depends(g
 # VERIFY OTP
 # ==============================
 @router.post("/verify-reset-otp")
-def verify_reset_otp(payload: VerifyOTPSchema, db: Session = Depends(get_db)):
+async def verify_reset_otp(payload: VerifyOTPSchema, db: AsyncSession = Depends(get_db)):
     email = payload.email.lower().strip()
     otp = payload.otp
 
-    user = db.query(UserModel).filter(UserModel.email == email).first()
+    user = await get_user_by_email(db, email)
     if not user:
         raise HTTPException(404, detail="User not found")
 
@@ -196,19 +275,22 @@ def verify_reset_otp(payload: VerifyOTPSchema, db: Session = Depends(get_db)):
 # RESET PASSWORD
 # ==============================
 @router.post("/reset-password")
-def reset_password(payload: ResetPasswordSchema, db: Session = Depends(get_db)):
+async def reset_password(payload: ResetPasswordSchema, db: AsyncSession = Depends(get_db)):
     email = payload.email.lower().strip()
     password = payload.password
 
-    user = db.query(UserModel).filter(UserModel.email == email).first()
+    user = await get_user_by_email(db, email)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
-    user.password = ph.hash(password)
+    user.password = await hash_password(password)
     user.resetPasswordToken = None
     user.resetTokenExpires = None
     user.updatedAt = datetime.now(tz=ZoneInfo("Asia/Jakarta"))
+    # cabut semua token yang sudah beredar
+    user.tokenVersion = int(user.tokenVersion or 0) + 1
 
-    db.commit()
+    await db.commit()
+    principal_cache.invalidate_user(int(user.id))
 
     return {"message": "Password updated successfully"}
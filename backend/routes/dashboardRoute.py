@@ -1,143 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
 
-from config.db import SessionLocal
-from models.prediction import Prediction as PredictionModel
-from models.user import User as UserModel
+from config.db import AsyncSessionLocal
 from routes.authRoute import get_current_user
-from schemas.dashboardSchema import (
-    DashboardOut,
-    DashboardUserStats,
-    DashboardRecentPrediction,
-    ChartDataPoint,
-)
+from services.auth_cache import AuthPrincipal
+from services.prediction_stats import fetch_prediction_overview, chart_series, CHART_PARAMS
+from services.chart import aggregated_series, raw_series, DEFAULT_MAX_POINTS
+from services.export import local_naive
+from services.response_cache import conditional_json
+from services.serializers import dashboard_recent
+from schemas.dashboardSchema import DashboardOut, ChartSeriesOut
 
 router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-@router.get("/", response_model=DashboardOut)
-def get_dashboard(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
-    chart_param: str = Query("glucose", description="Parameter untuk grafik: pregnancies, glucose, blood_pressure, bmi, dpf, prediction"),
-):
-    uid = int(current_user.id)
-
-    # --- USER stats ---
-    total_user_preds = (
-        db.query(func.count(PredictionModel.id)).filter(PredictionModel.user_id == uid).scalar() or 0
-    )
-    user_diabetes = (
-        db.query(func.count(PredictionModel.id))
-        .filter(PredictionModel.user_id == uid, PredictionModel.prediction == 1)
-        .scalar()
-        or 0
-    )
-    user_non = total_user_preds - user_diabetes
+async def _build_dashboard(db, uid, chart_param):
+    # 1 query agregat + 1 query window terbaru (dipakai ulang untuk grafik)
+    overview = await fetch_prediction_overview(db, uid)
 
-    avg_prob_user = db.query(func.avg(PredictionModel.probability)).filter(PredictionModel.user_id == uid).scalar()
-    
-    # last prediction (user)
-    last_pred = (
-        db.query(PredictionModel)
-        .filter(PredictionModel.user_id == uid)
-        .order_by(PredictionModel.createdAt.desc())
-        .first()
-    )
+    # dict berbentuk DashboardOut langsung dari baris ORM, diserialisasi
+    # conditional_json dengan orjson (tanpa model per baris)
+    recent_user_preds = dashboard_recent.many(overview["recent"])
 
-    last_pred_out = None
-    if last_pred:
-        last_pred_out = DashboardRecentPrediction(
-            id=last_pred.id,
-            user_id=last_pred.user_id,
-            pregnancies=last_pred.pregnancies,
-            glucose=last_pred.glucose,
-            blood_pressure=last_pred.blood_pressure,
-            bmi=last_pred.bmi,
-            dpf=last_pred.dpf,
-            prediction=last_pred.prediction,
-            probability=last_pred.probability,
-            createdAt=last_pred.createdAt,
-        )
+    user_stats = {
+        "total_predictions": overview["total"],
+        "diabetes_count": overview["diabetes"],
+        "non_diabetes_count": overview["total"] - overview["diabetes"],
+        "avg_probability": overview["avg_probability"],
+        "last_prediction": recent_user_preds[0] if recent_user_preds else None,
+    }
 
-    user_stats = DashboardUserStats(
-        total_predictions=int(total_user_preds),
-        diabetes_count=int(user_diabetes),
-        non_diabetes_count=int(user_non),
-        avg_probability=float(avg_prob_user) if avg_prob_user is not None else None,
-        last_prediction=last_pred_out,
-    )
+    # --- Chart data berdasarkan parameter yang dipilih (lama ke baru) ---
+    chart_data = [
+        {"date": date_str, "value": value}
+        for date_str, value in chart_series(overview["recent"], chart_param)
+    ]
 
-    # --- Recent predictions: user-specific (limit 5) ---
-    recent_user_preds_query = (
-        db.query(PredictionModel)
-        .filter(PredictionModel.user_id == uid)
-        .order_by(PredictionModel.createdAt.desc())
-        .limit(5)
-        .all()
-    )
+    return {
+        "user": user_stats,
+        "recent_user_predictions": recent_user_preds,
+        "chart_data": chart_data,
+    }
 
-    recent_user_preds = [
-        DashboardRecentPrediction(
-            id=p.id,
-            user_id=p.user_id,
-            pregnancies=p.pregnancies,
-            glucose=p.glucose,
-            blood_pressure=p.blood_pressure,
-            bmi=p.bmi,
-            dpf=p.dpf,
-            prediction=p.prediction,
-            probability=p.probability,
-            createdAt=p.createdAt,
-        )
-        for p in recent_user_preds_query
-    ]
 
-    # --- Chart data berdasarkan parameter yang dipilih (limit 5) ---
-    chart_preds = (
-        db.query(PredictionModel)
-        .filter(PredictionModel.user_id == uid)
-        .order_by(PredictionModel.createdAt.desc())
-        .limit(5)
-        .all()
+@router.get("/", response_model=DashboardOut)
+async def get_dashboard(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+    chart_param: str = Query("glucose", description="Parameter untuk grafik: pregnancies, glucose, blood_pressure, bmi, dpf, prediction"),
+):
+    # 304 / body dari cache jika data user belum berubah (lihat services/response_cache.py)
+    return await conditional_json(
+        request, db, current_user,
+        lambda: _build_dashboard(db, int(current_user.id), chart_param),
     )
 
-    # Reverse agar urutan dari lama ke baru untuk grafik
-    chart_preds = list(reversed(chart_preds))
 
-    chart_data = []
-    for pred in chart_preds:
-        date_str = pred.createdAt.strftime('%d/%m')
-        
-        # Pilih parameter sesuai filter
-        value = None
-        if chart_param == "pregnancies":
-            value = pred.pregnancies
-        elif chart_param == "glucose":
-            value = pred.glucose
-        elif chart_param == "blood_pressure":
-            value = pred.blood_pressure
-        elif chart_param == "bmi":
-            value = pred.bmi
-        elif chart_param == "dpf":
-            value = pred.dpf
-        elif chart_param == "prediction":
-            # Gunakan probability (persentase) bukan prediction (0/1)
-            value = float(pred.probability)
-        
-        chart_data.append(ChartDataPoint(date=date_str, value=value))
+async def _build_chart(db, uid, params, bucket, date_from, date_to, max_points):
+    if bucket == "raw":
+        data = await raw_series(db, uid, params, date_from, date_to, max_points)
+    else:
+        data = await aggregated_series(db, uid, params, bucket, date_from, date_to, max_points)
+    # bentuk ChartSeriesOut; seri sudah berupa list dict
+    return {"bucket": bucket, "params": params, "max_points": max_points, **data}
+
 
-    return DashboardOut(
-        user=user_stats,
-        recent_user_predictions=recent_user_preds,
-        chart_data=chart_data,
-    )
\ No newline at end of file
+@router.get("/chart", response_model=ChartSeriesOut)
+async def get_chart(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+    params: str = Query("glucose", description="Daftar parameter dipisah koma: pregnancies, glucose, blood_pressure, bmi, dpf, prediction"),
+    bucket: str = Query("day", pattern="^(day|week|month|raw)$"),
+    date_from: Optional[datetime] = Query(None, alias="from", description="createdAt >= from"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="createdAt < to"),
+    max_points: int = Query(DEFAULT_MAX_POINTS, alias="points", ge=3, le=5000),
+):
+    """
+    Grafik rentang waktu: rata-rata per hari/minggu/bulan dihitung dengan
+    GROUP BY di database, atau seri mentah (bucket=raw; rentang di atas
+    CHART_RAW_MAX_ROWS baris dijawab per hari). Setiap seri dibatasi
+    `points` titik dengan downsampling LTTB.
+    """
+    names = list(dict.fromkeys(p.strip() for p in params.split(",") if p.strip()))
+    unknown = [p for p in names if p not in CHART_PARAMS]
+    if not names or unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown chart params {unknown}, choose from {sorted(CHART_PARAMS)}",
+        )
+    return await conditional_json(
+        request, db, current_user,
+        lambda: _build_chart(
+            db, int(current_user.id), names, bucket,
+            local_naive(date_from), local_naive(date_to), max_points,
+        ),
+    )
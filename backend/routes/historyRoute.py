@@ -1,47 +1,86 @@
 # backend/routes/historyRoute.py
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from typing import Optional
 
-from config.db import SessionLocal
+from config.db import AsyncSessionLocal
 from models.prediction import Prediction as PredictionModel
-from models.user import User as UserModel
 from routes.authRoute import get_current_user
-from schemas.historySchema import HistoryItem
+from services.auth_cache import AuthPrincipal
+from services.history import InvalidCursor, decode_cursor, fetch_page
+from services.export import export_statement, export_response_meta, stream_export, local_naive
+from services.serializers import OrjsonResponse, history_item
+from schemas.historySchema import HistoryItem, HistoryPage
 
 router = APIRouter(prefix="/history", tags=["history"])
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
-@router.get("/", response_model=List[HistoryItem])
-def list_history(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+
+@router.get("/", response_model=HistoryPage)
+async def list_history(
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
     limit: int = Query(10, ge=1, le=500),
-    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = Query(None, description="next_cursor / prev_cursor dari halaman sebelumnya"),
+    date_from: Optional[datetime] = Query(None, alias="from", description="createdAt >= from"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="createdAt < to"),
+):
+    """
+    Riwayat prediksi dengan keyset pagination pada (createdAt, id), terbaru
+    dulu. Biaya tiap halaman konstan berapapun kedalamannya, tidak seperti
+    OFFSET yang harus melewati semua baris sebelumnya.
+    """
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    items, next_cursor, prev_cursor = await fetch_page(
+        db, current_user.id, limit, position, local_naive(date_from), local_naive(date_to)
+    )
+    # Response langsung: baris ORM -> dict -> orjson, tanpa HistoryItem per
+    # baris dan tanpa validasi ulang response_model (tetap dipakai untuk docs)
+    return OrjsonResponse({
+        "items": history_item.many(items),
+        "limit": limit,
+        "next_cursor": next_cursor,
+        "prev_cursor": prev_cursor,
+    })
+
+@router.get("/export")
+async def export_history(
+    current_user: AuthPrincipal = Depends(get_current_user),
+    fmt: str = Query("csv", alias="format", pattern="^(csv|ndjson)$"),
+    gzip: bool = Query(False, description="Kirim sebagai file .gz"),
+    date_from: Optional[datetime] = Query(None, alias="from", description="createdAt >= from"),
+    date_to: Optional[datetime] = Query(None, alias="to", description="createdAt < to"),
 ):
-    history = (
-        db.query(PredictionModel)
-        .filter(PredictionModel.user_id == current_user.id)
-        .order_by(PredictionModel.createdAt.desc())
-        .offset(offset)
-        .limit(limit)
-        .all()
+    """
+    Unduh seluruh riwayat prediksi user sebagai CSV/NDJSON. Baris di-stream
+    dari server-side cursor dan di-encode per chunk, jadi memori tetap datar
+    berapapun panjang riwayatnya.
+    """
+    stmt = export_statement(current_user.id, local_naive(date_from), local_naive(date_to))
+    media_type, filename = export_response_meta(fmt, gzip, "history")
+    return StreamingResponse(
+        stream_export(stmt, fmt, gzip),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
     )
-    return history
+
 
 @router.get("/{prediction_id}", response_model=HistoryItem)
-def get_history_item(
+async def get_history_item(
     prediction_id: int,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
-    item = db.get(PredictionModel, prediction_id)
+    item = await db.get(PredictionModel, prediction_id)
     if not item or item.user_id != current_user.id:
         raise HTTPException(status_code=404, detail="History item not found")
     return item
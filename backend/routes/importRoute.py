@@ -0,0 +1,116 @@
+# backend/routes/importRoute.py
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
+import asyncio
+import os
+import uuid
+
+from config.db import AsyncSessionLocal
+from models.import_job import ImportJob
+from routes.authRoute import get_current_user
+from services.auth_cache import AuthPrincipal
+from services.importer import (
+    IMPORT_DIR, IMPORT_MAX_BYTES, IMPORT_WRITE_BYTES, claim_job, create_job, import_runner, job_summary,
+)
+from schemas.importSchema import ImportJobOut
+
+router = APIRouter(prefix="/predict/import", tags=["predict"])
+
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def _get_own_job(db, job_id, user_id):
+    job = await db.get(ImportJob, job_id)
+    if not job or job.user_id != user_id:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    return job
+
+
+@router.post("", response_model=ImportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def upload_import(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+    filename: Optional[str] = Query(None, description="Nama file asli, untuk ditampilkan saja"),
+):
+    """
+    Import CSV riwayat pengukuran (body = isi file, Content-Type text/csv).
+    Kolom sama dengan /predict: pregnancies, glucose, bloodPressure, bmi, dpf,
+    plus createdAt dan Outcome (0/1, label untuk ml/retrain) opsional. Body disimpan ke disk secara streaming lalu
+    diproses di background per chunk; pantau lewat GET /predict/import/{id}.
+    """
+    os.makedirs(IMPORT_DIR, exist_ok=True)
+    path = os.path.join(IMPORT_DIR, f"{uuid.uuid4().hex}.csv")
+    size = 0
+    try:
+        with open(path, "wb") as f:
+            # tulis per blok IMPORT_WRITE_BYTES di thread agar disk I/O tidak
+            # memblok event loop
+            pending = bytearray()
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > IMPORT_MAX_BYTES:
+                    raise HTTPException(status_code=413, detail="File too large")
+                pending += chunk
+                if len(pending) >= IMPORT_WRITE_BYTES:
+                    await asyncio.to_thread(f.write, bytes(pending))
+                    pending.clear()
+            if pending:
+                await asyncio.to_thread(f.write, bytes(pending))
+    except BaseException:
+        os.remove(path)
+        raise
+    if size == 0:
+        os.remove(path)
+        raise HTTPException(status_code=400, detail="Empty file")
+
+    job = await create_job(db, int(current_user.id), path, filename)
+    import_runner.start(job.id)
+    return job_summary(job)
+
+
+@router.get("", response_model=List[ImportJobOut])
+async def list_imports(
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+    limit: int = Query(20, ge=1, le=100),
+):
+    jobs = (await db.scalars(
+        select(ImportJob)
+        .where(ImportJob.user_id == current_user.id)
+        .order_by(ImportJob.id.desc())
+        .limit(limit)
+    )).all()
+    return [job_summary(job) for job in jobs]
+
+
+@router.get("/{job_id}", response_model=ImportJobOut)
+async def get_import(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    return job_summary(await _get_own_job(db, job_id, current_user.id))
+
+
+@router.post("/{job_id}/resume", response_model=ImportJobOut, status_code=status.HTTP_202_ACCEPTED)
+async def resume_import(
+    job_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    # lanjutkan dari baris terakhir yang sudah di-commit (job gagal / terputus)
+    job = await _get_own_job(db, job_id, current_user.id)
+    if job.status == "completed":
+        raise HTTPException(status_code=409, detail="Import job already completed")
+    # klaim di sini agar job yang masih dikerjakan (proses ini atau worker
+    # lain, lease belum habis) dijawab 409, bukan 202 tanpa efek
+    if not await claim_job(db, job.id):
+        raise HTTPException(status_code=409, detail="Import job is already running")
+    import_runner.start(job.id, claimed=True)
+    await db.refresh(job)
+    return job_summary(job)
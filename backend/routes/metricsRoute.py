@@ -0,0 +1,62 @@
+# backend/routes/metricsRoute.py
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from config.db import engine, async_engine
+from config.pool import pool_status
+from services.metrics import metrics
+from services.response_cache import response_cache
+from ml.predict_service import scheduler, prediction_cache
+
+router = APIRouter(tags=["metrics"])
+
+# format teks Prometheus (exposition format 0.0.4)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _gauges(out, name, help, values, kind="gauge", label="pool"):
+    out.append(f"# HELP {name} {help}")
+    out.append(f"# TYPE {name} {kind}")
+    for key, value in values:
+        if value is not None:
+            out.append(f'{name}{{{label}="{key}"}} {value}')
+
+
+def _collect_pools(out):
+    pools = [("sync", pool_status(engine)), ("async", pool_status(async_engine))]
+    _gauges(out, "db_pool_checked_out", "Koneksi yang sedang dipakai.",
+            [(n, s.get("checked_out")) for n, s in pools])
+    _gauges(out, "db_pool_overflow_in_use", "Koneksi overflow yang sedang dipakai.",
+            [(n, s.get("overflow_in_use")) for n, s in pools])
+    _gauges(out, "db_pool_checkout_timeouts_total", "Checkout yang gagal karena pool penuh.",
+            [(n, s.get("metrics", {}).get("timeouts")) for n, s in pools], kind="counter")
+
+
+def _collect_caches(out):
+    caches = [("prediction", prediction_cache.stats()), ("response", response_cache.stats())]
+    _gauges(out, "cache_hits_total", "Cache hit.", [(n, s["hits"]) for n, s in caches],
+            kind="counter", label="cache")
+    _gauges(out, "cache_misses_total", "Cache miss.", [(n, s["misses"]) for n, s in caches],
+            kind="counter", label="cache")
+    _gauges(out, "cache_entries", "Jumlah entry cache.", [(n, s["size"]) for n, s in caches],
+            label="cache")
+
+
+def _collect_scheduler(out):
+    s = scheduler.stats()
+    out.append("# HELP inference_queue_depth Baris yang menunggu di micro-batch scheduler.")
+    out.append("# TYPE inference_queue_depth gauge")
+    out.append(f"inference_queue_depth {s['queue_depth']}")
+
+
+metrics.add_collector(_collect_pools)
+metrics.add_collector(_collect_caches)
+metrics.add_collector(_collect_scheduler)
+
+
+@router.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def get_metrics():
+    """Metric aplikasi untuk di-scrape Prometheus (METRICS_ENABLED=0 menonaktifkan)."""
+    if not metrics.enabled:
+        raise HTTPException(status_code=404, detail="Not Found")
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
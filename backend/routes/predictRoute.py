@@ -1,35 +1,44 @@
 # backend/routes/predictRoute.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select, insert, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import ValidationError
 from typing import List
+import math
 
-from config.db import SessionLocal
+from config.db import AsyncSessionLocal
 from models.prediction import Prediction as PredictionModel
-from models.user import User as UserModel
-from schemas.predictSchema import PredictInput, PredictOut
-from ml.predict_service import predict_diabetes
+from schemas.predictSchema import (
+    PredictInput,
+    PredictOut,
+    PredictBatchInput,
+    PredictBatchItemOut,
+    PredictBatchOut,
+)
+from ml.predict_service import predict_diabetes_async, predict_diabetes_batch
 from routes.authRoute import get_current_user
+from services.auth_cache import AuthPrincipal
+from services.user_stats import record_predictions
+from services.response_cache import response_cache, conditional_json
 from datetime import datetime
 from zoneinfo import ZoneInfo   # <-- tambahkan ini
 
 router = APIRouter(tags=["predict"], prefix="")
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 @router.post("/predict", response_model=PredictOut, status_code=status.HTTP_201_CREATED)
-def create_prediction(
+async def create_prediction(
     payload: PredictInput,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
     # payload adalah instance PredictInput — punya attribute .Pregnancies, .Glucose, dll
     try:
-        result = predict_diabetes(payload)
+        result = await predict_diabetes_async(payload)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction error: {e}")
 
@@ -45,26 +54,135 @@ def create_prediction(
         dpf=float(payload.DiabetesPedigreeFunction),
         prediction=int(result["prediction"]),
         probability=float(result["probability"]),
+        model_version=result["model_version"],
         createdAt=now_jakarta,   # <-- pakai waktu Jakarta
     )
 
     db.add(pred_obj)
-    db.commit()
-    db.refresh(pred_obj)
+    await db.flush()
+    # stats user ikut di transaksi yang sama
+    await record_predictions(db, pred_obj.user_id, [pred_obj], latest_id=pred_obj.id)
+    await db.commit()
+    response_cache.invalidate_user(pred_obj.user_id)
+    await db.refresh(pred_obj)
     return pred_obj
 
 
-@router.get("/predict/latest", response_model=PredictOut)
-def get_latest_prediction(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+def _score_batch_items(items):
+    """
+    Validasi setiap item lalu skor semua item valid dengan satu pass inference.
+    CPU-bound, dijalankan di threadpool oleh create_prediction_batch.
+    Mengembalikan (results, scored): results berisi PredictBatchItemOut untuk
+    item yang gagal (None untuk item valid), scored berisi (index, row, hasil).
+    """
+    results = [None] * len(items)
+    valid_idx = []
+    valid_rows = []
+
+    for i, item in enumerate(items):
+        try:
+            row = PredictInput.model_validate(item)
+        except ValidationError as e:
+            errors = "; ".join(
+                f"{'.'.join(str(loc) for loc in err['loc'])}: {err['msg']}" for err in e.errors()
+            )
+            results[i] = PredictBatchItemOut(index=i, status="error", error=errors)
+            continue
+
+        values = (row.Pregnancies, row.Glucose, row.BloodPressure, row.BMI, row.DiabetesPedigreeFunction)
+        if not all(math.isfinite(v) for v in values):
+            results[i] = PredictBatchItemOut(index=i, status="error", error="Values must be finite numbers")
+            continue
+
+        valid_idx.append(i)
+        valid_rows.append(row)
+
+    scored = predict_diabetes_batch(valid_rows)
+    return results, list(zip(valid_idx, valid_rows, scored))
+
+
+@router.post("/predict/batch", response_model=PredictBatchOut)
+async def create_prediction_batch(
+    payload: PredictBatchInput,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
-    pred = (
-        db.query(PredictionModel)
-        .filter(PredictionModel.user_id == current_user.id)
+    """
+    Skoring banyak pasien dalam satu request (mis. hari screening klinik).
+    Setiap item divalidasi sendiri; item yang gagal dilaporkan per index dan
+    tidak menggagalkan item lain. Semua item valid diskor dengan satu panggilan
+    model dan (jika save=true) disimpan dengan satu bulk insert + satu commit.
+    """
+    try:
+        results, scored = await run_in_threadpool(_score_batch_items, payload.items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Prediction error: {e}")
+
+    # gunakan timezone Asia/Jakarta (WIB), sama untuk seluruh batch
+    now_jakarta = datetime.now(tz=ZoneInfo("Asia/Jakarta"))
+    uid = int(current_user.id)
+
+    records = []
+    for i, row, result in scored:
+        results[i] = PredictBatchItemOut(
+            index=i,
+            status="ok",
+            prediction=result["prediction"],
+            probability=result["probability"],
+            model_version=result["model_version"],
+        )
+        records.append({
+            "user_id": uid,
+            "pregnancies": float(row.Pregnancies),
+            "glucose": float(row.Glucose),
+            "blood_pressure": float(row.BloodPressure),
+            "bmi": float(row.BMI),
+            "dpf": float(row.DiabetesPedigreeFunction),
+            "prediction": int(result["prediction"]),
+            "probability": float(result["probability"]),
+            "model_version": result["model_version"],
+            "createdAt": now_jakarta,
+        })
+
+    saved = 0
+    if payload.save and records:
+        # executemany -> satu multi-row INSERT di driver MySQL, tanpa refresh per baris
+        await db.execute(insert(PredictionModel), records)
+        # createdAt sama untuk seluruh batch, baris terbaru = id terbesar
+        latest_id = await db.scalar(
+            select(func.max(PredictionModel.id)).where(PredictionModel.user_id == uid)
+        )
+        await record_predictions(db, uid, records, latest_id=latest_id)
+        await db.commit()
+        response_cache.invalidate_user(uid)
+        saved = len(records)
+
+    return PredictBatchOut(
+        total=len(results),
+        succeeded=len(records),
+        failed=len(results) - len(records),
+        saved=saved,
+        createdAt=now_jakarta if saved else None,
+        results=results,
+    )
+
+
+async def _build_latest(db, uid):
+    pred = await db.scalar(
+        select(PredictionModel)
+        .where(PredictionModel.user_id == uid)
         .order_by(PredictionModel.createdAt.desc())
-        .first()
+        .limit(1)
     )
     if not pred:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No predictions found")
-    return pred
+    return PredictOut.model_validate(pred)
+
+
+@router.get("/predict/latest", response_model=PredictOut)
+async def get_latest_prediction(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+):
+    return await conditional_json(request, db, current_user, lambda: _build_latest(db, current_user.id))
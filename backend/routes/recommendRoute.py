@@ -1,30 +1,32 @@
 # backend/routes/recommendRoute.py
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 from typing import List
 
-from config.db import SessionLocal
+from config.db import AsyncSessionLocal
 from models.prediction import Prediction as PredictionModel
-from models.user import User as UserModel
 from routes.authRoute import get_current_user
-from schemas.recommendSchema import RecommendOut
-from ml.recomendation_service import generate_food_recommendation  # sesuai nama file Anda
+from services.auth_cache import AuthPrincipal
+from schemas.recommendSchema import RecommendOut, SimilarFoodOut
+from ml.recomendation_service import recommend_foods, SCORES, DEFAULT_SCORE  # sesuai nama file Anda
+from ml.similar_food_service import recommend_similar_foods
 
 router = APIRouter(prefix="/recommend", tags=["recommend"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @router.get("/food", response_model=RecommendOut)
-def recommend_food_for_user(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+async def recommend_food_for_user(
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+    limit: int = Query(10, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    sort: str = Query(DEFAULT_SCORE, description=f"Skor ranking: {', '.join(SCORES)}"),
 ):
     """
     Ambil prediksi terakhir user dan jalankan service rekomendasi makanan.
@@ -32,15 +34,19 @@ def recommend_food_for_user(
       - status: "success"
       - prediction: last prediction (0/1)
       - probability: last probability (float)
-      - recommendations: list of menu strings
+      - recommendations: list of menu strings (satu halaman, terurut sesuai `sort`)
+      - total: jumlah seluruh menu yang lolos filter
       - createdAt: waktu prediksi
     """
+    if sort not in SCORES:
+        raise HTTPException(status_code=400, detail=f"Invalid sort, choose one of: {', '.join(SCORES)}")
+
     try:
-        latest_pred = (
-            db.query(PredictionModel)
-            .filter(PredictionModel.user_id == current_user.id)
+        latest_pred = await db.scalar(
+            select(PredictionModel)
+            .where(PredictionModel.user_id == current_user.id)
             .order_by(PredictionModel.createdAt.desc())
-            .first()
+            .limit(1)
         )
 
         if not latest_pred:
@@ -53,13 +59,16 @@ def recommend_food_for_user(
             BMI = latest_pred.bmi
             DiabetesPedigreeFunction = latest_pred.dpf
 
-        recs = generate_food_recommendation(DataObj)
+        recs, total = recommend_foods(DataObj, limit=limit, offset=offset, score=sort)
 
         return {
             "status": "success",
             "prediction": int(latest_pred.prediction) if latest_pred.prediction is not None else None,
             "probability": float(latest_pred.probability) if latest_pred.probability is not None else None,
             "recommendations": recs,
+            "total": total,
+            "limit": limit,
+            "offset": offset,
             "createdAt": latest_pred.createdAt,
         }
 
@@ -67,4 +76,39 @@ def recommend_food_for_user(
         raise
     except Exception as e:
         # jangan leak exception stack, kembalikan 500 dengan pesan
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Recommendation error: {e}")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Recommendation error: {e}")
+
+
+@router.get("/similar", response_model=SimilarFoodOut)
+async def recommend_similar_foods_for_user(
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
+    k: int = Query(10, ge=1, le=100),
+):
+    """
+    k makanan dengan profil nutrisi (energi, karbohidrat, lemak, natrium,
+    kolesterol, protein) paling dekat dengan target yang diturunkan dari
+    prediksi terakhir user.
+    """
+    latest_pred = await db.scalar(
+        select(PredictionModel)
+        .where(PredictionModel.user_id == current_user.id)
+        .order_by(PredictionModel.createdAt.desc())
+        .limit(1)
+    )
+    if not latest_pred:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No prediction found for this user")
+
+    try:
+        target, foods = recommend_similar_foods(latest_pred, k=k)
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Recommendation error: {e}")
+
+    return {
+        "status": "success",
+        "prediction": latest_pred.prediction,
+        "probability": latest_pred.probability,
+        "target": target,
+        "foods": foods,
+        "createdAt": latest_pred.createdAt,
+    }
@@ -1,62 +1,43 @@
 # backend/routes/summaryRoute.py
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
-
-from config.db import SessionLocal
-from models.prediction import Prediction as PredictionModel
-from models.user import User as UserModel
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.db import AsyncSessionLocal
 from routes.authRoute import get_current_user
-from schemas.summarySchema import SummaryOut, SummaryLatest
+from services.auth_cache import AuthPrincipal
+from services.prediction_stats import fetch_prediction_overview
+from services.response_cache import conditional_json
+from services.serializers import summary_latest
+from schemas.summarySchema import SummaryOut
 
 router = APIRouter(prefix="/summary", tags=["summary"])
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
+
+
+async def _build_summary(db, uid):
+    overview = await fetch_prediction_overview(db, uid, recent_limit=1)
+
+    latest = overview["latest"]
+
+    # bentuk SummaryOut
+    return {
+        "total_predictions": overview["total"],
+        "diabetes_count": overview["diabetes"],
+        "non_diabetes_count": overview["non_diabetes"],
+        "avg_probability": overview["avg_probability"] or None,
+        "avg_glucose": overview["avg_glucose"] or None,
+        "avg_blood_pressure": overview["avg_blood_pressure"] or None,
+        "latest": summary_latest(latest) if latest else None,
+    }
 
 
 @router.get("/", response_model=SummaryOut)
-def get_summary(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+async def get_summary(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
-    uid = current_user.id
-
-    total = db.query(func.count(PredictionModel.id)).filter_by(user_id=uid).scalar() or 0
-    diabetes = db.query(func.count(PredictionModel.id)).filter_by(user_id=uid, prediction=1).scalar() or 0
-    non_diabetes = db.query(func.count(PredictionModel.id)).filter_by(user_id=uid, prediction=0).scalar() or 0
-
-    avg_prob = db.query(func.avg(PredictionModel.probability)).filter_by(user_id=uid).scalar()
-    avg_glucose = db.query(func.avg(PredictionModel.glucose)).filter_by(user_id=uid).scalar()
-    avg_bp = db.query(func.avg(PredictionModel.blood_pressure)).filter_by(user_id=uid).scalar()
-
-    latest = (
-        db.query(PredictionModel)
-        .filter_by(user_id=uid)
-        .order_by(PredictionModel.createdAt.desc())
-        .first()
-    )
-
-    latest_out = None
-    if latest:
-        latest_out = SummaryLatest(
-            id=latest.id,
-            prediction=latest.prediction,
-            probability=latest.probability,
-            createdAt=latest.createdAt,
-        )
-
-    return SummaryOut(
-        total_predictions=total,
-        diabetes_count=diabetes,
-        non_diabetes_count=non_diabetes,
-        avg_probability=float(avg_prob) if avg_prob else None,
-        avg_glucose=float(avg_glucose) if avg_glucose else None,
-        avg_blood_pressure=float(avg_bp) if avg_bp else None,
-        latest=latest_out
-    )
+    return await conditional_json(request, db, current_user, lambda: _build_summary(db, current_user.id))
@@ -1,47 +1,46 @@
 # backend/routes/userRoute.py
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from decimal import Decimal
 from datetime import datetime
 from typing import Optional
 from zoneinfo import ZoneInfo
 
-from config.db import SessionLocal
+from config.db import AsyncSessionLocal
 from models.user import User as UserModel
 from schemas.userSchema import UserOut, UserUpdate
 
 # import get_current_user yang mengembalikan objek user (dari authRoute)
-from .authRoute import get_current_user
+from .authRoute import get_current_user, principal_cache
+from services.auth_cache import AuthPrincipal
+from services.response_cache import response_cache
 
 router = APIRouter(prefix="/user", tags=["user"])
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
 @router.get("/me", response_model=UserOut)
-def read_profile(
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+async def read_profile(
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
-    user = db.get(UserModel, int(current_user.id))
+    user = await db.get(UserModel, int(current_user.id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
 
 
 @router.put("/me", response_model=UserOut)
-def update_profile(
+async def update_profile(
     payload: UserUpdate,
-    db: Session = Depends(get_db),
-    current_user: UserModel = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthPrincipal = Depends(get_current_user),
 ):
-    user: Optional[UserModel] = db.get(UserModel, int(current_user.id))
+    user: Optional[UserModel] = await db.get(UserModel, int(current_user.id))
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -96,7 +95,12 @@ def update_profile(
         raise HTTPException(status_code=400, detail="No valid fields to update")
 
     user.updatedAt = datetime.now(ZoneInfo("Asia/Jakarta"))
-    db.commit()
-    db.refresh(user)
+    # worker lain melihat profil berubah lewat versi ini (lihat get_current_user)
+    user.profileVersion = int(user.profileVersion or 0) + 1
+    await db.commit()
+    await db.refresh(user)
+    # principal yang di-cache masih memuat profil lama
+    principal_cache.invalidate_user(int(user.id))
+    response_cache.invalidate_user(int(user.id))
 
     return user
@@ -1,5 +1,5 @@
-from pydantic import BaseModel
-from typing import Optional, List
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List, Dict
 from datetime import datetime
 
 class DashboardRecentPrediction(BaseModel):
@@ -14,8 +14,7 @@ class DashboardRecentPrediction(BaseModel):
     probability: float
     createdAt: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class DashboardUserStats(BaseModel):
     total_predictions: int
@@ -31,4 +30,16 @@ class ChartDataPoint(BaseModel):
 class DashboardOut(BaseModel):
     user: DashboardUserStats
     recent_user_predictions: List[DashboardRecentPrediction] = []
-    chart_data: List[ChartDataPoint] = []
\ No newline at end of file
+    chart_data: List[ChartDataPoint] = []
+
+class ChartSeriesPoint(BaseModel):
+    t: str  # awal bucket (YYYY-MM-DD) atau waktu prediksi untuk bucket=raw
+    value: float
+    count: Optional[int] = None  # jumlah prediksi di bucket (None untuk raw)
+
+class ChartSeriesOut(BaseModel):
+    bucket: str  # bucket yang dipakai; "day" jika raw melebihi CHART_RAW_MAX_ROWS
+    params: List[str]
+    max_points: int
+    buckets: int  # jumlah bucket/baris sebelum downsampling
+    series: Dict[str, List[ChartSeriesPoint]] = {}
@@ -1,6 +1,6 @@
 # backend/schemas/historySchema.py
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Optional, List
 from datetime import datetime
 
 class HistoryItem(BaseModel):
@@ -15,5 +15,11 @@ class HistoryItem(BaseModel):
     probability: float
     createdAt: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
+
+class HistoryPage(BaseModel):
+    items: List[HistoryItem] = []
+    limit: int
+    # cursor opaque; kirim kembali lewat ?cursor= untuk halaman berikut/sebelumnya
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
@@ -0,0 +1,26 @@
+# backend/schemas/importSchema.py
+from pydantic import BaseModel
+from typing import Optional, List
+from datetime import datetime
+
+class ImportRowError(BaseModel):
+    line: int  # nomor baris di file CSV (header = 1)
+    error: str
+
+class ImportJobOut(BaseModel):
+    id: int
+    user_id: int
+    filename: Optional[str] = None
+    status: str  # pending | running | completed | failed
+    file_size: int
+    total_rows: Optional[int] = None
+    rows_processed: int
+    rows_imported: int
+    rows_failed: int
+    progress_percent: Optional[float] = None
+    errors: List[ImportRowError] = []
+    error_message: Optional[str] = None
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
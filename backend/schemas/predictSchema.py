@@ -1,6 +1,6 @@
 # backend/schemas/predictSchema.py
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Optional, List, Dict, Any
 from datetime import datetime
 
 class PredictInput(BaseModel):
@@ -12,10 +12,10 @@ class PredictInput(BaseModel):
     BMI: float = Field(..., alias="bmi")
     DiabetesPedigreeFunction: float = Field(..., alias="dpf")
 
-    class Config:
+    model_config = ConfigDict(
         # allow using aliases when parsing input JSON
-        allow_population_by_field_name = True
-        schema_extra = {
+        populate_by_name=True,
+        json_schema_extra={
             "example": {
                 "pregnancies": 2,
                 "glucose": 150,
@@ -23,7 +23,8 @@ class PredictInput(BaseModel):
                 "bmi": 35.0,
                 "dpf": 0.3,
             }
-        }
+        },
+    )
 
 class PredictOut(BaseModel):
     id: int
@@ -35,7 +36,30 @@ class PredictOut(BaseModel):
     dpf: Optional[float] = None
     prediction: int
     probability: float
+    model_version: Optional[str] = None
     createdAt: datetime
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
+
+
+class PredictBatchInput(BaseModel):
+    # setiap item divalidasi sendiri-sendiri di route (lihat create_prediction_batch),
+    # supaya satu baris yang salah tidak menggagalkan seluruh batch
+    items: List[Dict[str, Any]] = Field(..., min_length=1, max_length=5000)
+    save: bool = True
+
+class PredictBatchItemOut(BaseModel):
+    index: int
+    status: str  # "ok" atau "error"
+    prediction: Optional[int] = None
+    probability: Optional[float] = None
+    model_version: Optional[str] = None
+    error: Optional[str] = None
+
+class PredictBatchOut(BaseModel):
+    total: int
+    succeeded: int
+    failed: int
+    saved: int
+    createdAt: Optional[datetime] = None
+    results: List[PredictBatchItemOut] = []
@@ -1,6 +1,6 @@
 # backend/schemas/recommendSchema.py
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict
+from typing import Dict, List, Optional
 from datetime import datetime
 
 class RecommendOut(BaseModel):
@@ -8,7 +8,22 @@ class RecommendOut(BaseModel):
     prediction: Optional[int] = None
     probability: Optional[float] = None
     recommendations: List[str] = []
+    total: Optional[int] = None
+    limit: Optional[int] = None
+    offset: Optional[int] = None
     createdAt: Optional[datetime] = None
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class SimilarFood(BaseModel):
+    menu: str
+    distance: float
+    nutrients: Dict[str, float] = {}
+
+class SimilarFoodOut(BaseModel):
+    status: str
+    prediction: Optional[int] = None
+    probability: Optional[float] = None
+    target: Dict[str, float] = {}
+    foods: List[SimilarFood] = []
+    createdAt: Optional[datetime] = None
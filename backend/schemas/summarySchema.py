@@ -1,5 +1,5 @@
 # backend/schemas/summarySchema.py
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -9,8 +9,7 @@ class SummaryLatest(BaseModel):
     probability: float
     createdAt: datetime
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
 
 class SummaryOut(BaseModel):
     total_predictions: int
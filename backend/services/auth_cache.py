@@ -0,0 +1,156 @@
+# backend/services/auth_cache.py
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional
+
+
+@dataclass(frozen=True)
+class AuthPrincipal:
+    """Snapshot user yang sudah terautentikasi, aman dibagi antar request."""
+
+    id: int
+    name: str
+    email: str
+    height: Optional[float] = None
+    weight: Optional[float] = None
+    bmi: Optional[Decimal] = None
+    createdAt: Optional[datetime] = None
+    updatedAt: Optional[datetime] = None
+    tokenVersion: int = 0
+    profileVersion: int = 0
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(
+            id=int(user.id),
+            name=user.name,
+            email=user.email,
+            height=user.height,
+            weight=user.weight,
+            bmi=user.bmi,
+            createdAt=user.createdAt,
+            updatedAt=user.updatedAt,
+            tokenVersion=int(user.tokenVersion or 0),
+            profileVersion=int(user.profileVersion or 0),
+        )
+
+    def versions(self):
+        return self.tokenVersion, self.profileVersion
+
+
+class PrincipalCache:
+    """
+    Cache token terverifikasi -> AuthPrincipal. Key = sha256 token, entry
+    berlaku sampai `exp` token atau `ttl` detik (mana yang lebih cepat).
+
+    Setiap user punya generation counter; invalidate_user() menaikkannya
+    sehingga semua entry user itu langsung dianggap basi di proses ini.
+    Perubahan dari worker lain terlihat lewat users.tokenVersion /
+    profileVersion: entry yang terakhir dicek lebih dari `revalidate` detik
+    lalu harus dicocokkan dulu ke DB oleh pemanggil (lihat get()).
+    """
+
+    def __init__(self, maxsize=10000, ttl=300.0, revalidate=5.0):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self.revalidate = float(revalidate)
+        self._data = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.revalidations = 0
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    @staticmethod
+    def token_key(token):
+        return hashlib.sha256(token.encode()).digest()
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, token):
+        """
+        (principal, perlu_cek) atau None. perlu_cek=True jika versi user di DB
+        belum dicek selama `revalidate` detik; jika versinya masih sama,
+        pemanggil menandai entry lewat touch().
+        """
+        if not self.enabled:
+            return None
+        key = self.token_key(token)
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, principal, generation, checked_at = entry
+                if expires_at > now and generation == self._generations.get(principal.id, 0):
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return principal, now - checked_at >= self.revalidate
+                del self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, token, principal, exp, generation):
+        """
+        `generation` harus diambil SEBELUM user dibaca dari DB; jika user
+        di-invalidate di antaranya, entry tidak disimpan.
+        """
+        if not self.enabled:
+            return
+        expires_at = min(float(exp), time.time() + self.ttl)
+        with self._lock:
+            if generation != self._generations.get(principal.id, 0):
+                return
+            key = self.token_key(token)
+            self._data[key] = (expires_at, principal, generation, time.time())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def touch(self, token):
+        """Versi user baru saja dicocokkan ke DB dan masih sama."""
+        key = self.token_key(token)
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                self._data[key] = entry[:3] + (time.time(),)
+            self.revalidations += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "revalidate_seconds": self.revalidate,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else None,
+                "evictions": self.evictions,
+                "user_invalidations": self.invalidations,
+                "revalidations": self.revalidations,
+            }
@@ -0,0 +1,163 @@
+# backend/services/chart.py
+import os
+
+import numpy as np
+from sqlalchemy import func, select
+
+from models.prediction import Prediction as PredictionModel
+from services.export import LOCAL_TZ
+from services.prediction_stats import CHART_PARAMS
+
+BUCKETS = ("day", "week", "month", "raw")
+DEFAULT_MAX_POINTS = 500
+# batas baris yang dibaca bucket=raw; rentang yang lebih besar dijawab dengan
+# rata-rata harian dari SQL supaya memori per request tetap terbatas
+RAW_MAX_ROWS = int(os.getenv("CHART_RAW_MAX_ROWS", "50000"))
+
+
+def bucket_expression(dialect, column, bucket):
+    """
+    Ekspresi SQL awal bucket (string 'YYYY-MM-DD') untuk GROUP BY; minggu
+    dimulai hari Senin. Tiap dialect punya fungsi tanggal sendiri.
+    """
+    if dialect == "sqlite":
+        if bucket == "day":
+            return func.strftime("%Y-%m-%d", column)
+        if bucket == "week":
+            # 'weekday 0' = maju ke Minggu berikutnya (atau hari itu), lalu mundur 6 hari
+            return func.date(column, "weekday 0", "-6 days")
+        return func.strftime("%Y-%m-01", column)
+    if dialect == "postgresql":
+        return func.to_char(func.date_trunc(bucket, column), "YYYY-MM-DD")
+    # mysql / mariadb
+    if bucket == "day":
+        return func.date_format(column, "%Y-%m-%d")
+    if bucket == "week":
+        # WEEKDAY: Senin = 0
+        return func.date_format(func.from_days(func.to_days(column) - func.weekday(column)), "%Y-%m-%d")
+    return func.date_format(column, "%Y-%m-01")
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets: pilih `threshold` titik dari (x, y) yang
+    mempertahankan bentuk grafik. Titik pertama dan terakhir selalu dipakai.
+    Mengembalikan index titik terpilih (urut naik).
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    # batas bucket untuk titik di antara titik pertama dan terakhir
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # rata-rata bucket berikutnya sebagai titik ketiga segitiga
+        next_start, next_end = edges[i + 1], (edges[i + 2] if i + 2 < len(edges) else n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _downsample(x, values, max_points):
+    """Index titik (nilai NULL dibuang) yang dipertahankan LTTB."""
+    valid = np.flatnonzero(~np.isnan(values))
+    return valid[lttb(x[valid], values[valid], max_points)]
+
+
+def _in_range(stmt, uid, date_from, date_to):
+    P = PredictionModel
+    stmt = stmt.where(P.user_id == uid)
+    if date_from is not None:
+        stmt = stmt.where(P.createdAt >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(P.createdAt < date_to)
+    return stmt
+
+
+async def aggregated_series(db, uid, params, bucket, date_from=None, date_to=None, max_points=DEFAULT_MAX_POINTS):
+    """
+    Rata-rata per bucket waktu (GROUP BY di SQL) untuk beberapa parameter
+    sekaligus. Jika jumlah bucket melebihi max_points, tiap seri diturunkan
+    dengan LTTB.
+    """
+    P = PredictionModel
+    b = bucket_expression(db.bind.dialect.name, P.createdAt, bucket).label("bucket")
+
+    stmt = _in_range(select(b, func.count(P.id).label("count"), *(
+        func.avg(getattr(P, CHART_PARAMS[p])).label(p) for p in params
+    )), uid, date_from, date_to)
+    rows = (await db.execute(stmt.group_by(b).order_by(b))).all()
+
+    labels = [str(row.bucket) for row in rows]
+    counts = [int(row.count) for row in rows]
+    series = {}
+    for p in params:
+        values = np.array([getattr(row, p) if getattr(row, p) is not None else np.nan for row in rows], dtype=float)
+        keep = _downsample(np.arange(len(rows), dtype=float), values, max_points)
+        series[p] = [
+            {"t": labels[i], "value": round(float(values[i]), 4), "count": counts[i]}
+            for i in keep.tolist()
+        ]
+    return {"buckets": len(rows), "series": series}
+
+
+async def raw_series(db, uid, params, date_from=None, date_to=None, max_points=DEFAULT_MAX_POINTS,
+                     chunk_rows=5000, max_rows=None):
+    """
+    Seri mentah per prediksi, diturunkan dengan LTTB ke max_points titik per
+    parameter. Baris dibaca per chunk (yield_per) langsung ke array numpy
+    yang ukurannya dari COUNT; jika lebih dari `max_rows` (CHART_RAW_MAX_ROWS)
+    dipakai aggregated_series per hari dan hasilnya bertanda bucket="day".
+    """
+    P = PredictionModel
+    max_rows = RAW_MAX_ROWS if max_rows is None else max_rows
+    total = await db.scalar(_in_range(select(func.count(P.id)), uid, date_from, date_to))
+    if total > max_rows:
+        data = await aggregated_series(db, uid, params, "day", date_from, date_to, max_points)
+        return {"bucket": "day", **data}
+
+    stmt = _in_range(select(P.createdAt, *(getattr(P, CHART_PARAMS[p]) for p in params)), uid, date_from, date_to)
+    stmt = stmt.order_by(P.createdAt, P.id).execution_options(yield_per=chunk_rows)
+
+    # baris yang masuk di antara COUNT dan SELECT diabaikan (tetap <= total)
+    times = []
+    x = np.empty(total, dtype=float)
+    columns = np.full((len(params), total), np.nan)
+    result = await db.stream(stmt)
+    async for rows in result.partitions():
+        for row in rows:
+            n = len(times)
+            if n == total:
+                break
+            times.append(row[0])
+            # createdAt disimpan naive dalam WIB: tz eksplisit supaya sumbu x
+            # tidak bergeser mengikuti timezone server
+            x[n] = row[0].replace(tzinfo=LOCAL_TZ).timestamp()
+            for i in range(len(params)):
+                if row[i + 1] is not None:
+                    columns[i, n] = row[i + 1]
+    x = x[:len(times)]
+
+    series = {}
+    for p, values in zip(params, columns):
+        keep = _downsample(x, values[:len(times)], max_points)
+        series[p] = [
+            {"t": times[i].isoformat(), "value": round(float(values[i]), 4), "count": None}
+            for i in keep.tolist()
+        ]
+    return {"buckets": len(times), "series": series}
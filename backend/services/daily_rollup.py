@@ -0,0 +1,361 @@
+# backend/services/daily_rollup.py
+import asyncio
+import logging
+import math
+import os
+import sys
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from config.db import AsyncSessionLocal
+import models.user  # relationship Prediction.user butuh model User terdaftar (mode CLI)
+from models.prediction import Prediction as PredictionModel
+from models.daily_rollup import PredictionDailyRollup, RollupWatermark
+from services.chart import bucket_expression
+
+logger = logging.getLogger(__name__)
+
+# kolom fitur yang dicatat count/sum-nya per hari
+TRACKED = ("glucose", "bmi", "blood_pressure")
+
+# kolom penjumlah di rollup; urutan ini dipakai fetch_rollups/analytics
+SUM_COLUMNS = ("total", "diabetes_count", "sum_probability") + tuple(
+    column for name in TRACKED for column in (f"{name}_count", f"sum_{name}")
+)
+
+ROLLUP_BUCKETS = ("day", "week", "month")
+
+# nama baris di rollup_watermarks
+WATERMARK = "daily"
+
+
+def _update_values(delta):
+    R = PredictionDailyRollup
+    values = {key: getattr(R, key) + value for key, value in delta.items() if value}
+    values["updatedAt"] = datetime.utcnow()
+    return values
+
+
+async def _add_day(db, day, delta):
+    """
+    Tambahkan delta satu hari: UPDATE dulu, jika baris hari itu belum ada
+    di-INSERT di dalam savepoint, dan jika INSERT kalah balapan UPDATE diulang.
+    """
+    R = PredictionDailyRollup
+    stmt = update(R).where(R.day == day)
+    result = await db.execute(stmt.values(**_update_values(delta)))
+    if result.rowcount:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(R).values(day=day, updatedAt=datetime.utcnow(), **delta))
+    except IntegrityError:
+        await db.execute(stmt.values(**_update_values(delta)))
+
+
+# ==============================
+# WATERMARK
+# ==============================
+async def _watermark(db):
+    """Id prediksi terakhir yang sudah masuk rollup, None jika belum pernah dibangun."""
+    W = RollupWatermark
+    return await db.scalar(select(W.last_id).where(W.name == WATERMARK))
+
+
+async def _advance(db, last, high):
+    """
+    Geser watermark dari `last` ke `high` dengan UPDATE bersyarat (seperti
+    klaim email outbox): hanya satu worker yang menang untuk rentang id yang
+    sama. Baris watermark ikut terkunci sampai commit.
+    """
+    W = RollupWatermark
+    now = datetime.utcnow()
+    if last is not None:
+        result = await db.execute(
+            update(W).where(W.name == WATERMARK, W.last_id == last).values(last_id=high, updatedAt=now)
+        )
+        return result.rowcount == 1
+    try:
+        async with db.begin_nested():
+            await db.execute(insert(W).values(name=WATERMARK, last_id=high, updatedAt=now))
+        return True
+    except IntegrityError:
+        return False
+
+
+async def roll_forward(db, upto_id):
+    """
+    Masukkan prediksi dengan watermark < id <= upto_id ke rollup: satu
+    GROUP BY per hari atas rentang id itu, lalu satu UPDATE/INSERT per hari,
+    di satu transaksi bersama watermark. Request /predict dan import tidak
+    pernah menyentuh tabel rollup.
+
+    Hari tanpa baris rollup berarti belum ada prediksi dengan id <= watermark
+    di hari itu, jadi baris baru cukup berisi delta (termasuk import data
+    historis). Tanpa watermark (DB lama / pertama kali) rollup dibangun ulang
+    penuh. Mengembalikan jumlah hari yang diperbarui.
+    """
+    last = await _watermark(db)
+    if last is None:
+        return await rebuild(db)
+    if upto_id is None or upto_id <= last:
+        return 0
+
+    stmt = _live_statement(db.bind.dialect.name, after_id=last, upto_id=upto_id)
+    rows = [_live_row_values(row) for row in (await db.execute(stmt)).all()]
+    if not await _advance(db, last, upto_id):
+        # worker lain sudah memproses rentang ini
+        await db.rollback()
+        return 0
+    # hari urut naik: dua transaksi selalu mengunci baris dengan urutan sama
+    for values in sorted(rows, key=lambda r: r["day"]):
+        day = values.pop("day")
+        await _add_day(db, day, values)
+    await db.commit()
+    return len(rows)
+
+
+class DailyRollupWorker:
+    """
+    Task latar yang memajukan rollup harian setiap `interval` detik.
+
+    Id prediksi dialokasikan saat INSERT, sebelum commit; transaksi yang belum
+    commit bisa meninggalkan celah di bawah max(id). Karena itu setiap putaran
+    hanya memproses sampai max(id) yang terlihat pada putaran sebelumnya
+    (satu interval lalu). Insert yang transaksinya lebih lama dari itu bisa
+    terlewat: `python -m services.daily_rollup check` mendeteksinya dan
+    `rebuild` memperbaikinya.
+    """
+
+    def __init__(self, session_factory, interval=10.0):
+        self.session_factory = session_factory
+        self.interval = interval
+        self._task = None
+        self._observed = None
+        self.runs = 0
+        self.days_updated = 0
+
+    @classmethod
+    def from_env(cls, session_factory=AsyncSessionLocal):
+        return cls(session_factory, interval=float(os.getenv("DAILY_ROLLUP_INTERVAL", "10")))
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="daily-rollup-worker")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh_once(self):
+        """Satu putaran: proses sampai id yang teramati sebelumnya, catat max(id) sekarang."""
+        async with self.session_factory() as db:
+            settled = self._observed
+            self._observed = await db.scalar(select(func.max(PredictionModel.id)))
+            await db.commit()
+            days = await roll_forward(db, settled) if settled is not None else 0
+        self.runs += 1
+        self.days_updated += days
+        return days
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Daily rollup refresh failed")
+            await asyncio.sleep(self.interval)
+
+
+rollup_worker = DailyRollupWorker.from_env()
+
+
+# ==============================
+# QUERY
+# ==============================
+def _range_filter(stmt, date_from, date_to):
+    R = PredictionDailyRollup
+    if date_from is not None:
+        stmt = stmt.where(R.day >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(R.day <= date_to)
+    return stmt
+
+
+async def fetch_rollups(db, bucket="day", date_from=None, date_to=None):
+    """
+    Jumlah rollup per bucket (tuple 'YYYY-MM-DD' + SUM_COLUMNS) urut waktu;
+    date_from/date_to inklusif. GROUP BY minggu/bulan dijalankan di database
+    atas tabel rollup (satu baris per hari), jadi bertahun-tahun data tetap
+    beberapa milidetik.
+    """
+    R = PredictionDailyRollup
+    start = bucket_expression(db.bind.dialect.name, R.day, bucket).label("bucket")
+    stmt = select(start, *(func.sum(getattr(R, key)).label(key) for key in SUM_COLUMNS))
+    stmt = _range_filter(stmt, date_from, date_to).group_by(start).order_by(start)
+    return (await db.execute(stmt)).all()
+
+
+def _point(acc):
+    def avg(total, count):
+        return (total / count) if count else None
+
+    point = {
+        "total": acc["total"],
+        "diabetes": acc["diabetes_count"],
+        "non_diabetes": acc["total"] - acc["diabetes_count"],
+        "positive_rate": avg(acc["diabetes_count"], acc["total"]),
+        "avg_probability": avg(acc["sum_probability"], acc["total"]),
+    }
+    for name in TRACKED:
+        point[f"avg_{name}"] = avg(acc[f"sum_{name}"], acc[f"{name}_count"])
+    return point
+
+
+def analytics(rows):
+    """
+    Seri per bucket plus total keseluruhan dari hasil fetch_rollups.
+    Rata-rata dihitung dari jumlah sum/count, bukan rata-rata dari rata-rata.
+    Bucket tanpa prediksi tidak muncul di seri.
+    """
+    series = [{"date": start, **_point(dict(zip(SUM_COLUMNS, sums)))} for start, *sums in rows]
+    totals = [sum(column) for column in zip(*(row[1:] for row in rows))] or [0] * len(SUM_COLUMNS)
+    return {"totals": _point(dict(zip(SUM_COLUMNS, totals))), "series": series}
+
+
+# ==============================
+# REBUILD / CHECK
+# ==============================
+def _live_statement(dialect, date_from=None, date_to=None, bucket="day", after_id=None, upto_id=None):
+    # kolom: day + SUM_COLUMNS (urutan sama dengan fetch_rollups);
+    # after_id < id <= upto_id membatasi ke rentang watermark
+    P = PredictionModel
+    day = bucket_expression(dialect, P.createdAt, bucket).label("day")
+    columns = [
+        day,
+        func.count(P.id).label("total"),
+        func.sum(case((P.prediction == 1, 1), else_=0)).label("diabetes_count"),
+        func.sum(P.probability).label("sum_probability"),
+    ]
+    for name in TRACKED:
+        column = getattr(P, name)
+        columns += [func.count(column).label(f"{name}_count"), func.sum(column).label(f"sum_{name}")]
+    stmt = select(*columns).group_by(day)
+    if date_from is not None:
+        stmt = stmt.where(P.createdAt >= datetime.combine(date_from, datetime.min.time()))
+    if date_to is not None:
+        stmt = stmt.where(P.createdAt < datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    if after_id is not None:
+        stmt = stmt.where(P.id > after_id)
+    if upto_id is not None:
+        stmt = stmt.where(P.id <= upto_id)
+    return stmt
+
+
+def _live_row_values(row):
+    values = dict(row._mapping)
+    values["day"] = date.fromisoformat(values["day"])
+    for key, value in values.items():
+        if key.startswith("sum_"):
+            values[key] = float(value or 0.0)
+    values["diabetes_count"] = int(values["diabetes_count"] or 0)
+    return values
+
+
+async def _live(db, date_from=None, date_to=None, upto_id=None):
+    stmt = _live_statement(db.bind.dialect.name, date_from, date_to, upto_id=upto_id)
+    return [_live_row_values(row) for row in (await db.execute(stmt)).all()]
+
+
+async def rebuild(db, date_from=None, date_to=None):
+    """
+    Hitung ulang rollup dari tabel predictions (semua hari atau rentang
+    tanggal inklusif). Rebuild penuh juga menggeser watermark ke max(id);
+    rebuild rentang hanya menghitung prediksi sampai watermark yang ada.
+    """
+    last = await _watermark(db)
+    full = date_from is None and date_to is None
+    if full or last is None:
+        date_from = date_to = None
+        high = await db.scalar(select(func.max(PredictionModel.id))) or 0
+    else:
+        high = last
+
+    records = await _live(db, date_from, date_to, upto_id=high)
+    if high != last and not await _advance(db, last, high):
+        await db.rollback()
+        raise RuntimeError("Rollup sedang diperbarui worker lain, ulangi rebuild")
+    await db.execute(_range_filter(delete(PredictionDailyRollup), date_from, date_to))
+    now = datetime.utcnow()
+    records = [{**r, "updatedAt": now} for r in records]
+    if records:
+        await db.execute(insert(PredictionDailyRollup), records)
+    await db.commit()
+    return len(records)
+
+
+def _same(a, b):
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+
+async def check(db, date_from=None, date_to=None):
+    """
+    Bandingkan rollup tersimpan dengan agregat live sampai watermark.
+    Mengembalikan list (tanggal, kolom, tersimpan, live) untuk setiap perbedaan.
+    """
+    last = await _watermark(db)
+    live = {r["day"]: r for r in await _live(db, date_from, date_to, upto_id=last or 0)}
+    stmt = _range_filter(select(PredictionDailyRollup), date_from, date_to)
+    stored = {r.day: r for r in (await db.scalars(stmt)).all()}
+
+    mismatches = []
+    for day in sorted(set(live) | set(stored)):
+        expected, actual = live.get(day), stored.get(day)
+        if expected is None:
+            mismatches.append((day, "row", "present", None))
+            continue
+        if actual is None:
+            mismatches.append((day, "row", None, "present"))
+            continue
+        for column, value in expected.items():
+            if column != "day" and not _same(getattr(actual, column), value):
+                mismatches.append((day, column, getattr(actual, column), value))
+    return mismatches
+
+
+def _date_arg(argv, flag):
+    return date.fromisoformat(argv[argv.index(flag) + 1]) if flag in argv else None
+
+
+async def _main(argv):
+    command = argv[0] if argv else "check"
+    date_from, date_to = _date_arg(argv, "--from"), _date_arg(argv, "--to")
+    async with AsyncSessionLocal() as db:
+        if command == "rebuild":
+            count = await rebuild(db, date_from, date_to)
+            print(f"Rollup {count} hari dibangun ulang")
+            return 0
+        if command == "check":
+            mismatches = await check(db, date_from, date_to)
+            for day, column, stored, live in mismatches:
+                print(f"{day}: {column} tersimpan={stored} live={live}")
+            print(f"{len(mismatches)} perbedaan ditemukan")
+            return 1 if mismatches else 0
+    print("Perintah: rebuild | check [--from YYYY-MM-DD] [--to YYYY-MM-DD]")
+    return 2
+
+
+if __name__ == "__main__":
+    # jalankan dari folder backend/: python -m services.daily_rollup rebuild|check [--from ..] [--to ..]
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
@@ -0,0 +1,128 @@
+# backend/services/export.py
+import csv
+import io
+import json
+import zlib
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import select
+
+from config.db import AsyncSessionLocal
+from models.prediction import Prediction as PredictionModel
+
+EXPORT_COLUMNS = [
+    "id",
+    "user_id",
+    "pregnancies",
+    "glucose",
+    "blood_pressure",
+    "bmi",
+    "dpf",
+    "prediction",
+    "probability",
+    "model_version",
+    "outcome",
+    "createdAt",
+]
+
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+}
+
+# createdAt disimpan tanpa timezone dalam waktu Jakarta (WIB)
+LOCAL_TZ = ZoneInfo("Asia/Jakarta")
+
+# baris per fetch dari server-side cursor, sekaligus ukuran chunk yang di-encode
+EXPORT_CHUNK_ROWS = 2000
+
+
+def local_naive(value):
+    """Filter tanggal dari query string -> waktu WIB tanpa timezone seperti kolom createdAt."""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(LOCAL_TZ).replace(tzinfo=None)
+
+
+def export_statement(uid=None, date_from=None, date_to=None):
+    """
+    SELECT kolom mentah (bukan objek ORM) supaya baris tidak masuk identity
+    map session; urut (user_id, createdAt, id) mengikuti index komposit.
+    """
+    P = PredictionModel
+    stmt = select(*(getattr(P, c) for c in EXPORT_COLUMNS))
+    if uid is not None:
+        stmt = stmt.where(P.user_id == uid)
+    if date_from is not None:
+        stmt = stmt.where(P.createdAt >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(P.createdAt < date_to)
+    return stmt.order_by(P.user_id, P.createdAt, P.id)
+
+
+async def iter_row_chunks(stmt, chunk_rows=EXPORT_CHUNK_ROWS, session_factory=AsyncSessionLocal):
+    """
+    Stream hasil query per chunk lewat server-side cursor (db.stream +
+    yield_per). Session dibuka sendiri karena generator ini berjalan selama
+    StreamingResponse mengirim body, setelah dependency get_db selesai.
+    """
+    async with session_factory() as db:
+        result = await db.stream(stmt.execution_options(yield_per=chunk_rows))
+        async for rows in result.partitions():
+            yield rows
+
+
+def _value(v):
+    return v.isoformat() if isinstance(v, datetime) else v
+
+
+def encode_csv(rows, header=False):
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows([_value(v) for v in row] for row in rows)
+    return buf.getvalue()
+
+
+def encode_ndjson(rows):
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, (_value(v) for v in row))), separators=(",", ":")) + "\n"
+        for row in rows
+    )
+
+
+async def stream_export(stmt, fmt="csv", gzip=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """
+    Generator bytes untuk StreamingResponse. Hanya satu chunk yang berada di
+    memori pada satu waktu, berapapun jumlah barisnya. gzip=True membungkus
+    output dengan zlib (wbits=31 = format gzip) secara incremental.
+    """
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if gzip else None
+
+    def emit(text):
+        data = text.encode("utf-8")
+        return compressor.compress(data) if compressor is not None else data
+
+    if fmt == "csv":
+        header = emit(encode_csv([], header=True))
+        if header:
+            yield header
+
+    async for rows in iter_row_chunks(stmt, chunk_rows):
+        data = emit(encode_csv(rows) if fmt == "csv" else encode_ndjson(rows))
+        if data:
+            yield data
+
+    if compressor is not None:
+        yield compressor.flush()
+
+
+def export_response_meta(fmt, gzip, name):
+    """(media_type, filename) untuk header Content-Disposition."""
+    media_type, ext = FORMATS[fmt]
+    filename = f"{name}-{datetime.utcnow():%Y%m%d-%H%M%S}.{ext}"
+    if gzip:
+        return "application/gzip", filename + ".gz"
+    return media_type, filename
@@ -0,0 +1,88 @@
+# backend/services/history.py
+import base64
+import json
+from datetime import datetime
+
+from sqlalchemy import or_, select
+
+from models.prediction import Prediction as PredictionModel
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(pred, direction):
+    """Cursor opaque (base64url JSON) dari posisi (createdAt, id) sebuah baris."""
+    raw = json.dumps(
+        {"c": pred.createdAt.isoformat(), "i": int(pred.id), "d": direction},
+        separators=(",", ":"),
+    )
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        data = json.loads(raw)
+        direction = data["d"]
+        if direction not in ("next", "prev"):
+            raise ValueError(direction)
+        return datetime.fromisoformat(data["c"]), int(data["i"]), direction
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def page_statement(uid, limit, cursor=None, date_from=None, date_to=None):
+    """
+    SELECT satu halaman riwayat, urut (createdAt, id) menurun, memakai index
+    (user_id, createdAt, id). Posisi cursor diekspresikan sebagai
+    createdAt <= c AND (createdAt < c OR id < i): predikat pertama memberi
+    range scan pada index di MySQL maupun SQLite (bentuk OR murni tidak).
+    Mengambil limit + 1 baris untuk tahu ada halaman berikutnya. Halaman
+    "prev" diambil menaik lalu dibalik oleh build_page.
+    """
+    P = PredictionModel
+    stmt = select(P).where(P.user_id == uid)
+    if date_from is not None:
+        stmt = stmt.where(P.createdAt >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(P.createdAt < date_to)
+
+    direction = "next"
+    if cursor is not None:
+        created, pid, direction = cursor
+        if direction == "next":
+            stmt = stmt.where(P.createdAt <= created, or_(P.createdAt < created, P.id < pid))
+        else:
+            stmt = stmt.where(P.createdAt >= created, or_(P.createdAt > created, P.id > pid))
+
+    if direction == "next":
+        stmt = stmt.order_by(P.createdAt.desc(), P.id.desc())
+    else:
+        stmt = stmt.order_by(P.createdAt.asc(), P.id.asc())
+    return stmt.limit(limit + 1)
+
+
+def build_page(rows, limit, cursor=None):
+    """(items terurut menurun, next_cursor, prev_cursor) dari hasil page_statement."""
+    direction = cursor[2] if cursor is not None else "next"
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    if not rows:
+        return rows, None, None
+    # ke arah asal cursor pasti masih ada data (baris cursor itu sendiri)
+    more_next = has_more if direction == "next" else True
+    more_prev = has_more if direction == "prev" else cursor is not None
+    next_cursor = encode_cursor(rows[-1], "next") if more_next else None
+    prev_cursor = encode_cursor(rows[0], "prev") if more_prev else None
+    return rows, next_cursor, prev_cursor
+
+
+async def fetch_page(db, uid, limit, cursor=None, date_from=None, date_to=None):
+    stmt = page_statement(uid, limit, cursor, date_from, date_to)
+    rows = list((await db.scalars(stmt)).all())
+    return build_page(rows, limit, cursor)
@@ -0,0 +1,497 @@
+# backend/services/importer.py
+import asyncio
+import csv
+import json
+import logging
+import math
+import os
+import sys
+from datetime import datetime, timedelta
+from zoneinfo import ZoneInfo
+
+import numpy as np
+from sqlalchemy import insert, or_, and_, select, update
+
+from config.db import AsyncSessionLocal
+import models.user  # relationship Prediction.user butuh model User terdaftar (mode CLI)
+from models.import_job import ImportJob
+from models.prediction import Prediction as PredictionModel
+from ml.predict_service import predict_matrix
+from services.export import local_naive
+from services.response_cache import response_cache
+from services.user_stats import record_predictions
+
+logger = logging.getLogger(__name__)
+
+IMPORT_DIR = os.getenv("IMPORT_DIR") or os.path.join(os.path.dirname(__file__), "..", "data", "imports")
+IMPORT_CHUNK_ROWS = int(os.getenv("IMPORT_CHUNK_ROWS", "5000"))  # baris per transaksi
+IMPORT_INSERT_ROWS = int(os.getenv("IMPORT_INSERT_ROWS", "1000"))  # baris per multi-row INSERT
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))  # error per baris yang disimpan
+IMPORT_MAX_BYTES = int(os.getenv("IMPORT_MAX_BYTES", str(512 * 1024 * 1024)))
+# job "running" tanpa heartbeat selama ini dianggap worker-nya mati dan boleh dilanjutkan
+IMPORT_LEASE_SECONDS = float(os.getenv("IMPORT_LEASE_SECONDS", "300"))
+# saat shutdown job diberi waktu sekian detik untuk menyelesaikan chunk berjalan
+IMPORT_STOP_TIMEOUT = float(os.getenv("IMPORT_STOP_TIMEOUT", "10"))
+# upload ditulis ke disk per blok sebesar ini (di thread, bukan di event loop)
+IMPORT_WRITE_BYTES = 1024 * 1024
+
+# header CSV (lowercase, tanpa spasi/underscore) -> kolom Prediction; sama
+# dengan nama field dan alias PredictInput
+HEADER_ALIASES = {
+    "pregnancies": "pregnancies",
+    "glucose": "glucose",
+    "bloodpressure": "blood_pressure",
+    "bmi": "bmi",
+    "dpf": "dpf",
+    "diabetespedigreefunction": "dpf",
+    "createdat": "createdAt",
+    "date": "createdAt",
+    "outcome": "outcome",
+}
+# nilai kolom Outcome selain angka 0/1
+OUTCOME_VALUES = {"true": 1, "false": 0, "yes": 1, "no": 0}
+# kolom Prediction dengan urutan yang sama seperti FEATURES di predict_service
+FEATURE_COLUMNS = ["pregnancies", "glucose", "blood_pressure", "bmi", "dpf"]
+
+
+class ImportFileError(Exception):
+    """Kesalahan fatal yang menghentikan job (mis. header tidak lengkap)."""
+
+
+def _normalize_header(name):
+    return name.strip().lower().replace("_", "").replace(" ", "")
+
+
+def map_header(header):
+    """Posisi tiap kolom yang dikenali; error jika kolom fitur ada yang kurang."""
+    positions = {}
+    for i, name in enumerate(header):
+        column = HEADER_ALIASES.get(_normalize_header(name))
+        if column is not None and column not in positions:
+            positions[column] = i
+    missing = [c for c in FEATURE_COLUMNS if c not in positions]
+    if missing:
+        raise ImportFileError(f"Missing columns: {', '.join(missing)}")
+    return positions
+
+
+def count_rows(path):
+    """Perkiraan jumlah baris data (jumlah baris minus header), dibaca biner per blok."""
+    lines = 0
+    last = b"\n"
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(1 << 20)
+            if not block:
+                break
+            lines += block.count(b"\n")
+            last = block[-1:]
+    if last != b"\n":
+        lines += 1
+    return max(lines - 1, 0)
+
+
+class ChunkReader:
+    """
+    Membaca CSV secara streaming dan mengembalikan chunk baris yang sudah
+    divalidasi dan diskor. Dipanggil di thread (CPU-bound) oleh run_import.
+    """
+
+    def __init__(self, path, skip_rows=0):
+        self._file = open(path, "r", newline="", encoding="utf-8-sig")
+        self._reader = csv.reader(self._file)
+        try:
+            header = next(self._reader)
+        except StopIteration:
+            raise ImportFileError("Empty file")
+        self.positions = map_header(header)
+        self.line = 1  # nomor baris terakhir yang dibaca (header = 1)
+        for _ in range(skip_rows):
+            if self._next_row() is None:
+                break
+
+    def _next_row(self):
+        for row in self._reader:
+            self.line = self._reader.line_num
+            if not row or all(not v.strip() for v in row):
+                continue  # baris kosong tidak dihitung
+            return row
+        return None
+
+    def close(self):
+        self._file.close()
+
+    def read_chunk(self, size, default_created):
+        """
+        Baca sampai `size` baris data. Mengembalikan (records, errors, consumed)
+        di mana records sudah berisi hasil prediksi; consumed = jumlah baris data
+        yang dibaca (valid maupun tidak), dipakai sebagai posisi resume.
+        """
+        pos = self.positions
+        X = np.empty((size, len(FEATURE_COLUMNS)), dtype=float)
+        created = []
+        outcomes = []
+        errors = []
+        consumed = 0
+        n = 0
+
+        while consumed < size:
+            row = self._next_row()
+            if row is None:
+                break
+            consumed += 1
+            try:
+                values = []
+                for column in FEATURE_COLUMNS:
+                    raw = row[pos[column]].strip() if pos[column] < len(row) else ""
+                    if raw == "":
+                        raise ValueError(f"{column}: value required")
+                    try:
+                        value = float(raw)
+                    except ValueError:
+                        raise ValueError(f"{column}: not a number ({raw[:32]!r})")
+                    if not math.isfinite(value):
+                        raise ValueError(f"{column}: must be a finite number")
+                    values.append(value)
+
+                when = default_created
+                if "createdAt" in pos and pos["createdAt"] < len(row) and row[pos["createdAt"]].strip():
+                    raw = row[pos["createdAt"]].strip()
+                    try:
+                        # detik penuh: DATETIME MySQL membulatkan pecahan detik, sedangkan
+                        # _insert_chunk mencari prediksi terbaru dengan createdAt == nilai ini
+                        when = local_naive(datetime.fromisoformat(raw)).replace(microsecond=0)
+                    except ValueError:
+                        raise ValueError(f"createdAt: invalid date ({raw[:32]!r})")
+
+                # label diagnosis opsional (kolom Outcome dataset Pima)
+                outcome = None
+                if "outcome" in pos and pos["outcome"] < len(row) and row[pos["outcome"]].strip():
+                    raw = row[pos["outcome"]].strip()
+                    try:
+                        outcome = OUTCOME_VALUES.get(raw.lower())
+                        if outcome is None:
+                            outcome = float(raw)
+                    except ValueError:
+                        outcome = None
+                    if outcome not in (0, 1):
+                        raise ValueError(f"outcome: must be 0 or 1 ({raw[:32]!r})")
+                    outcome = int(outcome)
+            except ValueError as e:
+                errors.append({"line": self.line, "error": str(e)})
+                continue
+
+            X[n] = values
+            created.append(when)
+            outcomes.append(outcome)
+            n += 1
+
+        records = []
+        if n:
+            preds, probs, version = predict_matrix(X[:n])
+            for i in range(n):
+                record = dict(zip(FEATURE_COLUMNS, X[i].tolist()))
+                record.update(
+                    prediction=int(preds[i]),
+                    probability=float(probs[i]),
+                    model_version=version,
+                    createdAt=created[i],
+                    outcome=outcomes[i],
+                )
+                records.append(record)
+        return records, errors, consumed
+
+
+# ==============================
+# JOB
+# ==============================
+async def create_job(db, user_id, source_path, filename=None):
+    job = ImportJob(
+        user_id=user_id,
+        filename=filename,
+        source_path=source_path,
+        file_size=os.path.getsize(source_path),
+        status="pending",
+        rows_processed=0,
+        rows_imported=0,
+        rows_failed=0,
+        createdAt=datetime.utcnow(),
+    )
+    db.add(job)
+    await db.commit()
+    await db.refresh(job)
+    return job
+
+
+async def claim_job(db, job_id):
+    """
+    Tandai job "running" jika belum dikerjakan worker lain (UPDATE bersyarat,
+    sama seperti klaim email outbox). Job running yang heartbeat-nya lewat
+    IMPORT_LEASE_SECONDS dianggap ditinggalkan dan boleh diklaim ulang.
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=IMPORT_LEASE_SECONDS)
+    result = await db.execute(
+        update(ImportJob)
+        .where(
+            ImportJob.id == job_id,
+            or_(
+                ImportJob.status.in_(("pending", "failed")),
+                and_(ImportJob.status == "running", ImportJob.updatedAt < stale),
+            ),
+        )
+        .values(status="running", error_message=None, updatedAt=now)
+    )
+    await db.commit()
+    return result.rowcount == 1
+
+
+async def _insert_chunk(db, user_id, records):
+    for start in range(0, len(records), IMPORT_INSERT_ROWS):
+        part = [{**r, "user_id": user_id} for r in records[start:start + IMPORT_INSERT_ROWS]]
+        await db.execute(insert(PredictionModel), part)
+
+    # prediksi terbaru chunk ini (createdAt historis, jadi bukan id terbesar)
+    latest_at = max(r["createdAt"] for r in records)
+    latest_id = await db.scalar(
+        select(PredictionModel.id)
+        .where(PredictionModel.user_id == user_id, PredictionModel.createdAt == latest_at)
+        .order_by(PredictionModel.id.desc())
+        .limit(1)
+    )
+    await record_predictions(db, user_id, records, latest_id=latest_id)
+
+
+async def _release_job(session_factory, job_id):
+    """Kembalikan job "running" ke "pending" agar langsung bisa diklaim lagi."""
+    try:
+        async with session_factory() as db:
+            await db.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id, ImportJob.status == "running")
+                .values(status="pending", updatedAt=datetime.utcnow())
+            )
+            await db.commit()
+    except Exception:
+        # lease tetap berlaku: job diklaim ulang setelah IMPORT_LEASE_SECONDS
+        logger.exception("Import job %s could not be released", job_id)
+
+
+async def run_import(job_id, session_factory=AsyncSessionLocal, chunk_rows=None, on_progress=None,
+                     claimed=False, stop_event=None):
+    """
+    Jalankan (atau lanjutkan) job import. Setiap chunk = satu transaksi:
+    insert prediksi, update stats user dan progress job di-commit bersama,
+    jadi setelah crash job dilanjutkan tepat dari rows_processed.
+    claimed=True jika pemanggil sudah menjalankan claim_job. Jika `stop_event`
+    di-set, job berhenti setelah chunk berjalan di-commit dan dikembalikan ke
+    "pending" sehingga langsung bisa dilanjutkan (startup berikutnya / resume).
+    Mengembalikan status akhir job (None jika job sedang dikerjakan worker lain).
+    """
+    chunk_rows = chunk_rows or IMPORT_CHUNK_ROWS
+    async with session_factory() as db:
+        if not claimed and not await claim_job(db, job_id):
+            return None
+        job = await db.get(ImportJob, job_id)
+        if job.startedAt is None:
+            job.startedAt = datetime.utcnow()
+        if job.total_rows is None:
+            job.total_rows = await asyncio.to_thread(count_rows, job.source_path)
+        await db.commit()
+
+        reader = None
+        errors = json.loads(job.errors) if job.errors else []
+        # tanpa kolom createdAt semua baris memakai waktu import (WIB), seperti /predict
+        # (detik penuh, lihat ChunkReader.read_chunk)
+        default_created = datetime.now(tz=ZoneInfo("Asia/Jakarta")).replace(tzinfo=None, microsecond=0)
+        try:
+            reader = await asyncio.to_thread(ChunkReader, job.source_path, job.rows_processed)
+            while True:
+                if stop_event is not None and stop_event.is_set():
+                    job.status = "pending"
+                    job.updatedAt = datetime.utcnow()
+                    await db.commit()
+                    return job.status
+                records, row_errors, consumed = await asyncio.to_thread(
+                    reader.read_chunk, chunk_rows, default_created
+                )
+                if not consumed:
+                    break
+                if records:
+                    await _insert_chunk(db, job.user_id, records)
+
+                room = IMPORT_MAX_ERRORS - len(errors)
+                if row_errors and room > 0:
+                    errors.extend(row_errors[:room])
+                job.rows_processed += consumed
+                job.rows_imported += len(records)
+                job.rows_failed += len(row_errors)
+                job.errors = json.dumps(errors) if errors else None
+                job.updatedAt = datetime.utcnow()
+                await db.commit()
+                response_cache.invalidate_user(job.user_id)
+                if on_progress is not None:
+                    on_progress(job)
+
+            job.status = "completed"
+            job.finishedAt = datetime.utcnow()
+            job.updatedAt = job.finishedAt
+            await db.commit()
+        except asyncio.CancelledError:
+            # dibatalkan paksa (stop() lewat batas waktu): chunk yang belum
+            # di-commit dibuang, lalu job dikembalikan ke "pending" lewat
+            # session baru. Rollback dulu: transaksi ini masih memegang lock
+            # baris job. Jika gagal, lease tetap jadi jalan terakhir.
+            try:
+                await db.rollback()
+            except Exception:
+                pass
+            await _release_job(session_factory, job_id)
+            raise
+        except Exception as e:
+            await db.rollback()
+            if isinstance(e, ImportFileError):
+                logger.warning("Import job %s failed: %s", job_id, e)
+            else:
+                logger.exception("Import job %s failed", job_id)
+            await db.execute(
+                update(ImportJob)
+                .where(ImportJob.id == job_id)
+                .values(status="failed", error_message=str(e)[:2000], updatedAt=datetime.utcnow())
+            )
+            await db.commit()
+            return "failed"
+        finally:
+            if reader is not None:
+                reader.close()
+        return job.status
+
+
+def job_summary(job):
+    """Dict status job untuk API/CLI."""
+    progress = None
+    if job.total_rows:
+        progress = round(min(job.rows_processed / job.total_rows, 1.0) * 100, 2)
+    elif job.status == "completed":
+        progress = 100.0
+    return {
+        "id": job.id,
+        "user_id": job.user_id,
+        "filename": job.filename,
+        "status": job.status,
+        "file_size": job.file_size,
+        "total_rows": job.total_rows,
+        "rows_processed": job.rows_processed,
+        "rows_imported": job.rows_imported,
+        "rows_failed": job.rows_failed,
+        "progress_percent": progress,
+        "errors": json.loads(job.errors) if job.errors else [],
+        "error_message": job.error_message,
+        "createdAt": job.createdAt,
+        "startedAt": job.startedAt,
+        "finishedAt": job.finishedAt,
+        "updatedAt": job.updatedAt,
+    }
+
+
+class ImportRunner:
+    """Menjalankan job import sebagai task asyncio di proses API."""
+
+    def __init__(self, session_factory=AsyncSessionLocal, stop_timeout=IMPORT_STOP_TIMEOUT):
+        self.session_factory = session_factory
+        self.stop_timeout = stop_timeout
+        self._tasks = {}
+        self._stopping = asyncio.Event()
+
+    def start(self, job_id, claimed=False):
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            self._tasks[job_id] = asyncio.create_task(
+                run_import(job_id, self.session_factory, claimed=claimed, stop_event=self._stopping),
+                name=f"import-job-{job_id}",
+            )
+        return self._tasks[job_id]
+
+    def is_running(self, job_id):
+        task = self._tasks.get(job_id)
+        return task is not None and not task.done()
+
+    async def resume_pending(self):
+        """Lanjutkan job pending/terputus (dipanggil saat startup)."""
+        stale = datetime.utcnow() - timedelta(seconds=IMPORT_LEASE_SECONDS)
+        async with self.session_factory() as db:
+            ids = (await db.scalars(
+                select(ImportJob.id).where(or_(
+                    ImportJob.status == "pending",
+                    and_(ImportJob.status == "running", ImportJob.updatedAt < stale),
+                ))
+            )).all()
+        for job_id in ids:
+            self.start(job_id)
+        return list(ids)
+
+    async def stop(self):
+        """
+        Minta job berhenti di batas chunk (job kembali "pending"); task yang
+        belum selesai setelah stop_timeout detik baru dibatalkan paksa.
+        """
+        tasks = [t for t in self._tasks.values() if not t.done()]
+        self._stopping.set()
+        if tasks:
+            _, pending = await asyncio.wait(tasks, timeout=self.stop_timeout)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        self._tasks.clear()
+        self._stopping.clear()
+
+
+import_runner = ImportRunner()
+
+
+async def _main(argv):
+    def progress(job):
+        print(f"\r{job.rows_processed}/{job.total_rows} baris, {job.rows_imported} masuk, "
+              f"{job.rows_failed} gagal", end="", flush=True)
+
+    if len(argv) >= 2 and argv[0] == "run":
+        path = os.path.abspath(argv[1])
+        if "--user" not in argv:
+            print("--user ID wajib diisi")
+            return 2
+        user_id = int(argv[argv.index("--user") + 1])
+        async with AsyncSessionLocal() as db:
+            job = await create_job(db, user_id, path, os.path.basename(path))
+        print(f"Job {job.id} dibuat")
+        job_id = job.id
+    elif len(argv) >= 2 and argv[0] in ("resume", "status"):
+        job_id = int(argv[1])
+    else:
+        print("Perintah: run FILE --user ID | resume JOB_ID | status JOB_ID")
+        return 2
+
+    if argv[0] != "status":
+        started = datetime.utcnow()
+        status = await run_import(job_id, on_progress=progress)
+        print()
+        if status is None:
+            print(f"Job {job_id} sedang dikerjakan worker lain atau sudah selesai")
+        else:
+            print(f"Selesai dalam {(datetime.utcnow() - started).total_seconds():.1f} detik")
+
+    async with AsyncSessionLocal() as db:
+        job = await db.get(ImportJob, job_id)
+        if job is None:
+            print(f"Job {job_id} tidak ditemukan")
+            return 1
+        summary = job_summary(job)
+    summary["errors"] = summary["errors"][:20]
+    print(json.dumps(summary, indent=2, default=str))
+    return 0 if summary["status"] == "completed" else 1
+
+
+if __name__ == "__main__":
+    # jalankan dari folder backend/:
+    #   python -m services.importer run data.csv --user 1
+    #   python -m services.importer resume 3
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
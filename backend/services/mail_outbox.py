@@ -0,0 +1,302 @@
+# backend/services/mail_outbox.py
+import asyncio
+import logging
+import os
+from collections import deque
+from datetime import datetime, timedelta
+from email.message import EmailMessage
+
+import aiosmtplib
+from sqlalchemy import select, update, func, or_, and_
+
+from config.db import AsyncSessionLocal
+from config.mail import conf
+from models.email_outbox import EmailOutbox
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_email(db, recipient, subject, body, subtype="plain"):
+    """
+    Tambahkan email ke outbox di session `db`. Email tersimpan bersama commit
+    pemanggil (mis. OTP dan email-nya berada di satu transaksi) lalu dikirim
+    oleh OutboxDispatcher di background.
+    """
+    db.add(EmailOutbox(
+        recipient=recipient,
+        subject=subject,
+        body=body,
+        subtype=subtype,
+        status="pending",
+        attempts=0,
+        next_attempt_at=datetime.utcnow(),
+        createdAt=datetime.utcnow(),
+    ))
+
+
+class OutboxDispatcher:
+    """
+    Mengirim email dari tabel email_outbox secara batch. Satu koneksi SMTP
+    dipakai ulang selama masih ada email yang jatuh tempo, lalu ditutup saat
+    antrian kosong. Email yang gagal dijadwalkan ulang dengan backoff
+    eksponensial sampai `max_attempts`.
+
+    Aman dijalankan di beberapa worker: setiap baris diklaim dengan UPDATE
+    bersyarat pada nilai `attempts` sehingga hanya satu worker yang menang.
+
+    Body (berisi OTP) dikosongkan begitu email terkirim atau gagal permanen;
+    baris tetap disimpan untuk statistik dan audit.
+    """
+
+    def __init__(
+        self,
+        session_factory,
+        mail_conf,
+        batch_size=50,
+        poll_interval=2.0,
+        max_attempts=5,
+        backoff_base=5.0,
+        backoff_max=600.0,
+        lease=300.0,
+    ):
+        self.session_factory = session_factory
+        self.conf = mail_conf
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        # email berstatus "sending" lebih lama dari ini dianggap worker-nya mati
+        self.lease = lease
+
+        self._task = None
+        self._wakeup = asyncio.Event()
+        self._smtp = None
+
+        self.sent = 0
+        self.failed = 0
+        self.retried = 0
+        self.batches = 0
+        self._latencies = deque(maxlen=1000)  # detik, createdAt -> sentAt
+
+    @classmethod
+    def from_env(cls, session_factory=AsyncSessionLocal, mail_conf=conf):
+        return cls(
+            session_factory,
+            mail_conf,
+            batch_size=int(os.getenv("MAIL_OUTBOX_BATCH_SIZE", "50")),
+            poll_interval=float(os.getenv("MAIL_OUTBOX_POLL_INTERVAL", "2")),
+            max_attempts=int(os.getenv("MAIL_OUTBOX_MAX_ATTEMPTS", "5")),
+        )
+
+    # ==============================
+    # LIFECYCLE
+    # ==============================
+    def start(self):
+        if self._task is None or self._task.done():
+            # Event dibuat ulang di loop yang sedang berjalan
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="mail-outbox-dispatcher")
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._close_smtp()
+
+    def notify(self):
+        """Bangunkan dispatcher segera (dipanggil setelah commit email baru)."""
+        self._wakeup.set()
+
+    # ==============================
+    # LOOP
+    # ==============================
+    async def _run(self):
+        while True:
+            try:
+                processed = await self.dispatch_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Mail outbox dispatch failed")
+                processed = 0
+                await self._close_smtp()
+
+            if processed:
+                continue
+
+            # antrian kosong: jangan tahan koneksi SMTP sambil menunggu
+            await self._close_smtp()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+    async def dispatch_once(self):
+        """Klaim dan kirim satu batch. Mengembalikan jumlah email yang diproses."""
+        batch = await self._claim()
+        if not batch:
+            return 0
+
+        self.batches += 1
+        results = []
+        try:
+            smtp = await self._get_smtp()
+        except Exception as e:
+            # server tidak bisa dihubungi: seluruh batch dijadwalkan ulang
+            results = [(msg, str(e)) for msg in batch]
+        else:
+            for msg in batch:
+                try:
+                    await smtp.send_message(self._build_message(msg))
+                    results.append((msg, None))
+                except aiosmtplib.SMTPServerDisconnected as e:
+                    await self._close_smtp()
+                    results.append((msg, str(e)))
+                    try:
+                        smtp = await self._get_smtp()
+                    except Exception:
+                        results.extend((m, str(e)) for m in batch[len(results):])
+                        break
+                except Exception as e:
+                    results.append((msg, str(e)))
+
+        await self._record(results)
+        return len(batch)
+
+    async def _claim(self):
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            candidates = (await db.execute(
+                select(EmailOutbox.id, EmailOutbox.status, EmailOutbox.attempts)
+                .where(
+                    or_(
+                        and_(EmailOutbox.status == "pending", EmailOutbox.next_attempt_at <= now),
+                        # lease habis: worker yang mengklaim kemungkinan mati
+                        and_(EmailOutbox.status == "sending", EmailOutbox.next_attempt_at <= now),
+                    )
+                )
+                .order_by(EmailOutbox.next_attempt_at, EmailOutbox.id)
+                .limit(self.batch_size)
+            )).all()
+
+            claimed_ids = []
+            for row in candidates:
+                result = await db.execute(
+                    update(EmailOutbox)
+                    .where(
+                        EmailOutbox.id == row.id,
+                        EmailOutbox.status == row.status,
+                        EmailOutbox.attempts == row.attempts,
+                    )
+                    .values(
+                        status="sending",
+                        attempts=row.attempts + 1,
+                        next_attempt_at=now + timedelta(seconds=self.lease),
+                    )
+                )
+                if result.rowcount == 1:
+                    claimed_ids.append(row.id)
+            await db.commit()
+
+            if not claimed_ids:
+                return []
+            return list((await db.scalars(
+                select(EmailOutbox).where(EmailOutbox.id.in_(claimed_ids)).order_by(EmailOutbox.id)
+            )).all())
+
+    async def _record(self, results):
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            for msg, error in results:
+                if error is None:
+                    values = {"status": "sent", "sentAt": now, "last_error": None, "body": ""}
+                    self.sent += 1
+                    self._latencies.append((now - msg.createdAt).total_seconds())
+                elif msg.attempts >= self.max_attempts:
+                    values = {"status": "failed", "last_error": error[:2000], "body": ""}
+                    self.failed += 1
+                    logger.warning("Email %s to %s failed permanently: %s", msg.id, msg.recipient, error)
+                else:
+                    delay = min(self.backoff_base * (2 ** (msg.attempts - 1)), self.backoff_max)
+                    values = {
+                        "status": "pending",
+                        "next_attempt_at": now + timedelta(seconds=delay),
+                        "last_error": error[:2000],
+                    }
+                    self.retried += 1
+                await db.execute(update(EmailOutbox).where(EmailOutbox.id == msg.id).values(**values))
+            await db.commit()
+
+    # ==============================
+    # SMTP
+    # ==============================
+    def _build_message(self, msg):
+        message = EmailMessage()
+        message["From"] = str(self.conf.MAIL_FROM)
+        message["To"] = msg.recipient
+        message["Subject"] = msg.subject
+        message.set_content(msg.body, subtype=msg.subtype or "plain")
+        return message
+
+    async def _get_smtp(self):
+        if self._smtp is not None and self._smtp.is_connected:
+            return self._smtp
+        smtp = aiosmtplib.SMTP(
+            hostname=self.conf.MAIL_SERVER,
+            port=self.conf.MAIL_PORT,
+            use_tls=self.conf.MAIL_SSL_TLS,
+            start_tls=self.conf.MAIL_STARTTLS,
+            timeout=self.conf.TIMEOUT,
+        )
+        await smtp.connect()
+        if self.conf.USE_CREDENTIALS:
+            await smtp.login(self.conf.MAIL_USERNAME, self.conf.MAIL_PASSWORD.get_secret_value())
+        self._smtp = smtp
+        return smtp
+
+    async def _close_smtp(self):
+        smtp, self._smtp = self._smtp, None
+        if smtp is not None and smtp.is_connected:
+            try:
+                await smtp.quit()
+            except Exception:
+                smtp.close()
+
+    # ==============================
+    # STATS
+    # ==============================
+    async def stats(self):
+        async with self.session_factory() as db:
+            rows = (await db.execute(
+                select(EmailOutbox.status, func.count(EmailOutbox.id)).group_by(EmailOutbox.status)
+            )).all()
+            oldest = await db.scalar(
+                select(func.min(EmailOutbox.createdAt)).where(EmailOutbox.status.in_(("pending", "sending")))
+            )
+        by_status = {status: count for status, count in rows}
+        latencies = sorted(self._latencies)
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "queue_depth": by_status.get("pending", 0) + by_status.get("sending", 0),
+            "by_status": by_status,
+            "oldest_queued_age_seconds": (datetime.utcnow() - oldest).total_seconds() if oldest else None,
+            "sent": self.sent,
+            "failed": self.failed,
+            "retried": self.retried,
+            "batches": self.batches,
+            "delivery_latency_seconds": {
+                "count": len(latencies),
+                "avg": (sum(latencies) / len(latencies)) if latencies else None,
+                "p95": latencies[int(0.95 * (len(latencies) - 1))] if latencies else None,
+                "max": latencies[-1] if latencies else None,
+            },
+        }
+
+
+outbox_dispatcher = OutboxDispatcher.from_env()
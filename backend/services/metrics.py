@@ -0,0 +1,307 @@
+# backend/services/metrics.py
+import contextvars
+import math
+import os
+import threading
+import time
+
+from sqlalchemy import event
+
+# batas bucket histogram (detik / jumlah query)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+DB_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+INFERENCE_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.05, 0.1)
+
+# path di luar router (404, static) digabung agar label tidak meledak
+UNMATCHED_ROUTE = "unmatched"
+
+
+class Histogram:
+    """Histogram kumulatif ala Prometheus per kombinasi label."""
+
+    def __init__(self, name, help, labelnames, buckets):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._series = {}  # labels -> [counts per bucket..., +Inf], sum
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            counts = series[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            series[1] += value
+
+    def render(self, out):
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} histogram")
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labels, counts, total in sorted(items):
+            base = _labels(self.labelnames, labels)
+            running = 0
+            for bound, count in zip(self.buckets, counts):
+                running += count
+                out.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le=_num(bound))} {running}")
+            running += counts[-1]
+            out.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le='+Inf')} {running}")
+            out.append(f"{self.name}_sum{base} {_num(total)}")
+            out.append(f"{self.name}_count{base} {running}")
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name, help, labelnames, kind="counter"):
+        self.name = name
+        self.help = help
+        self.labelnames = labelnames
+        self.kind = kind
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, labels, n=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + n
+
+    def render(self, out):
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        with self._lock:
+            items = sorted(self._values.items())
+        for labels, value in items:
+            out.append(f"{self.name}{_labels(self.labelnames, labels)} {_num(value)}")
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, **extra):
+    pairs = [f'{k}="{_escape(v)}"' for k, v in zip(names, values)]
+    pairs += [f'{k}="{v}"' for k, v in extra.items()]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _num(value):
+    if isinstance(value, float):
+        if math.isinf(value):
+            return "+Inf" if value > 0 else "-Inf"
+        return repr(value)
+    return str(value)
+
+
+class RequestStats:
+    """Akumulator query DB milik satu request (disimpan di contextvar)."""
+
+    __slots__ = ("scope", "queries", "db_seconds")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.db_seconds = 0.0
+
+
+# di-set oleh MetricsMiddleware; event SQLAlchemy menambah ke objek ini.
+# Greenlet async SQLAlchemy dan threadpool route sync mewarisi context
+# request, jadi query dari keduanya ikut terhitung.
+_current_request = contextvars.ContextVar("metrics_request", default=None)
+
+
+class Metrics:
+    """Kumpulan metric aplikasi + format teks Prometheus untuk /metrics."""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.started = time.time()
+        self.request_latency = Histogram(
+            "http_request_duration_seconds", "Latency request per route template.",
+            ("method", "route", "status"), LATENCY_BUCKETS,
+        )
+        self.request_queries = Histogram(
+            "http_request_db_queries", "Jumlah query DB per request.",
+            ("method", "route"), QUERY_COUNT_BUCKETS,
+        )
+        self.request_db_time = Histogram(
+            "http_request_db_seconds", "Total waktu query DB per request.",
+            ("method", "route"), DB_TIME_BUCKETS,
+        )
+        self.db_queries = Counter(
+            "db_queries_total", "Query DB per engine (termasuk di luar request).", ("engine",),
+        )
+        self.db_seconds = Counter(
+            "db_query_seconds_total", "Total waktu query DB per engine.", ("engine",),
+        )
+        self.inference = Histogram(
+            "model_inference_seconds", "Waktu engine.predict per pemanggilan (satu matrix).",
+            ("path",), INFERENCE_BUCKETS,
+        )
+        self.inference_rows = Counter(
+            "model_inference_rows_total", "Jumlah baris yang diskor.", ("path",),
+        )
+        self._collectors = [
+            self.request_latency, self.request_queries, self.request_db_time,
+            self.db_queries, self.db_seconds, self.inference, self.inference_rows,
+        ]
+        self._extra = []  # callable(out) untuk metric yang dibaca saat scrape
+        # request yang sedang berjalan; dikelompokkan per route saat scrape
+        # karena route template baru diketahui setelah routing
+        self._active_lock = threading.Lock()
+        self._active = set()
+
+    @classmethod
+    def from_env(cls):
+        return cls(enabled=os.getenv("METRICS_ENABLED", "1").lower() not in ("0", "false", "no", "off"))
+
+    def track(self, stats):
+        with self._active_lock:
+            self._active.add(stats)
+
+    def untrack(self, stats):
+        with self._active_lock:
+            self._active.discard(stats)
+
+    def _render_in_flight(self, out):
+        counts = {}
+        with self._active_lock:
+            scopes = [stats.scope for stats in self._active]
+        for scope in scopes:
+            labels = (scope["method"], route_template(scope))
+            counts[labels] = counts.get(labels, 0) + 1
+        out.append("# HELP http_requests_in_flight Request yang sedang diproses per route template.")
+        out.append("# TYPE http_requests_in_flight gauge")
+        for labels, value in sorted(counts.items()):
+            out.append(f"http_requests_in_flight{_labels(('method', 'route'), labels)} {value}")
+
+    # ==============================
+    # DB
+    # ==============================
+    def instrument_engine(self, engine, name):
+        """Hitung query dan waktu query lewat event cursor SQLAlchemy."""
+        if not self.enabled:
+            return
+        sync_engine = getattr(engine, "sync_engine", engine)
+        labels = (name,)
+
+        @event.listens_for(sync_engine, "before_cursor_execute")
+        def _before(conn, cursor, statement, parameters, context, executemany):
+            conn.info.setdefault("metrics_query_start", []).append(time.perf_counter())
+
+        @event.listens_for(sync_engine, "after_cursor_execute")
+        def _after(conn, cursor, statement, parameters, context, executemany):
+            self._query_done(conn, labels)
+
+        @event.listens_for(sync_engine, "handle_error")
+        def _error(context):
+            if context.connection is not None:
+                self._query_done(context.connection, labels)
+
+    def _query_done(self, conn, labels):
+        starts = conn.info.get("metrics_query_start")
+        if not starts:
+            return
+        elapsed = time.perf_counter() - starts.pop()
+        self.db_queries.inc(labels)
+        self.db_seconds.inc(labels, elapsed)
+        stats = _current_request.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+
+    # ==============================
+    # INFERENCE
+    # ==============================
+    def observe_inference(self, path, seconds, rows):
+        if not self.enabled:
+            return
+        self.inference.observe((path,), seconds)
+        self.inference_rows.inc((path,), rows)
+
+    # ==============================
+    # EXPOSITION
+    # ==============================
+    def add_collector(self, collect):
+        """Daftarkan callable(out) yang menambah baris metric saat scrape."""
+        self._extra.append(collect)
+
+    def render(self):
+        out = [
+            "# HELP process_start_time_seconds Waktu proses mulai (epoch).",
+            "# TYPE process_start_time_seconds gauge",
+            f"process_start_time_seconds {_num(self.started)}",
+        ]
+        for collector in self._collectors:
+            collector.render(out)
+        self._render_in_flight(out)
+        for collect in self._extra:
+            collect(out)
+        return "\n".join(out) + "\n"
+
+    def reset(self):
+        for collector in self._collectors:
+            collector.reset()
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI murni (tanpa BaseHTTPMiddleware) yang mengukur setiap
+    request HTTP per route template, mis. "/history/{prediction_id}". Durasi
+    mencakup pengiriman body, jadi StreamingResponse (export) terukur penuh.
+    """
+
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.metrics.enabled:
+            await self.app(scope, receive, send)
+            return
+
+        m = self.metrics
+        stats = RequestStats(scope)
+        token = _current_request.set(stats)
+        m.track(stats)
+        status = [500]
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            _current_request.reset(token)
+            m.untrack(stats)
+            labels = (scope["method"], route_template(scope))
+            m.request_latency.observe(labels + (str(status[0]),), elapsed)
+            m.request_queries.observe(labels, stats.queries)
+            m.request_db_time.observe(labels, stats.db_seconds)
+
+
+def route_template(scope):
+    """Path template route yang dipilih router (scope["route"] di-set saat routing)."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or UNMATCHED_ROUTE
+
+
+metrics = Metrics.from_env()
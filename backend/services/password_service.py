@@ -0,0 +1,136 @@
+# backend/services/password_service.py
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from argon2 import PasswordHasher, exceptions as argon2_exceptions
+
+
+class PasswordServiceBusy(Exception):
+    """Antrian hashing penuh; request sebaiknya ditolak (503) daripada menumpuk."""
+
+
+class PasswordService:
+    """
+    Hash/verify Argon2 di thread pool khusus yang terpisah dari threadpool
+    request. argon2-cffi melepas GIL selama hashing, jadi `workers` thread
+    benar-benar berjalan paralel. Jumlah job (berjalan + antri) dibatasi
+    `queue_limit`.
+    """
+
+    def __init__(self, time_cost=3, memory_cost=65536, parallelism=4, workers=None, queue_limit=None):
+        self.hasher = PasswordHasher(
+            time_cost=time_cost, memory_cost=memory_cost, parallelism=parallelism
+        )
+        self.workers = workers or os.cpu_count() or 2
+        self.queue_limit = queue_limit or self.workers * 16
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="argon2")
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.rejected = 0
+        self.rehashed = 0
+        self._timings = {"hash": [0, 0.0], "verify": [0, 0.0]}
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            time_cost=int(os.getenv("ARGON2_TIME_COST", "3")),
+            memory_cost=int(os.getenv("ARGON2_MEMORY_COST", "65536")),  # KiB
+            parallelism=int(os.getenv("ARGON2_PARALLELISM", "4")),
+            workers=int(os.getenv("PASSWORD_HASH_WORKERS", "0")) or None,
+            queue_limit=int(os.getenv("PASSWORD_HASH_QUEUE_LIMIT", "0")) or None,
+        )
+
+    @property
+    def params(self):
+        return {
+            "time_cost": self.hasher.time_cost,
+            "memory_cost": self.hasher.memory_cost,
+            "parallelism": self.hasher.parallelism,
+        }
+
+    # ==============================
+    # PUBLIC API
+    # ==============================
+    async def hash(self, password):
+        return await self._submit("hash", self.hasher.hash, password)
+
+    async def verify(self, hashed, password):
+        """True jika password cocok; False jika tidak cocok atau hash rusak."""
+        return await self._submit("verify", self._verify, hashed, password)
+
+    def needs_rehash(self, hashed):
+        # murah (hanya parsing parameter di hash), tidak perlu ke pool
+        try:
+            return self.hasher.check_needs_rehash(hashed)
+        except argon2_exceptions.InvalidHashError:
+            return True
+
+    def stats(self):
+        with self._lock:
+            timings = {
+                name: {
+                    "count": count,
+                    "avg_ms": (total / count * 1000.0) if count else None,
+                }
+                for name, (count, total) in self._timings.items()
+            }
+            return {
+                "params": self.params,
+                "workers": self.workers,
+                "queue_limit": self.queue_limit,
+                "pending": self._pending,
+                "rejected": self.rejected,
+                "rehashed": self.rehashed,
+                **timings,
+            }
+
+    def record_rehash(self):
+        with self._lock:
+            self.rehashed += 1
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+    # ==============================
+    # INTERNAL
+    # ==============================
+    def _verify(self, hashed, password):
+        try:
+            return self.hasher.verify(hashed, password)
+        except (argon2_exceptions.VerifyMismatchError, argon2_exceptions.InvalidHashError):
+            return False
+
+    def _timed(self, name, fn, *args):
+        started = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            with self._lock:
+                self._timings[name][0] += 1
+                self._timings[name][1] += elapsed
+
+    async def _submit(self, name, fn, *args):
+        with self._lock:
+            if self._pending >= self.queue_limit:
+                self.rejected += 1
+                raise PasswordServiceBusy()
+            self._pending += 1
+        try:
+            future = self._executor.submit(self._timed, name, fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # dilepas saat job di executor selesai (atau batal sebelum mulai), bukan
+        # saat request berhenti menunggu: client yang putus tidak menghentikan
+        # Argon2 yang sedang berjalan, jadi job itu tetap dihitung
+        future.add_done_callback(self._release)
+        return await asyncio.wrap_future(future)
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
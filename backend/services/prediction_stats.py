@@ -0,0 +1,89 @@
+# backend/services/prediction_stats.py
+from sqlalchemy import case, func, select
+
+from models.prediction import Prediction as PredictionModel
+from services.user_stats import get_user_stats, stats_to_overview
+
+# parameter grafik dashboard -> atribut Prediction
+CHART_PARAMS = {
+    "pregnancies": "pregnancies",
+    "glucose": "glucose",
+    "blood_pressure": "blood_pressure",
+    "bmi": "bmi",
+    "dpf": "dpf",
+    # pakai probability (persentase) bukan prediction (0/1)
+    "prediction": "probability",
+}
+
+RECENT_LIMIT = 5
+
+
+def aggregate_statement(uid):
+    """
+    Satu SELECT untuk semua count dan rata-rata prediksi user. Count per kelas
+    memakai SUM(CASE ...) sehingga tidak perlu query terpisah per filter.
+    """
+    P = PredictionModel
+    return select(
+        func.count(P.id).label("total"),
+        func.coalesce(func.sum(case((P.prediction == 1, 1), else_=0)), 0).label("diabetes"),
+        func.coalesce(func.sum(case((P.prediction == 0, 1), else_=0)), 0).label("non_diabetes"),
+        func.avg(P.probability).label("avg_probability"),
+        func.avg(P.glucose).label("avg_glucose"),
+        func.avg(P.blood_pressure).label("avg_blood_pressure"),
+    ).where(P.user_id == uid)
+
+
+async def fetch_aggregates(db, uid):
+    row = (await db.execute(aggregate_statement(uid))).one()
+    return {
+        "total": int(row.total or 0),
+        "diabetes": int(row.diabetes or 0),
+        "non_diabetes": int(row.non_diabetes or 0),
+        "avg_probability": float(row.avg_probability) if row.avg_probability is not None else None,
+        "avg_glucose": float(row.avg_glucose) if row.avg_glucose is not None else None,
+        "avg_blood_pressure": float(row.avg_blood_pressure) if row.avg_blood_pressure is not None else None,
+    }
+
+
+async def fetch_recent(db, uid, limit=RECENT_LIMIT):
+    """Prediksi terbaru user, dari yang paling baru (id sebagai tie-breaker)."""
+    return list((await db.scalars(
+        select(PredictionModel)
+        .where(PredictionModel.user_id == uid)
+        .order_by(PredictionModel.createdAt.desc(), PredictionModel.id.desc())
+        .limit(limit)
+    )).all())
+
+
+def chart_series(recent, chart_param):
+    """(tanggal dd/mm, nilai) dari lama ke baru untuk parameter grafik."""
+    attr = CHART_PARAMS.get(chart_param)
+    points = []
+    for pred in reversed(recent):
+        value = getattr(pred, attr) if attr else None
+        points.append((pred.createdAt.strftime('%d/%m'), float(value) if value is not None else None))
+    return points
+
+
+async def fetch_prediction_overview(db, uid, recent_limit=RECENT_LIMIT):
+    """
+    Data bersama untuk dashboard dan summary. Count dan rata-rata dibaca dari
+    user_prediction_stats (lookup primary key, O(1) berapapun panjang
+    histori); jika baris stats belum ada dipakai satu query agregat live.
+    Prediksi terakhir diambil dari window terbaru, atau langsung lewat
+    latest_prediction_id jika hanya butuh satu.
+    """
+    user_stats = await get_user_stats(db, uid)
+    stats = stats_to_overview(user_stats) if user_stats is not None else await fetch_aggregates(db, uid)
+
+    if not stats["total"]:
+        recent = []
+    elif recent_limit == 1 and user_stats is not None and user_stats.latest_prediction_id:
+        latest = await db.get(PredictionModel, user_stats.latest_prediction_id)
+        recent = [latest] if latest is not None else []
+    else:
+        recent = await fetch_recent(db, uid, recent_limit)
+    stats["recent"] = recent
+    stats["latest"] = recent[0] if recent else None
+    return stats
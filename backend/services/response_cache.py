@@ -0,0 +1,219 @@
+# backend/services/response_cache.py
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from zoneinfo import ZoneInfo
+
+from fastapi import Response
+from sqlalchemy import func, select
+
+from models.prediction import Prediction as PredictionModel
+from services.user_stats import get_user_stats
+from services.serializers import dumps
+
+# createdAt/updatedAt user disimpan tanpa timezone dalam waktu Jakarta (WIB);
+# user_prediction_stats.updatedAt tanpa timezone dalam UTC
+LOCAL_TZ = ZoneInfo("Asia/Jakarta")
+
+# klien tetap revalidasi setiap kali, tapi cukup dengan 304 tanpa body
+CACHE_CONTROL = "private, no-cache"
+
+
+class ResponseCache:
+    """
+    Cache LRU + TTL body JSON per user, key = (user_id, path+query, etag).
+    ETag sudah memuat versi data user sehingga entry lama tidak pernah cocok
+    lagi; invalidate_user() membuang entry user itu lebih awal setelah write.
+    """
+
+    def __init__(self, maxsize=2000, ttl=60.0):
+        self.maxsize = int(maxsize)
+        self.ttl = float(ttl)
+        self._data = OrderedDict()
+        self._generations = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.not_modified = 0
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "2000")),
+            ttl=float(os.getenv("RESPONSE_CACHE_TTL", "60")),
+        )
+
+    @property
+    def enabled(self):
+        return self.maxsize > 0
+
+    def generation(self, user_id):
+        with self._lock:
+            return self._generations.get(user_id, 0)
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] <= now or entry[1] != self._generations.get(key[0], 0):
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, body, generation):
+        """Simpan body; dilewati jika user di-invalidate sejak `generation` diambil."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if self._generations.get(key[0], 0) != generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, generation, body)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            self._generations[user_id] = self._generations.get(user_id, 0) + 1
+            self.invalidations += 1
+            for key in [k for k in self._data if k[0] == user_id]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits / lookups) if lookups else None,
+                "not_modified": self.not_modified,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+
+response_cache = ResponseCache.from_env()
+
+
+def _as_utc(value, tz=LOCAL_TZ):
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return value.astimezone(timezone.utc)
+
+
+def _http_stamp(value, now=None):
+    """
+    Last-Modified hanya dikirim jika write terakhir sudah >= 1 detik lalu.
+    HTTP-date berresolusi detik: stempel dari detik yang sedang berjalan bisa
+    tertinggal write berikutnya di detik yang sama, lalu If-Modified-Since
+    memberi 304 basi. Klien tetap revalidasi lewat ETag.
+    """
+    if value is None:
+        return None
+    now = now or datetime.now(timezone.utc)
+    if now - value < timedelta(seconds=1):
+        return None
+    return value.replace(microsecond=0)
+
+
+async def user_validators(db, principal):
+    """
+    (versi data, last-modified UTC, baris stats) user dari
+    user_prediction_stats (lookup primary key) dan profil di AuthPrincipal.
+    Last-Modified diambil dari updatedAt stats (UTC, dinaikkan setiap insert
+    termasuk import data historis), bukan createdAt prediksi terbaru. Tanpa
+    baris stats dipakai MAX(id)/COUNT(id) live dan hanya ETag yang dikirim.
+    """
+    stats = await get_user_stats(db, principal.id)
+    profile_at = principal.updatedAt or principal.createdAt
+    if stats is not None:
+        latest_id, total, written_at = stats.latest_prediction_id, stats.total, stats.updatedAt
+    else:
+        latest_id, total = (await db.execute(
+            select(func.max(PredictionModel.id), func.count(PredictionModel.id))
+            .where(PredictionModel.user_id == principal.id)
+        )).one()
+        written_at = None
+
+    version = ":".join([
+        str(principal.id), str(latest_id or 0), str(total or 0),
+        written_at.isoformat() if written_at else "",
+        profile_at.isoformat() if profile_at else "",
+    ])
+    last_modified = None
+    if written_at is not None:
+        stamps = [_as_utc(written_at, timezone.utc), _as_utc(profile_at)]
+        last_modified = _http_stamp(max(s for s in stamps if s is not None))
+    return version, last_modified, stats
+
+
+def _not_modified(request, etag, last_modified):
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # perbandingan lemah: abaikan prefix W/
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            return last_modified <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+async def conditional_json(request, db, principal, build):
+    """
+    Response JSON dengan ETag/Last-Modified per user.
+    - If-None-Match / If-Modified-Since cocok -> 304 tanpa membangun body
+    - body untuk ETag yang sama sudah ada di cache -> dikirim ulang
+    - selain itu `build()` (async) dipanggil dan hasilnya di-cache
+
+    `build()` boleh mengembalikan model pydantic atau dict/list siap JSON
+    (lihat services/serializers.py); keduanya diserialisasi tanpa
+    jsonable_encoder.
+    """
+    generation = response_cache.generation(principal.id)
+    # `stats` tetap dipegang selama build() supaya db.get() berikutnya untuk
+    # baris yang sama terlayani identity map session (tanpa query ulang)
+    version, last_modified, stats = await user_validators(db, principal)
+    url = request.url.path + ("?" + request.url.query if request.url.query else "")
+    etag = 'W/"' + hashlib.sha1(f"{version}|{url}".encode()).hexdigest()[:20] + '"'
+
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+
+    if _not_modified(request, etag, last_modified):
+        response_cache.not_modified += 1
+        return Response(status_code=304, headers=headers)
+
+    key = (principal.id, url, etag)
+    body = response_cache.get(key)
+    if body is None:
+        body = dumps(await build())
+        response_cache.put(key, body, generation)
+    return Response(content=body, media_type="application/json", headers=headers)
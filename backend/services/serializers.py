@@ -0,0 +1,64 @@
+# backend/services/serializers.py
+import operator
+
+import orjson
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from schemas.historySchema import HistoryItem
+from schemas.dashboardSchema import DashboardRecentPrediction
+from schemas.summarySchema import SummaryLatest
+
+# datetime naive -> "2024-01-01T08:00:00", UTC -> "Z": sama dengan output pydantic
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+
+def dumps(content):
+    """
+    Body JSON (bytes). Model pydantic diserialisasi langsung oleh serializer
+    Rust-nya; dict/list biasa (datetime, date, numpy boleh) lewat orjson,
+    tanpa jsonable_encoder.
+    """
+    if isinstance(content, BaseModel):
+        return content.__pydantic_serializer__.to_json(content)
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+class OrjsonResponse(JSONResponse):
+    """JSONResponse dengan orjson; default response class aplikasi (app.py)."""
+
+    def render(self, content):
+        return dumps(content)
+
+
+class RowSerializer:
+    """
+    Ubah objek ORM, Row SQLAlchemy, atau tuple menjadi dict berisi field
+    schema tertentu tanpa membangun (dan memvalidasi) model pydantic per baris.
+    Field diambil dari schema supaya bentuk JSON tetap sama dengan
+    response_model endpoint.
+    """
+
+    def __init__(self, schema):
+        self.fields = tuple(schema.model_fields)
+        getter = operator.attrgetter(*self.fields)
+        # attrgetter dengan satu nama mengembalikan nilai, bukan tuple
+        self._get = getter if len(self.fields) > 1 else (lambda obj: (getter(obj),))
+
+    def __call__(self, obj):
+        return dict(zip(self.fields, self._get(obj)))
+
+    def many(self, objs):
+        fields, get = self.fields, self._get
+        return [dict(zip(fields, get(obj))) for obj in objs]
+
+    def from_tuples(self, rows):
+        """Baris hasil select(...) dengan kolom berurutan sama dengan schema."""
+        fields = self.fields
+        return [dict(zip(fields, row)) for row in rows]
+
+
+# bentuk baris prediksi yang dipakai endpoint list/dashboard/summary
+history_item = RowSerializer(HistoryItem)
+dashboard_recent = RowSerializer(DashboardRecentPrediction)
+summary_latest = RowSerializer(SummaryLatest)
@@ -0,0 +1,258 @@
+# backend/services/user_stats.py
+import asyncio
+import math
+import sys
+from datetime import datetime
+
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.exc import IntegrityError
+
+from config.db import AsyncSessionLocal
+import models.user  # relationship Prediction.user butuh model User terdaftar (mode CLI)
+from models.prediction import Prediction as PredictionModel
+from models.user_stats import UserPredictionStats
+
+# kolom yang dicatat count/sum/min/max-nya: kolom Prediction -> prefix di stats
+TRACKED = {
+    "probability": "probability",
+    "glucose": "glucose",
+    "blood_pressure": "blood_pressure",
+}
+
+
+def _get(record, name):
+    return record.get(name) if isinstance(record, dict) else getattr(record, name, None)
+
+
+def summarize(records):
+    """
+    Hitung delta stats dari prediksi baru (dict atau objek Prediction milik
+    satu user). Dipakai untuk insert tunggal maupun bulk.
+    """
+    delta = {"total": 0, "diabetes_count": 0, "latest_created_at": None}
+    for name in TRACKED:
+        delta[name] = {"count": 0, "sum": 0.0, "min": None, "max": None}
+
+    for record in records:
+        delta["total"] += 1
+        if int(_get(record, "prediction")) == 1:
+            delta["diabetes_count"] += 1
+        for name in TRACKED:
+            value = _get(record, name)
+            if value is None:
+                continue
+            value = float(value)
+            acc = delta[name]
+            acc["count"] += 1
+            acc["sum"] += value
+            acc["min"] = value if acc["min"] is None else min(acc["min"], value)
+            acc["max"] = value if acc["max"] is None else max(acc["max"], value)
+        created = _get(record, "createdAt")
+        if created is not None and (delta["latest_created_at"] is None or created >= delta["latest_created_at"]):
+            delta["latest_created_at"] = created
+    return delta
+
+
+def _running_min(column, value):
+    return case((column.is_(None), value), (column > value, value), else_=column)
+
+
+def _running_max(column, value):
+    return case((column.is_(None), value), (column < value, value), else_=column)
+
+
+def _update_values(delta, latest_id):
+    S = UserPredictionStats
+    values = {
+        "total": S.total + delta["total"],
+        "diabetes_count": S.diabetes_count + delta["diabetes_count"],
+        "updatedAt": datetime.utcnow(),
+    }
+    for name, prefix in TRACKED.items():
+        acc = delta[name]
+        if not acc["count"]:
+            continue
+        values[f"sum_{prefix}"] = getattr(S, f"sum_{prefix}") + acc["sum"]
+        values[f"min_{prefix}"] = _running_min(getattr(S, f"min_{prefix}"), acc["min"])
+        values[f"max_{prefix}"] = _running_max(getattr(S, f"max_{prefix}"), acc["max"])
+        if prefix != "probability":
+            values[f"{prefix}_count"] = getattr(S, f"{prefix}_count") + acc["count"]
+
+    created = delta["latest_created_at"]
+    if latest_id is not None and created is not None:
+        # id naik seiring insert, jadi createdAt yang sama tetap memilih baris terbaru
+        newer = (S.latest_created_at.is_(None)) | (S.latest_created_at <= created)
+        values["latest_prediction_id"] = case((newer, latest_id), else_=S.latest_prediction_id)
+        values["latest_created_at"] = case((newer, created), else_=S.latest_created_at)
+    return values
+
+
+async def record_predictions(db, uid, records, latest_id=None):
+    """
+    Tambahkan prediksi baru (sudah di-flush/insert) ke stats user di transaksi
+    `db` milik pemanggil; commit tetap dilakukan pemanggil.
+
+    UPDATE dulu. Jika baris stats belum ada, baris dibangun dari agregat live
+    user itu (sudah termasuk prediksi baru, sekaligus backfill histori lama)
+    dan di-INSERT di dalam savepoint. Jika INSERT kalah balapan dengan request
+    lain, UPDATE diulang. Tidak memakai upsert khusus dialect.
+    """
+    delta = summarize(records)
+    if not delta["total"]:
+        return
+
+    stmt = update(UserPredictionStats).where(UserPredictionStats.user_id == uid)
+    result = await db.execute(stmt.values(**_update_values(delta, latest_id)))
+    if result.rowcount:
+        return
+
+    row = (await db.execute(_live_statement(uid))).first()
+    if row is None:
+        return
+    try:
+        async with db.begin_nested():
+            await db.execute(
+                insert(UserPredictionStats).values(**_live_row_values(row), updatedAt=datetime.utcnow())
+            )
+    except IntegrityError:
+        await db.execute(stmt.values(**_update_values(delta, latest_id)))
+
+
+async def get_user_stats(db, uid):
+    return await db.get(UserPredictionStats, uid)
+
+
+def stats_to_overview(stats):
+    """Bentuk dict yang sama dengan prediction_stats.fetch_aggregates."""
+    def avg(total, count):
+        return (total / count) if count else None
+
+    return {
+        "total": stats.total,
+        "diabetes": stats.diabetes_count,
+        "non_diabetes": stats.total - stats.diabetes_count,
+        "avg_probability": avg(stats.sum_probability, stats.total),
+        "avg_glucose": avg(stats.sum_glucose, stats.glucose_count),
+        "avg_blood_pressure": avg(stats.sum_blood_pressure, stats.blood_pressure_count),
+    }
+
+
+# ==============================
+# REBUILD / CHECK
+# ==============================
+def _live_statement(uid=None):
+    P = PredictionModel
+    # prediksi terbaru per user (createdAt lalu id), subquery berkorelasi
+    inner = PredictionModel.__table__.alias("latest_p")
+    latest_id = (
+        select(inner.c.id)
+        .where(inner.c.user_id == P.user_id)
+        .order_by(inner.c.createdAt.desc(), inner.c.id.desc())
+        .limit(1)
+        .correlate(P)
+        .scalar_subquery()
+    )
+    stmt = select(
+        P.user_id,
+        func.count(P.id).label("total"),
+        func.sum(case((P.prediction == 1, 1), else_=0)).label("diabetes_count"),
+        func.sum(P.probability).label("sum_probability"),
+        func.min(P.probability).label("min_probability"),
+        func.max(P.probability).label("max_probability"),
+        func.count(P.glucose).label("glucose_count"),
+        func.sum(P.glucose).label("sum_glucose"),
+        func.min(P.glucose).label("min_glucose"),
+        func.max(P.glucose).label("max_glucose"),
+        func.count(P.blood_pressure).label("blood_pressure_count"),
+        func.sum(P.blood_pressure).label("sum_blood_pressure"),
+        func.min(P.blood_pressure).label("min_blood_pressure"),
+        func.max(P.blood_pressure).label("max_blood_pressure"),
+        func.max(P.createdAt).label("latest_created_at"),
+        latest_id.label("latest_prediction_id"),
+    ).group_by(P.user_id)
+    if uid is not None:
+        stmt = stmt.where(P.user_id == uid)
+    return stmt
+
+
+def _live_row_values(row):
+    values = dict(row._mapping)
+    for key in ("sum_probability", "sum_glucose", "sum_blood_pressure"):
+        values[key] = float(values[key] or 0.0)
+    values["diabetes_count"] = int(values["diabetes_count"] or 0)
+    return values
+
+
+async def rebuild(db, uid=None):
+    """Hitung ulang stats dari tabel predictions (semua user atau satu user)."""
+    rows = (await db.execute(_live_statement(uid))).all()
+    stmt = delete(UserPredictionStats)
+    if uid is not None:
+        stmt = stmt.where(UserPredictionStats.user_id == uid)
+    await db.execute(stmt)
+
+    now = datetime.utcnow()
+    records = [{**_live_row_values(row), "updatedAt": now} for row in rows]
+    if records:
+        await db.execute(insert(UserPredictionStats), records)
+    await db.commit()
+    return len(records)
+
+
+def _same(a, b):
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+
+async def check(db, uid=None):
+    """
+    Bandingkan stats tersimpan dengan agregat live. Mengembalikan list
+    (user_id, kolom, tersimpan, live) untuk setiap perbedaan.
+    """
+    live = {row.user_id: _live_row_values(row) for row in (await db.execute(_live_statement(uid))).all()}
+    stmt = select(UserPredictionStats)
+    if uid is not None:
+        stmt = stmt.where(UserPredictionStats.user_id == uid)
+    stored = {s.user_id: s for s in (await db.scalars(stmt)).all()}
+
+    mismatches = []
+    for user_id in sorted(set(live) | set(stored)):
+        expected, actual = live.get(user_id), stored.get(user_id)
+        if expected is None:
+            mismatches.append((user_id, "row", "present", None))
+            continue
+        if actual is None:
+            mismatches.append((user_id, "row", None, "present"))
+            continue
+        for column, value in expected.items():
+            if column in ("user_id", "latest_created_at"):
+                continue
+            if not _same(getattr(actual, column), value):
+                mismatches.append((user_id, column, getattr(actual, column), value))
+    return mismatches
+
+
+async def _main(argv):
+    command = argv[0] if argv else "check"
+    uid = int(argv[argv.index("--user") + 1]) if "--user" in argv else None
+    async with AsyncSessionLocal() as db:
+        if command == "rebuild":
+            count = await rebuild(db, uid)
+            print(f"Stats {count} user dibangun ulang")
+            return 0
+        if command == "check":
+            mismatches = await check(db, uid)
+            for user_id, column, stored, live in mismatches:
+                print(f"user {user_id}: {column} tersimpan={stored} live={live}")
+            print(f"{len(mismatches)} perbedaan ditemukan")
+            return 1 if mismatches else 0
+    print("Perintah: rebuild | check [--user ID]")
+    return 2
+
+
+if __name__ == "__main__":
+    # jalankan dari folder backend/: python -m services.user_stats rebuild|check [--user ID]
+    sys.exit(asyncio.run(_main(sys.argv[1:])))
@@ -0,0 +1,54 @@
+import asyncio
+import os
+import sys
+import tempfile
+import warnings
+
+import pytest
+
+# test dijalankan dari folder backend/ (python -m pytest tests); pastikan
+# package ml/, services/, routes/ bisa diimport seperti saat app berjalan
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# database, registry model dan folder upload sementara; harus di-set sebelum
+# config.db / ml.predict_service diimport oleh modul test mana pun
+TMP_DIR = tempfile.mkdtemp(prefix="backend-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(TMP_DIR, 'test.db')}"
+os.environ["MODEL_REGISTRY_DIR"] = os.path.join(TMP_DIR, "registry")
+os.environ["IMPORT_DIR"] = os.path.join(TMP_DIR, "imports")
+os.environ.setdefault("ADMIN_API_KEY", "test-admin-key")
+
+
+@pytest.fixture(scope="session")
+def client():
+    from fastapi.testclient import TestClient
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        from app import app
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def register(client):
+    """register(email) -> header Authorization untuk user baru."""
+    def register(email):
+        client.post("/auth/register", json={"name": "Test", "email": email, "password": "Passw0rd!"})
+        r = client.post("/auth/login", json={"email": email, "password": "Passw0rd!"})
+        return {"Authorization": "Bearer " + r.json()["access_token"]}
+    return register
+
+
+@pytest.fixture
+def session_factory(client):
+    """Session async untuk memanggil service langsung lewat asyncio.run()."""
+    # `client` mengimport app sehingga tabel sudah dibuat (create_all)
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+    from sqlalchemy.pool import NullPool
+
+    from config.db import ASYNC_DATABASE_URL
+
+    # engine sendiri tanpa pool: koneksi tidak dibawa lintas event loop TestClient
+    engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=NullPool)
+    yield async_sessionmaker(engine, expire_on_commit=False)
+    asyncio.run(engine.dispose())
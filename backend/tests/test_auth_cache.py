@@ -0,0 +1,59 @@
+"""
+Cache principal di get_current_user melihat perubahan dari worker lain:
+tokenVersion/profileVersion diubah langsung di DB (tanpa invalidate_user di
+proses ini), lalu terlihat setelah interval revalidate.
+"""
+import pytest
+from sqlalchemy import update
+
+from config.db import SessionLocal
+from models.user import User as UserModel
+from routes.authRoute import principal_cache
+
+
+def bump(user_id, **values):
+    # seolah-olah worker lain yang menulis: cache proses ini tidak disentuh
+    with SessionLocal() as db:
+        db.execute(update(UserModel).where(UserModel.id == user_id).values(**values))
+        db.commit()
+
+
+@pytest.fixture
+def user(client, register):
+    def make(email):
+        auth = register(email)
+        me = client.get("/auth/me", headers=auth).json()
+        return auth, me
+    return make
+
+
+def test_cached_principal_within_revalidate_interval(client, user, monkeypatch):
+    monkeypatch.setattr(principal_cache, "revalidate", 3600.0)
+    auth, me = user("cache-fresh@gmail.com")
+    bump(me["id"], tokenVersion=UserModel.tokenVersion + 1)
+    # masih di dalam interval: entry cache dipakai tanpa query
+    assert client.get("/auth/me", headers=auth).status_code == 200
+
+
+def test_token_revoked_by_other_worker(client, user, monkeypatch):
+    monkeypatch.setattr(principal_cache, "revalidate", 0.0)
+    auth, me = user("cache-revoked@gmail.com")
+    bump(me["id"], tokenVersion=UserModel.tokenVersion + 1)
+    r = client.get("/auth/me", headers=auth)
+    assert r.status_code == 401
+    assert r.json()["detail"] == "Token revoked"
+
+
+def test_profile_edited_by_other_worker(client, user, monkeypatch):
+    monkeypatch.setattr(principal_cache, "revalidate", 0.0)
+    auth, me = user("cache-profile@gmail.com")
+    bump(me["id"], name="Renamed", profileVersion=UserModel.profileVersion + 1)
+    assert client.get("/auth/me", headers=auth).json()["name"] == "Renamed"
+
+
+def test_update_profile_bumps_profile_version(client, user):
+    auth, me = user("cache-update@gmail.com")
+    r = client.put("/user/me", json={"name": "Updated"}, headers=auth)
+    assert r.status_code == 200, r.text
+    with SessionLocal() as db:
+        assert db.get(UserModel, me["id"]).profileVersion == 1
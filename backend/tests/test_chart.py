@@ -0,0 +1,56 @@
+"""
+bucket=raw membaca paling banyak CHART_RAW_MAX_ROWS baris; rentang yang lebih
+besar dijawab dengan rata-rata harian dari SQL.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import insert
+
+from config.db import SessionLocal
+from models.prediction import Prediction as PredictionModel
+from services import chart
+from services.response_cache import response_cache
+
+
+@pytest.fixture(scope="module")
+def auth(client, register):
+    headers = register("chart@gmail.com")
+    user_id = client.get("/auth/me", headers=headers).json()["id"]
+    start = datetime(2024, 3, 1, 8, 0, 0)
+    with SessionLocal() as db:
+        db.execute(insert(PredictionModel), [
+            dict(user_id=user_id, pregnancies=1, glucose=100 + i, blood_pressure=70, bmi=25.0, dpf=0.3,
+                 prediction=0, probability=10.0, model_version="test", createdAt=start + timedelta(hours=6 * i))
+            for i in range(40)
+        ])
+        db.commit()
+    return headers
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    # body yang sama di-cache per ETag; test ini mengganti batas di antaranya
+    monkeypatch.setattr(response_cache, "maxsize", 0)
+
+
+def get_chart(client, auth):
+    r = client.get("/dashboard/chart", params={"bucket": "raw", "params": "glucose"}, headers=auth)
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_raw_series_within_cap(client, auth, monkeypatch):
+    monkeypatch.setattr(chart, "RAW_MAX_ROWS", 1000)
+    body = get_chart(client, auth)
+    assert body["bucket"] == "raw"
+    assert body["buckets"] == 40
+    assert body["series"]["glucose"][0] == {"t": "2024-03-01T08:00:00", "value": 100.0, "count": None}
+
+
+def test_raw_series_over_cap_falls_back_to_days(client, auth, monkeypatch):
+    monkeypatch.setattr(chart, "RAW_MAX_ROWS", 10)
+    body = get_chart(client, auth)
+    assert body["bucket"] == "day"
+    assert body["buckets"] == 11
+    assert body["series"]["glucose"][0] == {"t": "2024-03-01", "value": 101.0, "count": 3}
@@ -0,0 +1,72 @@
+"""
+Rollup harian dimajukan task latar dari tabel predictions (watermark id):
+request /predict tidak menyentuh tabel rollup, dan import data historis ke
+hari yang sudah lama tetap terhitung penuh.
+"""
+import asyncio
+from datetime import date, datetime
+
+from sqlalchemy import insert, select
+
+from config.db import SessionLocal
+from models.daily_rollup import PredictionDailyRollup
+from models.prediction import Prediction as PredictionModel
+from services import daily_rollup
+from services.daily_rollup import DailyRollupWorker
+
+PAYLOAD = {"pregnancies": 1, "glucose": 120, "bloodPressure": 70, "bmi": 28.1, "dpf": 0.5}
+HISTORICAL_DAY = date(2020, 1, 15)
+
+
+async def _settle(session_factory):
+    # putaran pertama hanya mencatat max(id), putaran kedua memprosesnya
+    worker = DailyRollupWorker(session_factory, interval=0)
+    await worker.refresh_once()
+    await worker.refresh_once()
+    async with session_factory() as db:
+        return await daily_rollup.check(db)
+
+
+def _rollup_total(day):
+    with SessionLocal() as db:
+        return db.scalar(select(PredictionDailyRollup.total).where(PredictionDailyRollup.day == day))
+
+
+def test_predict_does_not_write_rollup(client, register, session_factory):
+    auth = register("rollup@gmail.com")
+    assert client.post("/predict", json=PAYLOAD, headers=auth).status_code == 201
+    assert asyncio.run(_settle(session_factory)) == []
+
+    today = datetime.fromisoformat(
+        client.get("/predict/latest", headers=auth).json()["createdAt"]
+    ).date()
+    before = _rollup_total(today)
+    assert client.post("/predict", json=PAYLOAD, headers=auth).status_code == 201
+    assert _rollup_total(today) == before
+
+    assert asyncio.run(_settle(session_factory)) == []
+    assert _rollup_total(today) == before + 1
+
+
+def test_historical_rows_into_existing_days(client, register, session_factory):
+    auth = register("rollup-history@gmail.com")
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+    row = dict(user_id=user_id, pregnancies=1, glucose=100, blood_pressure=None, bmi=25.0, dpf=0.3,
+               prediction=0, probability=12.5, model_version="test")
+
+    def add(count):
+        with SessionLocal() as db:
+            db.execute(insert(PredictionModel), [
+                {**row, "createdAt": datetime.combine(HISTORICAL_DAY, datetime.min.time())}
+                for _ in range(count)
+            ])
+            db.commit()
+
+    add(2)
+    assert asyncio.run(_settle(session_factory)) == []
+    assert _rollup_total(HISTORICAL_DAY) == 2
+
+    # import berikutnya ke hari yang sama ditambahkan, bukan menimpa
+    add(3)
+    assert asyncio.run(_settle(session_factory)) == []
+    assert _rollup_total(HISTORICAL_DAY) == 5
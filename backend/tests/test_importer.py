@@ -0,0 +1,52 @@
+"""
+Import CSV tanpa kolom createdAt: semua baris memakai waktu import, dan
+user_prediction_stats.latest_prediction_id/latest_created_at tetap menunjuk
+baris yang benar-benar tersimpan (createdAt detik penuh, lihat
+services/importer.py).
+"""
+import asyncio
+
+from sqlalchemy import func, select
+
+from models.prediction import Prediction as PredictionModel
+from models.user_stats import UserPredictionStats
+from services.importer import create_job, run_import
+
+CSV = (
+    "Pregnancies,Glucose,BloodPressure,BMI,DiabetesPedigreeFunction\n"
+    "2,148,72,33.6,0.627\n"
+    "1,85,66,26.6,0.351\n"
+    "8,183,64,23.3,0.672\n"
+)
+
+
+async def _import(session_factory, user_id, path):
+    async with session_factory() as db:
+        job = await create_job(db, user_id, str(path), filename=path.name)
+    status = await run_import(job.id, session_factory=session_factory, chunk_rows=2)
+
+    async with session_factory() as db:
+        stats = await db.get(UserPredictionStats, user_id)
+        latest = (await db.execute(
+            select(PredictionModel)
+            .where(PredictionModel.user_id == user_id)
+            .order_by(PredictionModel.createdAt.desc(), PredictionModel.id.desc())
+            .limit(1)
+        )).scalar_one()
+        total = await db.scalar(select(func.count(PredictionModel.id)).where(PredictionModel.user_id == user_id))
+    return status, stats, latest, total
+
+
+def test_import_without_created_at_updates_latest(client, register, session_factory, tmp_path):
+    auth = register("import@gmail.com")
+    user_id = client.get("/auth/me", headers=auth).json()["id"]
+    path = tmp_path / "no-created-at.csv"
+    path.write_text(CSV)
+
+    status, stats, latest, total = asyncio.run(_import(session_factory, user_id, path))
+
+    assert status == "completed"
+    assert total == stats.total == 3
+    assert latest.createdAt.microsecond == 0
+    assert stats.latest_prediction_id == latest.id
+    assert stats.latest_created_at == latest.createdAt
@@ -0,0 +1,85 @@
+"""
+Parity LinearModelEngine (ml/model.npz) dengan LogisticRegression asli
+(ml/model.pkl) pada data/diabetes.csv, termasuk baris tepat di decision
+boundary (z = 0) dan sedikit di kiri/kanannya.
+
+Model sklearn diberi ndarray C-contiguous seperti predict_service lama
+(np.array([[...]])). DataFrame dikonversi sklearn ke layout Fortran sehingga
+BLAS menjumlah dengan urutan lain dan tanda z ~1e-15 bisa berbeda.
+"""
+import os
+import pickle
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ml.inference_engine import LinearModelEngine
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ARTIFACT_PATH = os.path.join(BACKEND_DIR, "ml", "model.npz")
+MODEL_PATH = os.path.join(BACKEND_DIR, "ml", "model.pkl")
+DATA_PATH = os.path.join(BACKEND_DIR, "data", "diabetes.csv")
+
+# sengaja tanpa nama fitur (ndarray), sama seperti predict_service lama
+pytestmark = pytest.mark.filterwarnings("ignore:X does not have valid feature names")
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return LinearModelEngine.load(ARTIFACT_PATH)
+
+
+@pytest.fixture(scope="module")
+def model():
+    with open(MODEL_PATH, "rb") as f, warnings.catch_warnings():
+        # model.pkl dibuat dengan versi sklearn lain; isinya tetap dipakai apa adanya
+        warnings.simplefilter("ignore")
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="module")
+def X(engine):
+    df = pd.read_csv(DATA_PATH)
+    return np.ascontiguousarray(df[engine.features].to_numpy(dtype=np.float64))
+
+
+def boundary_rows(engine, X, offset=0.0):
+    """Geser Glucose tiap baris supaya w·x + b = offset."""
+    gi = engine.features.index("Glucose")
+    rows = X.copy()
+    z = rows @ engine.coef + engine.intercept
+    rows[:, gi] += (offset - z) / engine.coef[gi]
+    return rows
+
+
+def assert_parity(model, engine, X):
+    preds, probs = engine.predict(X)
+    np.testing.assert_allclose(probs, model.predict_proba(X)[:, 1], rtol=0, atol=1e-12)
+    np.testing.assert_array_equal(preds, model.predict(X))
+
+
+def test_artifact_matches_pickled_model(engine, model):
+    assert engine.features == [str(f) for f in model.feature_names_in_]
+    np.testing.assert_array_equal(engine.coef, model.coef_[0])
+    assert engine.intercept == model.intercept_[0]
+    np.testing.assert_array_equal(engine.classes, model.classes_)
+
+
+def test_parity_on_dataset(engine, model, X):
+    assert_parity(model, engine, X)
+
+
+@pytest.mark.parametrize("offset", [0.0, 1e-12, -1e-12, 1e-9, -1e-9])
+def test_parity_on_decision_boundary(engine, model, X, offset):
+    rows = boundary_rows(engine, X, offset)
+    z = rows @ engine.coef + engine.intercept
+    assert np.all(np.abs(z - offset) < 1e-10)
+    assert_parity(model, engine, rows)
+
+
+def test_parity_single_row(engine, model, X):
+    # jalur request tunggal: satu baris per panggilan
+    for row in np.vstack([X[:50], boundary_rows(engine, X[:50])]):
+        assert_parity(model, engine, np.array([row]))
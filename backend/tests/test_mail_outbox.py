@@ -0,0 +1,124 @@
+"""
+Pengiriman email outbox ke server SMTP lokal (aiosmtpd): satu koneksi
+dipakai untuk satu batch, body OTP dikosongkan setelah terkirim/gagal, dan
+kegagalan dijadwalkan ulang dengan backoff eksponensial.
+"""
+import asyncio
+import socket
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi_mail import ConnectionConfig
+from sqlalchemy import delete, select
+
+from models.email_outbox import EmailOutbox
+from services.mail_outbox import OutboxDispatcher, enqueue_email
+
+controller_module = pytest.importorskip("aiosmtpd.controller")
+
+
+class Recorder:
+    def __init__(self):
+        self.messages = []
+        self.connections = 0
+
+    async def handle_EHLO(self, server, session, envelope, hostname, responses):
+        self.connections += 1
+        session.host_name = hostname
+        return responses
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((envelope.rcpt_tos, envelope.content.decode()))
+        return "250 OK"
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def mail_conf(port):
+    return ConnectionConfig(
+        MAIL_USERNAME="", MAIL_PASSWORD="", MAIL_FROM="noreply@example.com",
+        MAIL_PORT=port, MAIL_SERVER="127.0.0.1",
+        MAIL_STARTTLS=False, MAIL_SSL_TLS=False, USE_CREDENTIALS=False, TIMEOUT=5,
+    )
+
+
+@pytest.fixture
+def smtp_server():
+    recorder = Recorder()
+    controller = controller_module.Controller(recorder, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    yield recorder, controller.port
+    controller.stop()
+
+
+@pytest.fixture
+def outbox(session_factory):
+    async def reset():
+        async with session_factory() as db:
+            await db.execute(delete(EmailOutbox))
+            await db.commit()
+    asyncio.run(reset())
+    return session_factory
+
+
+async def _enqueue(session_factory, count):
+    async with session_factory() as db:
+        for i in range(count):
+            enqueue_email(db, f"user{i}@example.com", "Kode OTP", f"OTP anda: 12345{i}")
+        await db.commit()
+
+
+async def _rows(session_factory):
+    async with session_factory() as db:
+        return list((await db.scalars(select(EmailOutbox).order_by(EmailOutbox.id))).all())
+
+
+def test_batch_is_sent_over_one_connection(outbox, smtp_server):
+    recorder, port = smtp_server
+
+    async def run():
+        dispatcher = OutboxDispatcher(outbox, mail_conf(port))
+        await _enqueue(outbox, 3)
+        processed = await dispatcher.dispatch_once()
+        await dispatcher._close_smtp()
+        return processed, await _rows(outbox)
+
+    processed, rows = asyncio.run(run())
+    assert processed == 3
+    assert recorder.connections == 1
+    assert [rcpt for rcpt, _ in recorder.messages] == [[f"user{i}@example.com"] for i in range(3)]
+    assert "OTP anda: 123450" in recorder.messages[0][1]
+    assert all(r.status == "sent" and r.sentAt is not None for r in rows)
+    assert all(r.body == "" for r in rows)
+
+
+def test_unreachable_server_backs_off_then_fails(outbox):
+    port = free_port()  # tidak ada server yang mendengarkan
+
+    async def run():
+        dispatcher = OutboxDispatcher(outbox, mail_conf(port), max_attempts=2, backoff_base=30)
+        await _enqueue(outbox, 1)
+        started = datetime.utcnow()
+        await dispatcher.dispatch_once()
+        first = (await _rows(outbox))[0]
+
+        # majukan jadwal supaya percobaan kedua langsung jatuh tempo
+        async with outbox() as db:
+            row = await db.get(EmailOutbox, first.id)
+            row.next_attempt_at = datetime.utcnow()
+            await db.commit()
+        await dispatcher.dispatch_once()
+        return started, first, (await _rows(outbox))[0]
+
+    started, first, second = asyncio.run(run())
+    assert first.status == "pending" and first.attempts == 1
+    assert first.last_error
+    assert first.body.startswith("OTP anda")
+    assert started + timedelta(seconds=29) <= first.next_attempt_at <= datetime.utcnow() + timedelta(seconds=31)
+
+    assert second.status == "failed" and second.attempts == 2
+    assert second.body == ""
@@ -0,0 +1,53 @@
+"""
+Reload dan activate registry model yang berjalan bersamaan (file watcher +
+endpoint admin) tidak boleh berakhir dengan versi lama sebagai model aktif.
+"""
+import os
+import threading
+
+import numpy as np
+
+from ml.inference_engine import LinearModelEngine
+from ml.model_registry import ModelRegistry
+
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml", "model.npz")
+
+
+def test_concurrent_reload_does_not_swap_in_older_version(tmp_path):
+    base = LinearModelEngine.load(ARTIFACT_PATH)
+    newer = LinearModelEngine(base.coef * 1.01, base.intercept, base.features, base.classes)
+    newer_path = tmp_path / "newer.npz"
+    newer.save(str(newer_path))
+
+    registry = ModelRegistry(str(tmp_path / "registry"), bootstrap_paths=[ARTIFACT_PATH])
+    old_version = registry.reload().version
+    new_version = registry.publish(str(newer_path))
+
+    # paksa watcher lama: reload() membaca ACTIVE (versi lama) dan lambat
+    # menyiapkannya, sementara activate() versi baru berjalan di thread lain
+    registry._active = None
+    preparing = threading.Event()
+    release = threading.Event()
+    prepare = registry._prepare
+
+    def slow_prepare(version):
+        if version == old_version:
+            preparing.set()
+            release.wait(5)
+        return prepare(version)
+
+    registry._prepare = slow_prepare
+    watcher = threading.Thread(target=registry.reload)
+    watcher.start()
+    assert preparing.wait(5)
+
+    admin = threading.Thread(target=registry.activate, args=(new_version,))
+    admin.start()
+    admin.join(0.2)
+    release.set()
+    watcher.join(5)
+    admin.join(5)
+
+    assert registry.read_active_version() == new_version
+    assert registry.active.version == new_version
+    np.testing.assert_array_equal(registry.active.coef, newer.coef)
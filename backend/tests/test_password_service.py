@@ -0,0 +1,46 @@
+"""
+Batas antrian PasswordService menghitung job Argon2 yang masih berjalan di
+executor, termasuk milik request yang sudah dibatalkan (client putus).
+"""
+import asyncio
+import threading
+
+import pytest
+
+from services.password_service import PasswordService, PasswordServiceBusy
+
+
+def test_cancelled_request_keeps_counting_until_job_finishes():
+    service = PasswordService(time_cost=1, memory_cost=8, parallelism=1, workers=1, queue_limit=1)
+    started, release = threading.Event(), threading.Event()
+
+    def blocking(password):
+        started.set()
+        release.wait(5)
+        return password
+
+    async def run():
+        task = asyncio.create_task(service._submit("hash", blocking, "x"))
+        await asyncio.to_thread(started.wait, 5)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # job masih berjalan di executor: slot belum boleh dilepas
+        assert service.stats()["pending"] == 1
+        with pytest.raises(PasswordServiceBusy):
+            await service.hash("y")
+
+        release.set()
+        for _ in range(100):
+            if service.stats()["pending"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert service.stats()["pending"] == 0
+        assert await service.verify(await service.hash("y"), "y")
+
+    try:
+        asyncio.run(run())
+    finally:
+        release.set()
+        service.shutdown()
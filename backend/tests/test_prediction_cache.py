@@ -0,0 +1,55 @@
+"""
+/predict, /predict/batch dan import (predict_matrix) menskor baris mentah yang
+sama, dan hasil cache hit identik dengan skoring ulang tanpa cache.
+"""
+import numpy as np
+import pytest
+
+from ml import predict_service
+from ml.predict_service import FEATURES, prediction_cache, predict_matrix
+
+
+class Row:
+    def __init__(self, values):
+        for name, value in zip(FEATURES, values):
+            setattr(self, name, value)
+
+
+ON_GRID = [2, 148, 72, 33.6, 0.627]
+# di bawah presisi NORMALIZE_DECIMALS: tidak boleh memakai hasil ON_GRID
+OFF_GRID = [2, 148.04, 72, 33.6012, 0.6274]
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache():
+    prediction_cache.clear()
+    prediction_cache.reset_stats()
+    yield
+    prediction_cache.clear()
+
+
+def expected(values):
+    _, probs, _ = predict_matrix(np.array([values], dtype=float))
+    return float(probs[0])
+
+
+@pytest.mark.parametrize("values", [ON_GRID, OFF_GRID])
+def test_all_paths_score_the_raw_row(values):
+    single = predict_service.predict_diabetes(Row(values))
+    batch = predict_service.predict_diabetes_batch([Row(values)])[0]
+    assert single["probability"] == batch["probability"] == expected(values)
+
+
+def test_cache_hit_matches_uncached_result():
+    first = predict_service.predict_diabetes(Row(ON_GRID))
+    second = predict_service.predict_diabetes(Row(ON_GRID))
+    assert second == first
+    assert prediction_cache.stats()["hits"] == 1
+
+
+def test_off_grid_row_bypasses_cache():
+    predict_service.predict_diabetes(Row(ON_GRID))
+    result = predict_service.predict_diabetes(Row(OFF_GRID))
+    assert result["probability"] == expected(OFF_GRID)
+    stats = prediction_cache.stats()
+    assert stats["hits"] == 0 and stats["bypassed"] == 1
@@ -0,0 +1,80 @@
+"""
+Jumlah statement SQL per request GET /dashboard/ dan GET /summary/ (aiosqlite),
+dihitung lewat event before_cursor_execute pada async_engine.sync_engine.
+Kasus: baris user_prediction_stats ada (jalur O(1)) dan belum ada (fallback
+agregat live). Principal auth sudah di-cache dan response cache dimatikan
+supaya yang terhitung hanya query route itu sendiri.
+"""
+import pytest
+from sqlalchemy import delete, event
+
+from config.db import SessionLocal, async_engine
+from models.user_stats import UserPredictionStats
+from routes.authRoute import principal_cache
+from services.response_cache import response_cache
+
+PAYLOAD = {"pregnancies": 2, "glucose": 148, "bloodPressure": 72, "bmi": 33.6, "dpf": 0.627}
+
+
+class StatementCounter:
+    def __init__(self):
+        self.statements = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+
+@pytest.fixture(scope="module")
+def auth(client, register):
+    headers = register("query@gmail.com")
+    for _ in range(3):
+        assert client.post("/predict", json=PAYLOAD, headers=headers).status_code == 201
+    # isi principal cache: lookup user di get_current_user tidak ikut terhitung
+    assert client.get("/auth/me", headers=headers).status_code == 200
+    return headers
+
+
+@pytest.fixture(autouse=True)
+def no_response_cache(monkeypatch):
+    monkeypatch.setattr(response_cache, "maxsize", 0)
+    # principal tidak dicocokkan ulang ke users selama test
+    monkeypatch.setattr(principal_cache, "revalidate", 3600.0)
+
+
+@pytest.fixture
+def counter():
+    counter = StatementCounter()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", counter)
+    yield counter
+    event.remove(async_engine.sync_engine, "before_cursor_execute", counter)
+
+
+def drop_stats_row(user_id):
+    with SessionLocal() as db:
+        db.execute(delete(UserPredictionStats).where(UserPredictionStats.user_id == user_id))
+        db.commit()
+
+
+def count(client, auth, counter, path):
+    counter.statements.clear()
+    r = client.get(path, headers=auth)
+    assert r.status_code == 200, r.text
+    return len(counter.statements)
+
+
+def test_dashboard_with_stats_row(client, auth, counter):
+    # stats (PK, dipakai ulang lewat identity map) + window prediksi terbaru
+    assert count(client, auth, counter, "/dashboard/") == 2
+
+
+def test_summary_with_stats_row(client, auth, counter):
+    # stats (PK) + prediksi terakhir lewat latest_prediction_id
+    assert count(client, auth, counter, "/summary/") == 2
+
+
+def test_without_stats_row(client, auth, counter):
+    drop_stats_row(client.get("/auth/me", headers=auth).json()["id"])
+    # stats (tidak ada) + validator live + stats lagi (PK yang tidak ada tidak
+    # tersimpan di identity map) + agregat live + window terbaru
+    assert count(client, auth, counter, "/dashboard/") == 5
+    assert count(client, auth, counter, "/summary/") == 5